@@ -12,23 +12,86 @@
 
 from keystonemiddleware import auth_token
 from oslo_context import context
+from oslo_log import log as logging
 import pecan
 from pecan import hooks
 
 import esi_leap.conf
+from esi_leap.db import api as dbapi
+from esi_leap.manager import rpcapi
 
 
 CONF = esi_leap.conf.CONF
+LOG = logging.getLogger(__name__)
+
+
+class _RollbackRequest(Exception):
+    """Raised into the transaction of a failed request to roll it back."""
 
 
 class ContextHook(hooks.PecanHook):
+    """Sets up the request context and its database transaction.
+
+    All DB API calls made while handling a request share one transaction.
+    GET and HEAD requests read from a replica when one is configured. The
+    transaction is committed once the controller has returned, or rolled
+    back if the request failed.
+    """
+
     def before(self, state):
         ctx = context.RequestContext.from_environ(state.request.environ)
         state.request.context = ctx
+        state.request.db_transaction = dbapi.transaction(
+            ctx, read_only=state.request.method in ('GET', 'HEAD'))
+        state.request.db_transaction.__enter__()
 
     def after(self, state):
+        self._end_transaction(state, state.response.status_int >= 400)
         state.request.context = None
 
+    def on_error(self, state, e):
+        self._end_transaction(state, True)
+
+    @staticmethod
+    def _end_transaction(state, rollback):
+        transaction = getattr(state.request, 'db_transaction', None)
+        if transaction is None:
+            return
+        state.request.db_transaction = None
+        if rollback:
+            transaction.__exit__(_RollbackRequest,
+                                 _RollbackRequest(), None)
+        else:
+            transaction.__exit__(None, None, None)
+
+
+class RPCHook(hooks.PecanHook):
+    """Gives controllers a manager RPC client.
+
+    Controllers set pecan.request.reschedule after changing offers or
+    contracts; the managers are then woken up once the request's
+    transaction has been committed, so they see the change.
+    """
+
+    def __init__(self):
+        self._rpcapi = None
+
+    def before(self, state):
+        if self._rpcapi is None:
+            self._rpcapi = rpcapi.ManagerRPCAPI()
+        state.request.rpcapi = self._rpcapi
+        state.request.reschedule = False
+
+    def after(self, state):
+        if (getattr(state.request, 'reschedule', False) and
+                state.response.status_int < 400):
+            # the change is committed; the managers still find it at
+            # their next scheduled scan if they cannot be woken up
+            try:
+                self._rpcapi.reschedule(context.get_admin_context())
+            except Exception:
+                LOG.exception("Failed to wake up the managers")
+
 
 def get_pecan_config():
     cfg_dict = {
@@ -51,7 +114,9 @@ def setup_app(config=None):
 
     app = pecan.make_app(
         config.app.root,
-        hooks=lambda: [ContextHook()],
+        # after() hooks run in reverse order, so RPCHook wakes up the
+        # managers only once ContextHook has committed the transaction
+        hooks=lambda: [RPCHook(), ContextHook()],
         debug=CONF.pecan.debug,
         static_root=config.app.static_root if CONF.pecan.debug else None,
         force_canonical=getattr(config.app, 'force_canonical', True),
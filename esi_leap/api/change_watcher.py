@@ -0,0 +1,131 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import collections
+
+import eventlet
+from eventlet import event
+from oslo_context import context as ctx
+from oslo_log import log as logging
+
+from esi_leap.common import exception
+import esi_leap.conf
+from esi_leap.objects import change
+
+CONF = esi_leap.conf.CONF
+LOG = logging.getLogger(__name__)
+
+
+class ChangeWatcher(object):
+    """Follows the change log on behalf of all the clients of a worker.
+
+    A single green thread reads new changes every
+    [api]changes_poll_interval seconds and keeps the most recent
+    [api]changes_buffer_size of them in memory. Requests waiting for
+    changes are served from there and woken up when new ones arrive, so
+    however many clients wait, the database sees one query per interval.
+    At most [api]changes_max_waiters requests wait at once.
+    """
+
+    def __init__(self):
+        self._changes = collections.deque()
+        # changes after _start_id and up to _last_id are in _changes
+        self._start_id = None
+        self._last_id = None
+        self._event = event.Event()
+        self._thread = None
+        self._waiters = 0
+
+    def _start(self):
+        latest_id = change.Change.get_latest_id(ctx.get_admin_context())
+        # another request may have started us while we were reading
+        if self._thread is None:
+            self._last_id = self._start_id = latest_id
+            self._thread = eventlet.spawn(self._run)
+
+    def _run(self):
+        while True:
+            eventlet.sleep(CONF.api.changes_poll_interval)
+            try:
+                self._poll()
+            except Exception:
+                LOG.exception("Failed to read new changes")
+
+    def _poll(self):
+        context = ctx.get_admin_context()
+        found = False
+        while True:
+            changes = change.Change.get_all(context, self._last_id,
+                                            limit=CONF.api.max_limit)
+            if not changes:
+                break
+            found = True
+            self._changes.extend(changes)
+            self._last_id = changes[-1].id
+            while len(self._changes) > CONF.api.changes_buffer_size:
+                self._start_id = self._changes.popleft().id
+        if found:
+            waiting, self._event = self._event, event.Event()
+            waiting.send()
+
+    def get_latest_id(self):
+        if self._thread is None:
+            self._start()
+        return self._last_id
+
+    def get_changes(self, since, project_id=None, limit=None, timeout=0):
+        """Return the changes after since, waiting for some if need be.
+
+        :param project_id: only return changes of this project
+        :param limit: largest number of changes to return
+        :param timeout: longest time in seconds to wait for a change
+        :returns: a (changes, cursor) tuple, where the cursor is what to
+                  pass as since to get the changes that follow, or None
+                  if the changes after since are no longer held here.
+        :raises: ChangeWaitersExceeded if there are no changes yet and
+                 [api]changes_max_waiters requests are already waiting.
+        """
+        if self._thread is None:
+            self._start()
+        if since < self._start_id:
+            return None
+
+        with eventlet.Timeout(timeout, False):
+            while True:
+                changes = []
+                for c in reversed(self._changes):
+                    if c.id <= since:
+                        break
+                    if project_id in (None, c.project_id):
+                        changes.append(c)
+                changes.reverse()
+
+                if limit and len(changes) > limit:
+                    changes = changes[:limit]
+                    return changes, changes[-1].id
+                # the cursor of another worker may be ahead of ours
+                since = max(since, self._last_id)
+                if changes:
+                    return changes, since
+                if not timeout:
+                    break
+                self._wait()
+        return [], since
+
+    def _wait(self):
+        if self._waiters >= CONF.api.changes_max_waiters:
+            raise exception.ChangeWaitersExceeded()
+        self._waiters += 1
+        try:
+            self._event.wait()
+        finally:
+            self._waiters -= 1
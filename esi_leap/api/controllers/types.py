@@ -13,6 +13,8 @@
 # Borrowed from Ironic
 
 import json
+
+from six.moves.urllib import parse as urlparse
 from wsme import types as wtypes
 
 
@@ -54,10 +56,10 @@ class Collection(wtypes.Base):
             return wtypes.Unset
 
         url = url or self._type
-        q_args = ''.join(['%s=%s&' % (key, kwargs[key]) for key in kwargs])
-        next_args = '?%(args)slimit=%(limit)d&marker=%(marker)s' % {
-            'args': q_args, 'limit': limit,
-            'marker': getattr(self.collection[-1], 'uuid')}
+        q_args = list(kwargs.items())
+        q_args.append(('limit', limit))
+        q_args.append(('marker', getattr(self.collection[-1], 'uuid')))
+        next_args = '?' + urlparse.urlencode(q_args)
 
         next_link = "%(url)s/v1/%(resource)s%(args)s" % {
             'url': url,
@@ -0,0 +1,88 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import pecan
+from pecan import rest
+import wsme
+from wsme import types as wtypes
+import wsmeext.pecan as wsme_pecan
+
+from esi_leap.api import change_watcher
+from esi_leap.api.controllers import base
+from esi_leap.api.controllers.v1 import utils as api_utils
+from esi_leap.common.i18n import _
+from esi_leap.common import policy
+import esi_leap.conf
+from esi_leap.objects import change
+
+CONF = esi_leap.conf.CONF
+_WATCHER = change_watcher.ChangeWatcher()
+
+
+class Change(base.ESILEAPBase):
+
+    id = wsme.wsattr(int)
+    resource_type = wsme.wsattr(wtypes.text)
+    resource_uuid = wsme.wsattr(wtypes.text)
+    project_id = wsme.wsattr(wtypes.text)
+    action = wsme.wsattr(wtypes.text)
+    status = wsme.wsattr(wtypes.text)
+
+    def __init__(self, **kwargs):
+        self.fields = change.Change.fields
+        for field in self.fields:
+            setattr(self, field, kwargs.get(field, wtypes.Unset))
+
+
+class ChangeCollection(wtypes.Base):
+
+    changes = [Change]
+    cursor = int
+
+
+class ChangesController(rest.RestController):
+
+    @wsme_pecan.wsexpose(ChangeCollection, int, int, int)
+    def get_all(self, since=None, timeout=0, limit=None):
+        """Return the changes to offers and contracts after a cursor.
+
+        Without since, no changes are returned, only the cursor to start
+        from. If there are no changes yet, the request waits up to
+        timeout seconds for some.
+        """
+        request = pecan.request.context
+        cdict = request.to_policy_values()
+        policy.authorize('esi_leap:change:get', cdict, cdict)
+
+        limit = api_utils.validate_limit(limit)
+        if timeout < 0:
+            raise wsme.exc.ClientSideError(_("Timeout must not be negative"))
+        timeout = min(timeout, CONF.api.changes_max_timeout)
+        project_id = None if request.is_admin else request.project_id
+
+        if since is None:
+            changes, cursor = [], _WATCHER.get_latest_id()
+        else:
+            result = _WATCHER.get_changes(since, project_id=project_id,
+                                          limit=limit, timeout=timeout)
+            if result is None:
+                # too old to be held in memory; read it from the database
+                changes = change.Change.get_all(request, since, limit=limit)
+                cursor = changes[-1].id if changes else since
+                changes = [c for c in changes
+                           if project_id in (None, c.project_id)]
+            else:
+                changes, cursor = result
+
+        return ChangeCollection(
+            changes=[Change(**c.to_dict()) for c in changes],
+            cursor=cursor)
@@ -19,6 +19,7 @@ import wsmeext.pecan as wsme_pecan
 
 from esi_leap.api.controllers import base
 from esi_leap.api.controllers import types
+from esi_leap.api.controllers.v1 import utils as api_utils
 from esi_leap.common import policy
 from esi_leap.objects import contract
 
@@ -49,27 +50,87 @@ class ContractCollection(types.Collection):
 
 class ContractsController(rest.RestController):
 
+    _custom_actions = {
+        'export': ['GET'],
+    }
+
     @wsme_pecan.wsexpose(Contract, wtypes.text)
     def get_one(self, contract_uuid):
         request = pecan.request.context
         cdict = request.to_policy_values()
         policy.authorize('esi_leap:contract:get', cdict, cdict)
 
+        not_modified = api_utils.check_etag(
+            contract.Contract.get_revision(request, contract_uuid))
+        if not_modified:
+            return not_modified
+
         c = contract.Contract.get(request, contract_uuid)
         return Contract(**c.to_dict())
 
-    @wsme_pecan.wsexpose(ContractCollection)
-    def get_all(self):
+    @wsme_pecan.wsexpose(ContractCollection, wtypes.text, wtypes.text,
+                         wtypes.text, datetime.datetime, datetime.datetime,
+                         wtypes.text, int, wtypes.text, wtypes.text,
+                         wtypes.text)
+    def get_all(self, status=None, project_id=None, offer_uuid=None,
+                start_time=None, end_time=None, marker=None, limit=None,
+                sort_key='id', sort_dir='asc', fields=None):
         request = pecan.request.context
         cdict = request.to_policy_values()
         policy.authorize('esi_leap:contract:get', cdict, cdict)
 
+        limit = api_utils.validate_limit(limit)
+        sort_dir = api_utils.validate_sort_dir(sort_dir)
+        field_list = api_utils.validate_fields(fields,
+                                               contract.Contract.fields)
+
+        filters = {
+            'status': status,
+            'project_id': project_id,
+            'offer_uuid': offer_uuid,
+            'start_time': start_time,
+            'end_time': end_time,
+        }
+        filters = dict((k, v) for k, v in filters.items() if v is not None)
+
+        not_modified = api_utils.check_etag(
+            *contract.Contract.get_all_revision(request, filters=filters))
+        if not_modified:
+            return not_modified
+
         contract_collection = ContractCollection()
-        contracts = contract.Contract.get_all(request)
+        contracts = contract.Contract.get_all(
+            request, filters=filters, limit=limit, marker=marker,
+            sort_key=sort_key, sort_dir=sort_dir, fields=field_list)
         contract_collection.contracts = [
             Contract(**c.to_dict()) for c in contracts]
+        contract_collection.next = contract_collection.get_next(
+            limit, url=api_utils.get_public_url(),
+            **api_utils.get_next_args(sort_key=sort_key, sort_dir=sort_dir,
+                                      fields=fields, **filters))
         return contract_collection
 
+    @pecan.expose()
+    def export(self, format='ndjson', status=None, project_id=None,
+               offer_uuid=None, start_time=None, end_time=None):
+        """Stream every matching contract as NDJSON or CSV."""
+        request = pecan.request.context
+        cdict = request.to_policy_values()
+        policy.authorize('esi_leap:contract:get', cdict, cdict)
+
+        filters = {
+            'status': status,
+            'project_id': project_id,
+            'offer_uuid': offer_uuid,
+            'start_time': api_utils.parse_time(start_time, 'start_time'),
+            'end_time': api_utils.parse_time(end_time, 'end_time'),
+        }
+        filters = dict((k, v) for k, v in filters.items() if v is not None)
+
+        contracts = contract.Contract.export(request, filters=filters)
+        return api_utils.export_response(
+            contracts, sorted(contract.Contract.fields), format)
+
     @wsme_pecan.wsexpose(Contract, body=Contract)
     def post(self, new_contract):
         request = pecan.request.context
@@ -78,6 +139,7 @@ class ContractsController(rest.RestController):
 
         c = contract.Contract(**new_contract.to_dict())
         c.create(request)
+        pecan.request.reschedule = True
         return Contract(**c.to_dict())
 
     @wsme_pecan.wsexpose(Contract, wtypes.text)
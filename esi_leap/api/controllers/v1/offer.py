@@ -19,6 +19,9 @@ import wsmeext.pecan as wsme_pecan
 
 from esi_leap.api.controllers import base
 from esi_leap.api.controllers import types
+from esi_leap.api.controllers.v1 import utils as api_utils
+from esi_leap.common import exception
+from esi_leap.common.i18n import _
 from esi_leap.common import policy
 from esi_leap.objects import offer
 
@@ -50,27 +53,99 @@ class OfferCollection(types.Collection):
 
 class OffersController(rest.RestController):
 
+    _custom_actions = {
+        'export': ['GET'],
+    }
+
     @wsme_pecan.wsexpose(Offer, wtypes.text)
     def get_one(self, offer_uuid):
         request = pecan.request.context
         cdict = request.to_policy_values()
         policy.authorize('esi_leap:offer:get', cdict, cdict)
 
+        not_modified = api_utils.check_etag(
+            offer.Offer.get_revision(request, offer_uuid))
+        if not_modified:
+            return not_modified
+
         o = offer.Offer.get(request, offer_uuid)
         return Offer(**o.to_dict())
 
-    @wsme_pecan.wsexpose(OfferCollection)
-    def get_all(self):
+    @wsme_pecan.wsexpose(OfferCollection, wtypes.text, wtypes.text,
+                         wtypes.text, wtypes.text, datetime.datetime,
+                         datetime.datetime, wtypes.text, int, wtypes.text,
+                         wtypes.text, wtypes.text)
+    def get_all(self, status=None, project_id=None, resource_type=None,
+                resource_uuid=None, start_time=None, end_time=None,
+                marker=None, limit=None, sort_key='id', sort_dir='asc',
+                fields=None):
         request = pecan.request.context
         cdict = request.to_policy_values()
         policy.authorize('esi_leap:offer:get', cdict, cdict)
 
+        if resource_uuid is not None and resource_type is None:
+            raise wsme.exc.ClientSideError(
+                _("resource_uuid requires resource_type"))
+        limit = api_utils.validate_limit(limit)
+        sort_dir = api_utils.validate_sort_dir(sort_dir)
+        field_list = api_utils.validate_fields(fields, offer.Offer.fields)
+
+        filters = {
+            'status': status,
+            'project_id': project_id,
+            'resource_type': resource_type,
+            'resource_uuid': resource_uuid,
+            'start_time': start_time,
+            'end_time': end_time,
+        }
+        filters = dict((k, v) for k, v in filters.items() if v is not None)
+
+        not_modified = api_utils.check_etag(
+            *offer.Offer.get_all_revision(request, filters=filters))
+        if not_modified:
+            return not_modified
+
         offer_collection = OfferCollection()
-        offers = offer.Offer.get_all(request)
+        offers = offer.Offer.get_all(
+            request, filters=filters, limit=limit, marker=marker,
+            sort_key=sort_key, sort_dir=sort_dir, fields=field_list)
         offer_collection.offers = [
             Offer(**o.to_dict()) for o in offers]
+        offer_collection.next = offer_collection.get_next(
+            limit, url=api_utils.get_public_url(),
+            **api_utils.get_next_args(sort_key=sort_key, sort_dir=sort_dir,
+                                      fields=fields, **filters))
         return offer_collection
 
+    @pecan.expose()
+    def export(self, format='ndjson', status=None, project_id=None,
+               resource_type=None, resource_uuid=None, start_time=None,
+               end_time=None):
+        """Stream every matching offer as NDJSON or CSV."""
+        request = pecan.request.context
+        cdict = request.to_policy_values()
+        policy.authorize('esi_leap:offer:get', cdict, cdict)
+
+        if resource_uuid is not None and resource_type is None:
+            pecan.abort(400, _("resource_uuid requires resource_type"))
+
+        filters = {
+            'status': status,
+            'project_id': project_id,
+            'resource_type': resource_type,
+            'resource_uuid': resource_uuid,
+            'start_time': api_utils.parse_time(start_time, 'start_time'),
+            'end_time': api_utils.parse_time(end_time, 'end_time'),
+        }
+        filters = dict((k, v) for k, v in filters.items() if v is not None)
+
+        try:
+            offers = offer.Offer.export(request, filters=filters)
+        except exception.ProjectNoPermission as e:
+            pecan.abort(403, e.message)
+        return api_utils.export_response(offers, sorted(offer.Offer.fields),
+                                         format)
+
     @wsme_pecan.wsexpose(Offer, body=Offer)
     def post(self, new_offer):
         request = pecan.request.context
@@ -79,6 +154,7 @@ class OffersController(rest.RestController):
 
         o = offer.Offer(**new_offer.to_dict())
         o.create(request)
+        pecan.request.reschedule = True
         return Offer(**o.to_dict())
 
     @wsme_pecan.wsexpose(Offer, wtypes.text)
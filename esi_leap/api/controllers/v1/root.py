@@ -14,12 +14,14 @@ from oslo_serialization import jsonutils
 import pecan
 from pecan import rest
 
+from esi_leap.api.controllers.v1 import change
 from esi_leap.api.controllers.v1 import contract
 from esi_leap.api.controllers.v1 import offer
 
 
 class Controller(rest.RestController):
 
+    changes = change.ChangesController()
     contracts = contract.ContractsController()
     offers = offer.OffersController()
 
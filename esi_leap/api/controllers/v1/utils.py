@@ -0,0 +1,121 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import datetime
+import hashlib
+from oslo_utils import timeutils
+import pecan
+import wsme
+from wsme import api as wsme_api
+
+from esi_leap.common import export
+from esi_leap.common.i18n import _
+import esi_leap.conf
+
+
+CONF = esi_leap.conf.CONF
+
+
+def get_public_url():
+    return CONF.api.public_endpoint or pecan.request.host_url
+
+
+def validate_limit(limit):
+    if limit is None:
+        return CONF.api.max_limit
+
+    if limit <= 0:
+        raise wsme.exc.ClientSideError(_("Limit must be positive"))
+
+    return min(CONF.api.max_limit, limit)
+
+
+def validate_sort_dir(sort_dir):
+    if sort_dir not in ['asc', 'desc']:
+        raise wsme.exc.ClientSideError(_("Invalid sort direction: %s. "
+                                         "Acceptable values are "
+                                         "'asc' or 'desc'") % sort_dir)
+    return sort_dir
+
+
+def validate_fields(fields, allowed):
+    """Parse a comma-separated list of fields to return.
+
+    The uuid is always included, since a collection's next link needs it.
+
+    :returns: a list of field names, or None to return every field.
+    """
+    if fields is None:
+        return None
+
+    fields = [f.strip() for f in fields.split(',') if f.strip()]
+    invalid = set(fields) - set(allowed)
+    if invalid:
+        raise wsme.exc.ClientSideError(_("Invalid field(s): %s") %
+                                       ', '.join(sorted(invalid)))
+    if 'uuid' not in fields:
+        fields.append('uuid')
+    return fields
+
+
+def get_next_args(**kwargs):
+    """Return the query arguments a collection's next link carries over."""
+    args = {}
+    for key, value in kwargs.items():
+        if value is None:
+            continue
+        if isinstance(value, datetime.datetime):
+            value = value.isoformat()
+        args[key] = value
+    return args
+
+
+def check_etag(*parts):
+    """Set the ETag of the response from values that identify its content.
+
+    The request path and query are part of the ETag too, so it only
+    matches the response it was sent with.
+
+    :returns: a 304 response to return instead of the content if the
+              request's If-None-Match already matches it, else None.
+    """
+    parts = (pecan.request.path_qs,) + parts
+    etag = hashlib.md5(
+        ':'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+    pecan.response.etag = etag
+    if etag in pecan.request.if_none_match:
+        return wsme_api.Response(None, status_code=304, return_type=None)
+    return None
+
+
+def parse_time(value, name):
+    """Parse an ISO 8601 query argument into a naive UTC datetime."""
+    if value is None:
+        return None
+    try:
+        return timeutils.normalize_time(timeutils.parse_isotime(value))
+    except ValueError:
+        pecan.abort(400, _("Invalid %(name)s: %(value)s") %
+                    {'name': name, 'value': value})
+
+
+def export_response(rows, fields, fmt):
+    """Return a response streaming rows in an export format."""
+    if fmt not in export.FORMATS:
+        pecan.abort(400, _("Invalid export format: %(fmt)s. Acceptable "
+                           "values are %(formats)s") %
+                    {'fmt': fmt, 'formats': ', '.join(sorted(export.FORMATS))})
+    chunks = export.serialize(rows, fields, fmt)
+    return pecan.Response(
+        app_iter=(chunk.encode('utf-8') for chunk in chunks),
+        content_type=export.FORMATS[fmt],
+        charset='utf-8')
@@ -16,6 +16,7 @@ from oslo_service import wsgi
 
 from esi_leap.api import app
 import esi_leap.conf
+from esi_leap.objects import flocx_market_client
 
 
 CONF = esi_leap.conf.CONF
@@ -30,10 +31,14 @@ class WSGIService(service.ServiceBase):
             CONF.api.api_workers or processutils.get_worker_count()
         )
 
+        wsgi.register_opts(CONF)
         self.server = wsgi.Server(
             CONF, name, self.app,
             host=CONF.api.host_ip,
             port=CONF.api.port,
+            # clients waiting on /v1/changes get green threads of their own
+            pool_size=(CONF.wsgi_default_pool_size +
+                       CONF.api.changes_max_waiters),
             use_ssl=CONF.api.enable_ssl_api
         )
 
@@ -48,3 +53,4 @@ class WSGIService(service.ServiceBase):
 
     def reset(self):
         self.server.reset()
+        flocx_market_client.reset_flocx_market_client()
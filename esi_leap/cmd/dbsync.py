@@ -12,14 +12,18 @@
 
 from __future__ import print_function
 
+import datetime
 import sys
 
 from oslo_config import cfg
+from oslo_context import context as ctx
+from oslo_utils import timeutils
 
 from esi_leap.common.i18n import _
 from esi_leap.common import service
 import esi_leap.conf
 from esi_leap.db import migration
+from esi_leap.objects import change
 
 
 CONF = esi_leap.conf.CONF
@@ -30,6 +34,13 @@ class DBCommand(object):
     def create_schema(self):
         migration.create_schema()
 
+    def purge_changes(self):
+        before = timeutils.utcnow() - datetime.timedelta(
+            days=CONF.command.age_in_days)
+        count = change.Change.destroy_older_than(
+            ctx.get_admin_context(), before, CONF.command.batch_size)
+        print(_("Deleted %d changes.") % count)
+
 
 def add_command_parsers(subparsers):
     command_object = DBCommand()
@@ -39,6 +50,21 @@ def add_command_parsers(subparsers):
         help=_("Create the database schema."))
     parser.set_defaults(func=command_object.create_schema)
 
+    parser = subparsers.add_parser(
+        'purge_changes',
+        help=_("Delete old entries of the change log behind /v1/changes. "
+               "Clients whose cursor is older than the entries kept miss "
+               "the changes in between."))
+    parser.add_argument(
+        '--age-in-days', type=int, default=7,
+        help=_("Delete the changes older than this many days. "
+               "Defaults to 7."))
+    parser.add_argument(
+        '--batch-size', type=int, default=1000,
+        help=_("Number of changes deleted in each transaction. "
+               "Defaults to 1000."))
+    parser.set_defaults(func=command_object.purge_changes)
+
 
 def main():
     command_opt = cfg.SubCommandOpt('command',
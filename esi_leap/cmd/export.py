@@ -0,0 +1,66 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import io
+import sys
+
+from oslo_config import cfg
+from oslo_context import context as ctx
+
+from esi_leap.common import export
+from esi_leap.common.i18n import _
+from esi_leap.common import service
+import esi_leap.conf
+from esi_leap.objects import contract
+from esi_leap.objects import offer
+
+
+CONF = esi_leap.conf.CONF
+
+EXPORTS = {
+    'offers': offer.Offer,
+    'contracts': contract.Contract,
+}
+
+opts = [
+    cfg.StrOpt('table',
+               positional=True,
+               choices=sorted(EXPORTS),
+               help=_('Table to export.')),
+    cfg.StrOpt('format',
+               default='ndjson',
+               choices=sorted(export.FORMATS),
+               help=_('Export format.')),
+    cfg.StrOpt('status',
+               help=_('Only export rows with this status.')),
+    cfg.StrOpt('output',
+               help=_('File to write to. Defaults to standard output.')),
+]
+
+
+def main():
+    CONF.register_cli_opts(opts)
+    service.prepare_service(sys.argv)
+
+    context = ctx.get_admin_context()
+    obj_class = EXPORTS[CONF.table]
+    filters = {}
+    if CONF.status:
+        filters['status'] = CONF.status
+    rows = obj_class.export(context, filters=filters)
+    chunks = export.serialize(rows, sorted(obj_class.fields), CONF.format)
+
+    if CONF.output:
+        with io.open(CONF.output, 'w', newline='') as f:
+            f.writelines(chunks)
+    else:
+        sys.stdout.writelines(chunks)
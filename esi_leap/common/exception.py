@@ -46,6 +46,27 @@ class ContractNotFound(ESILeapException):
     msg_fmt = _("Contract %(contract_uuid)s not found.")
 
 
+class ChangeWaitersExceeded(ESILeapException):
+    msg_fmt = _("Too many clients are waiting for changes; try again "
+                "later.")
+    code = 503
+
+
+class ContractStatusConflict(ESILeapException):
+    msg_fmt = _("Contract %(contract_uuid)s is no longer %(status)s.")
+    code = 409
+
+
+class InvalidMarker(ESILeapException):
+    msg_fmt = _("Marker %(marker)s not found.")
+    code = 400
+
+
+class InvalidSortKey(ESILeapException):
+    msg_fmt = _("Sort key %(sort_key)s is invalid.")
+    code = 400
+
+
 class OfferNoPermission(ESILeapException):
     msg_fmt = _("You do not have permissions on "
                 "offer %(offer_uuid)s.")
@@ -55,6 +76,11 @@ class OfferNotFound(ESILeapException):
     msg_fmt = _("Offer %(offer_uuid)s not found.")
 
 
+class OfferStatusConflict(ESILeapException):
+    msg_fmt = _("Offer %(offer_uuid)s is no longer %(status)s.")
+    code = 409
+
+
 class ProjectNoPermission(ESILeapException):
     msg_fmt = _("You do not have permissions on project %(project_id)s.")
 
@@ -64,5 +90,9 @@ class ResourceNoPermission(ESILeapException):
                 "%(resource_type)s %(resource_uuid)s.")
 
 
+class ResourceNotFound(ESILeapException):
+    msg_fmt = _("%(resource_type)s %(resource_uuid)s not found.")
+
+
 class ResourceTypeUnknown(ESILeapException):
     msg_fmt = _("%(resource_type)s resource type unknown.")
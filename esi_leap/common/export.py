@@ -0,0 +1,98 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import csv
+import datetime
+
+from oslo_serialization import jsonutils
+import six
+
+
+# export formats and their content types
+FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+CHUNK_SIZE = 100
+
+
+def _to_primitive(value):
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    return value
+
+
+def _to_text(value):
+    if value is None:
+        return ''
+    if isinstance(value, dict):
+        return jsonutils.dumps(value)
+    value = _to_primitive(value)
+    if six.PY2 and isinstance(value, six.text_type):
+        # the python 2 csv module only writes byte strings
+        return value.encode('utf-8')
+    return value
+
+
+def _ndjson_lines(rows, fields):
+    for row in rows:
+        yield six.text_type(jsonutils.dumps(
+            dict((field, _to_primitive(row.get(field)))
+                 for field in fields))) + u'\n'
+
+
+def _getvalue(buf):
+    value = buf.getvalue()
+    if isinstance(value, six.binary_type):
+        return value.decode('utf-8')
+    return value
+
+
+def _csv_lines(rows, fields):
+    buf = six.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(fields)
+    for row in rows:
+        writer.writerow([_to_text(row.get(field)) for field in fields])
+        yield _getvalue(buf)
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        # no rows; the header is still pending
+        yield _getvalue(buf)
+
+
+def serialize(rows, fields, fmt, chunk_size=CHUNK_SIZE):
+    """Yield rows serialized in an export format, chunk_size rows at a time.
+
+    The first row is sent on its own, so that a consumer receives data as
+    soon as the first row is read rather than after a whole chunk.
+
+    :param rows: iterable of dicts
+    :param fields: keys of each row to export, in order
+    :param fmt: one of FORMATS
+    """
+    if fmt == 'csv':
+        lines = _csv_lines(rows, fields)
+    else:
+        lines = _ndjson_lines(rows, fields)
+
+    chunk = []
+    first = True
+    for line in lines:
+        chunk.append(line)
+        if first or len(chunk) >= chunk_size:
+            yield ''.join(chunk)
+            chunk = []
+            first = False
+    if chunk:
+        yield ''.join(chunk)
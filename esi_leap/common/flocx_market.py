@@ -13,9 +13,8 @@
 from esi_leap.common import statuses
 from esi_leap.objects import flocx_market_client
 from esi_leap.objects import offer
+import eventlet
 import json
-from keystoneauth1 import adapter
-from keystoneauth1 import loading as ks_loading
 from oslo_config import cfg
 from oslo_log import log as logging
 
@@ -24,46 +23,60 @@ LOG = logging.getLogger(__name__)
 
 
 def get_flocx_market_client():
-    auth_plugin = ks_loading.load_auth_from_conf_options(
-        CONF, 'flocx_market')
-    sess = ks_loading.load_session_from_conf_options(CONF, 'flocx_market',
-                                                     auth=auth_plugin)
-    adpt = adapter.Adapter(
-        session=sess,
-        service_type='marketplace',
-        interface='public')
-    return flocx_market_client.FlocxMarketClient(adpt)
+    return flocx_market_client.get_flocx_market_client()
 
 
-def retrieve_from_flocx_market(context):
-    marketplace_client = get_flocx_market_client()
-    contract_list = get_contracts(context, marketplace_client)
-    return contract_list
+def _get_by_ids(get_by_id, ids, marketplace_client):
+    """Fetch every distinct id concurrently; return the results by id."""
+    ids = list(set(ids))
+    pool = eventlet.GreenPool(CONF.flocx_market.max_concurrent_requests)
+    results = pool.imap(lambda i: get_by_id(i, marketplace_client), ids)
+    return dict(zip(ids, results))
 
 
 def get_contracts(context, marketplace_client):
-    contracts = []
     contract_offer_list = get_ocr_by_status(marketplace_client)
     if len(contract_offer_list) == 0:
         return []
+
+    marketplace_contracts = _get_by_ids(
+        get_contract_by_id,
+        [co["contract_id"] for co in contract_offer_list],
+        marketplace_client)
+    bids = _get_by_ids(
+        get_bid_by_id,
+        [c["bid_id"] for c in marketplace_contracts.values()],
+        marketplace_client)
+    marketplace_offers = _get_by_ids(
+        get_offer_by_id,
+        [co["marketplace_offer_id"] for co in contract_offer_list],
+        marketplace_client)
+    provider_offers = offer.Offer.get_all(
+        context,
+        filters={'uuid': [o["provider_offer_id"]
+                          for o in marketplace_offers.values()]})
+    provider_offers = dict((o.uuid, o) for o in provider_offers)
+
+    contracts = []
     for contract_offer in contract_offer_list:
         contract_data = {}
-        contract_id = contract_offer["contract_id"]
-        marketplace_offer_id = contract_offer["marketplace_offer_id"]
         ocr_id = contract_offer["offer_contract_relationship_id"]
+        marketplace_offer = marketplace_offers[
+            contract_offer["marketplace_offer_id"]]
+        provider_offer_id = marketplace_offer["provider_offer_id"]
+        offer_provider = provider_offers.get(provider_offer_id)
+        if offer_provider is None:
+            LOG.warning("Offer %s of offer contract relationship %s not "
+                        "found", provider_offer_id, ocr_id)
+            continue
+        c = marketplace_contracts[contract_offer["contract_id"]]
         contract_data["marketplace_offer_contract_relationship_id"] = ocr_id
-        c = get_contract_by_id(contract_id, marketplace_client)
         contract_data["start_date"] = c["start_time"]
         contract_data["end_date"] = c["end_time"]
         contract_data["status"] = statuses.OPEN
-        bid = get_bid_by_id(c["bid_id"], marketplace_client)
-        contract_data["project_id"] = bid["project_id"]
-        offer_marketplace = get_offer_by_id(
-            marketplace_offer_id, marketplace_client)
-        provider_offer_id = offer_marketplace["provider_offer_id"]
-        offer_provider = offer.Offer.get(context, provider_offer_id).to_dict()
+        contract_data["project_id"] = bids[c["bid_id"]]["project_id"]
         contract_data["offer_uuid"] = provider_offer_id
-        contract_data["properties"] = offer_provider["properties"]
+        contract_data["properties"] = offer_provider.properties
         contracts.append(contract_data)
     return contracts
 
@@ -115,7 +128,12 @@ def update_contract(o_c_r_id, marketplace_client):
     return r.status_code
 
 
-def update_flocx_market_contract(o_c_r_id):
-    marketplace_client = get_flocx_market_client()
-    res_status_code = update_contract(o_c_r_id, marketplace_client)
-    return res_status_code
+def update_contracts(o_c_r_ids, marketplace_client):
+    """Mark offer contract relationships as retrieved, concurrently.
+
+    :returns: a dict of HTTP status codes keyed by relationship id.
+    """
+    pool = eventlet.GreenPool(CONF.flocx_market.max_concurrent_requests)
+    results = pool.imap(lambda i: update_contract(i, marketplace_client),
+                        o_c_r_ids)
+    return dict(zip(o_c_r_ids, results))
@@ -28,6 +28,14 @@ default_policies = [
                        description='Full read/write API access'),
 ]
 
+change_policies = [
+    policy.DocumentedRuleDefault(
+        'esi_leap:change:get',
+        'rule:is_admin or rule:is_owner',
+        'Retrieve changes to offers and contracts',
+        [{'path': '/changes', 'method': 'GET'}]),
+]
+
 contract_policies = [
     policy.DocumentedRuleDefault(
         'esi_leap:contract:create',
@@ -70,6 +78,7 @@ offer_policies = [
 def list_rules():
     policies = itertools.chain(
         default_policies,
+        change_policies,
         contract_policies,
         offer_policies,
     )
@@ -15,8 +15,10 @@ from esi_leap.conf import api
 from esi_leap.conf import dummy_node
 from esi_leap.conf import flocx_market
 from esi_leap.conf import ironic
+from esi_leap.conf import manager
 from esi_leap.conf import netconf
 from esi_leap.conf import pecan
+from esi_leap.conf import sqlite_node
 from oslo_config import cfg
 
 CONF = cfg.CONF
@@ -26,6 +28,8 @@ CONF.register_group(cfg.OptGroup(name='database'))
 api.register_opts(CONF)
 dummy_node.register_opts(CONF)
 ironic.register_opts(CONF)
+manager.register_opts(CONF)
 netconf.register_opts(CONF)
 pecan.register_opts(CONF)
+sqlite_node.register_opts(CONF)
 flocx_market.register_opts(CONF)
@@ -20,6 +20,42 @@ opts = [
                 default=7777),
     cfg.IntOpt('max_limit',
                default=1000),
+    cfg.IntOpt('export_batch_size',
+               default=1000,
+               min=1,
+               help='Number of rows fetched from the database at a time '
+                    'when exporting offers or contracts.'),
+    cfg.IntOpt('changes_poll_interval',
+               default=1,
+               min=1,
+               help='Interval in seconds at which each API worker reads '
+                    'new changes for the clients waiting on /v1/changes.'),
+    cfg.IntOpt('changes_max_timeout',
+               default=60,
+               min=0,
+               help='Longest time in seconds a request to /v1/changes may '
+                    'wait for new changes.'),
+    cfg.IntOpt('changes_buffer_size',
+               default=10000,
+               min=1,
+               help='Number of recent changes each API worker keeps in '
+                    'memory for the clients waiting on /v1/changes.'),
+    cfg.IntOpt('changes_max_waiters',
+               default=100,
+               min=0,
+               help='Largest number of requests to /v1/changes that each '
+                    'API worker lets wait for changes at once. Each of '
+                    'them holds a green thread, so the WSGI pool gets this '
+                    'many on top of [DEFAULT]wsgi_default_pool_size. '
+                    'Requests beyond it that would wait get a 503.'),
+    cfg.IntOpt('changes_settle_time',
+               default=10,
+               min=0,
+               help='Seconds after which a change that follows a gap in '
+                    'the change ids is returned anyway. Should exceed the '
+                    'longest transaction; changes are delayed by this '
+                    'much if the database does not allocate consecutive '
+                    'ids.'),
     cfg.StrOpt('public_endpoint'),
     cfg.IntOpt('api_workers'),
     cfg.BoolOpt('enable_ssl_api',
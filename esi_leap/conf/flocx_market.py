@@ -16,7 +16,24 @@ from keystoneauth1 import loading
 from oslo_config import cfg
 
 
-opts = []
+opts = [
+    cfg.IntOpt('max_concurrent_requests',
+               default=10,
+               min=1,
+               help='Maximum number of concurrent requests made to '
+                    'flocx-market while synchronizing contracts.'),
+    cfg.IntOpt('publish_retry_interval',
+               default=10,
+               min=1,
+               help='Number of seconds to wait before retrying to publish '
+                    'an offer to flocx-market. The interval doubles with '
+                    'each failed attempt.'),
+    cfg.IntOpt('publish_max_retry_interval',
+               default=3600,
+               min=1,
+               help='Maximum number of seconds to wait between attempts to '
+                    'publish an offer to flocx-market.'),
+]
 
 flocx_market_group = cfg.OptGroup(
     'flocx_market',
@@ -16,7 +16,32 @@ from keystoneauth1 import loading
 from oslo_config import cfg
 
 
-opts = []
+opts = [
+    cfg.IntOpt('node_cache_ttl',
+               default=10,
+               min=0,
+               help='Number of seconds an Ironic node fetched by esi-leap '
+                    'is reused before it is fetched again. 0 disables the '
+                    'cache.'),
+    cfg.IntOpt('node_cache_size',
+               default=10000,
+               min=1,
+               help='Largest number of Ironic nodes kept in the cache of '
+                    'each esi-leap process.'),
+    cfg.IntOpt('node_list_threshold',
+               default=50,
+               min=0,
+               help='Number of uncached Ironic nodes needed by a batch of '
+                    'offers or contracts above which they are taken from '
+                    'one listing of all nodes instead of being fetched '
+                    'one by one.'),
+    cfg.IntOpt('node_fetch_concurrency',
+               default=10,
+               min=1,
+               help='Largest number of requests made to Ironic at once '
+                    'when fetching the nodes of a batch of offers or '
+                    'contracts.'),
+]
 ironic_group = cfg.OptGroup(
     'ironic',
     title='Ironic Options')
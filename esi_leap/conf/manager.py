@@ -0,0 +1,73 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from oslo_config import cfg
+
+
+opts = [
+    cfg.IntOpt('batch_size',
+               default=100,
+               min=1,
+               help='Maximum number of due offers or contracts loaded and '
+                    'processed at once by a periodic job. Also the number '
+                    'of upcoming deadlines per job that the deadline '
+                    'scheduler keeps in memory.'),
+    cfg.IntOpt('workers',
+               default=16,
+               min=1,
+               help='Number of green threads used to fulfill and expire '
+                    'offers and contracts concurrently.'),
+    cfg.IntOpt('workers_per_resource_type',
+               default=8,
+               min=1,
+               help='Maximum number of offers or contracts of a single '
+                    'resource type, such as ironic_node, processed '
+                    'concurrently.'),
+    cfg.IntOpt('max_sleep_interval',
+               default=60,
+               min=1,
+               help='Maximum number of seconds the deadline scheduler '
+                    'sleeps before reloading deadlines from the database, '
+                    'even if it is not woken up.'),
+    cfg.IntOpt('retry_interval',
+               default=10,
+               min=1,
+               help='Number of seconds the deadline scheduler waits before '
+                    'retrying a job whose deadline was not cleared by its '
+                    'last run.'),
+    cfg.IntOpt('heartbeat_interval',
+               default=10,
+               min=1,
+               help='Number of seconds between the heartbeats a manager '
+                    'writes to the database to take part in the hash '
+                    'ring.'),
+    cfg.IntOpt('heartbeat_timeout',
+               default=60,
+               min=1,
+               help='Number of seconds after its last heartbeat that a '
+                    'manager is considered dead and its share of offers '
+                    'and contracts is taken over by the others.'),
+    cfg.IntOpt('hash_ring_replicas',
+               default=32,
+               min=1,
+               help='Number of points each manager is given on the hash '
+                    'ring. More points spread offers and contracts more '
+                    'evenly between managers.'),
+]
+
+manager_group = cfg.OptGroup(
+    'manager',
+    title='Manager Options')
+
+
+def register_opts(conf):
+    conf.register_opts(opts, group=manager_group)
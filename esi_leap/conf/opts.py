@@ -17,7 +17,9 @@ _opts = [
     ('api', esi_leap.conf.api.opts),
     ('dummy_node', esi_leap.conf.dummy_node.opts),
     ('ironic', esi_leap.conf.ironic.list_opts()),
+    ('manager', esi_leap.conf.manager.opts),
     ('pecan', esi_leap.conf.pecan.opts),
+    ('sqlite_node', esi_leap.conf.sqlite_node.opts),
     ('flocx_market', esi_leap.conf.flocx_market.list_opts()),
 ]
 
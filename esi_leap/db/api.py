@@ -47,6 +47,11 @@ def drop_db():
     return IMPL.drop_db()
 
 
+def transaction(context, read_only=False):
+    """Return a context manager grouping DB API calls in one transaction."""
+    return IMPL.transaction(context, read_only=read_only)
+
+
 # Helpers for building constraints / equality checks
 
 
@@ -73,6 +78,15 @@ def not_equal(*values):
     return IMPL.not_equal(*values)
 
 
+def in_range(lower=None, upper=None):
+    """Return a range condition object suitable for use in a constraint.
+
+    In_range conditions require that a model object's attribute lies
+    between the given bounds, inclusively; a bound of None is ignored.
+    """
+    return IMPL.in_range(lower=lower, upper=upper)
+
+
 def to_dict(func):
     def decorator(*args, **kwargs):
         res = func(*args, **kwargs)
@@ -95,8 +109,23 @@ def offer_get(context, offer_uuid):
 
 
 @to_dict
-def offer_get_all(context):
-    return IMPL.offer_get_all(context)
+def offer_get_all(context, filters=None, limit=None, marker=None,
+                  sort_key=None, sort_dir=None, fields=None):
+    return IMPL.offer_get_all(context, filters=filters, limit=limit,
+                              marker=marker, sort_key=sort_key,
+                              sort_dir=sort_dir, fields=fields)
+
+
+def offer_get_revision(context, offer_uuid):
+    return IMPL.offer_get_revision(context, offer_uuid)
+
+
+def offer_get_all_revision(context, filters=None):
+    return IMPL.offer_get_all_revision(context, filters=filters)
+
+
+def offer_export(context, filters=None, batch_size=None):
+    return IMPL.offer_export(context, filters=filters, batch_size=batch_size)
 
 
 @to_dict
@@ -109,6 +138,16 @@ def offer_get_all_by_status(context, status):
     return IMPL.offer_get_all_by_status(context, status)
 
 
+@to_dict
+def offer_get_expiring(context, now, limit=None, shard=None, exclude=None):
+    return IMPL.offer_get_expiring(context, now, limit=limit, shard=shard,
+                                   exclude=exclude)
+
+
+def offer_get_next_end_dates(context, limit, shard=None):
+    return IMPL.offer_get_next_end_dates(context, limit, shard=shard)
+
+
 def offer_create(context, values):
     return IMPL.offer_create(context, values)
 
@@ -121,6 +160,29 @@ def offer_destroy(context, offer_uuid):
     return IMPL.offer_destroy(context, offer_uuid)
 
 
+def offer_expire_with_contracts(context, offer_uuids):
+    return IMPL.offer_expire_with_contracts(context, offer_uuids)
+
+
+# Offer outbox
+@to_dict
+def offer_outbox_get_due(context, now, limit=None, shard=None):
+    return IMPL.offer_outbox_get_due(context, now, limit=limit, shard=shard)
+
+
+def offer_outbox_get_next_attempt_dates(context, limit, shard=None):
+    return IMPL.offer_outbox_get_next_attempt_dates(context, limit,
+                                                    shard=shard)
+
+
+def offer_outbox_update(context, outbox_id, values):
+    return IMPL.offer_outbox_update(context, outbox_id, values)
+
+
+def offer_outbox_destroy(context, outbox_ids):
+    return IMPL.offer_outbox_destroy(context, outbox_ids)
+
+
 # Contract
 @to_dict
 def contract_get(context, contract_uuid):
@@ -128,8 +190,24 @@ def contract_get(context, contract_uuid):
 
 
 @to_dict
-def contract_get_all(context):
-    return IMPL.contract_get_all(context)
+def contract_get_all(context, filters=None, limit=None, marker=None,
+                     sort_key=None, sort_dir=None, fields=None):
+    return IMPL.contract_get_all(context, filters=filters, limit=limit,
+                                 marker=marker, sort_key=sort_key,
+                                 sort_dir=sort_dir, fields=fields)
+
+
+def contract_get_revision(context, contract_uuid):
+    return IMPL.contract_get_revision(context, contract_uuid)
+
+
+def contract_get_all_revision(context, filters=None):
+    return IMPL.contract_get_all_revision(context, filters=filters)
+
+
+def contract_export(context, filters=None, batch_size=None):
+    return IMPL.contract_export(context, filters=filters,
+                                batch_size=batch_size)
 
 
 @to_dict
@@ -147,13 +225,72 @@ def contract_get_all_by_status(context, status):
     return IMPL.contract_get_all_by_status(context, status)
 
 
+@to_dict
+def contract_get_due_for_fulfillment(context, now, limit=None, shard=None,
+                                     exclude=None):
+    return IMPL.contract_get_due_for_fulfillment(context, now, limit=limit,
+                                                 shard=shard, exclude=exclude)
+
+
+@to_dict
+def contract_get_expiring(context, now, limit=None, shard=None,
+                          exclude=None):
+    return IMPL.contract_get_expiring(context, now, limit=limit,
+                                      shard=shard, exclude=exclude)
+
+
+def contract_get_next_start_dates(context, limit, shard=None):
+    return IMPL.contract_get_next_start_dates(context, limit, shard=shard)
+
+
+def contract_get_next_end_dates(context, limit, shard=None):
+    return IMPL.contract_get_next_end_dates(context, limit, shard=shard)
+
+
 def contract_create(context, values):
     return IMPL.contract_create(context, values)
 
 
+def contract_bulk_create(context, values_list):
+    return IMPL.contract_bulk_create(context, values_list)
+
+
 def contract_update(context, contract_uuid, values):
     return IMPL.contract_update(context, contract_uuid, values)
 
 
+def contract_bulk_update_status(context, contract_uuids, from_status,
+                                to_status):
+    return IMPL.contract_bulk_update_status(context, contract_uuids,
+                                            from_status, to_status)
+
+
 def contract_destroy(context, contract_uuid):
     return IMPL.contract_destroy(context, contract_uuid)
+
+
+# Changes
+def change_get_latest_id(context):
+    return IMPL.change_get_latest_id(context)
+
+
+@to_dict
+def change_get_all(context, since, limit=None):
+    return IMPL.change_get_all(context, since, limit=limit)
+
+
+def change_destroy_older_than(context, before, batch_size):
+    return IMPL.change_destroy_older_than(context, before, batch_size)
+
+
+# Manager hosts
+def manager_heartbeat(context, hostname, now):
+    return IMPL.manager_heartbeat(context, hostname, now)
+
+
+def manager_get_alive(context, since):
+    return IMPL.manager_get_alive(context, since)
+
+
+def manager_destroy(context, hostname):
+    return IMPL.manager_destroy(context, hostname)
@@ -10,40 +10,79 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import datetime
 import sys
 
 from oslo_config import cfg
-from oslo_db.sqlalchemy import session as db_session
+from oslo_db import exception as db_exc
+from oslo_db.sqlalchemy import enginefacade
+from oslo_db.sqlalchemy import utils as db_utils
 from oslo_log import log as logging
+from oslo_utils import timeutils
 from oslo_utils import uuidutils
 
 import sqlalchemy as sa
+from sqlalchemy import orm
 
 from esi_leap.common import exception
+from esi_leap.common import statuses
 from esi_leap.db.sqlalchemy import models
 from esi_leap.resource_objects import resource_object_factory as ro_factory
 
 
 CONF = cfg.CONF
 LOG = logging.getLogger(__name__)
-_engine_facade = None
+_context_manager = enginefacade.transaction_context()
 
+# Columns that list filters match exactly. Each is covered by an index:
+# uuid by *_uuid_idx, status by *_status_idx, project_id by
+# *_project_id_idx, resource_type/resource_uuid by offer_resource_idx and
+# offer_uuid by contract_offer_uuid_idx.
+OFFER_FILTERS = ('uuid', 'status', 'project_id', 'resource_type',
+                 'resource_uuid')
+CONTRACT_FILTERS = ('status', 'project_id', 'offer_uuid')
 
-def get_facade():
-    global _engine_facade
-    if not _engine_facade:
-        _engine_facade = db_session.EngineFacade.from_config(CONF)
 
-    return _engine_facade
+def reset_facade():
+    """Forget the engines so that they are set up again from CONF."""
+    global _context_manager
+    _context_manager = enginefacade.transaction_context()
 
 
-def get_session():
-    return get_facade().get_session()
+def _session_for_read(context):
+    """Transaction for reads that must see the latest writes.
 
+    Within a transaction that reads from a replica, the replica is used.
+    """
+    return _context_manager.reader.allow_async.using(context)
+
+
+def _session_for_replica_read(context):
+    """Transaction for reads that may lag behind the latest writes.
+
+    These are sent to [database]slave_connection when one is configured,
+    and to the primary database otherwise. Reads that pick what the
+    manager acts on must not use it: a lagging replica would hand back
+    work that is already done.
+    """
+    return _context_manager.reader.async_.using(context)
+
+
+def _session_for_write(context):
+    return _context_manager.writer.using(context)
 
-def reset_facade():
-    global _engine_facade
-    _engine_facade = None
+
+def transaction(context, read_only=False):
+    """Run all DB API calls made with context in one transaction.
+
+    DB API functions called inside the returned context manager reuse its
+    session instead of opening their own, and their changes are committed
+    together when it exits. A read only transaction goes to the replica
+    when one is configured and cannot contain writes.
+    """
+    if read_only:
+        return _session_for_replica_read(context)
+    return _session_for_write(context)
 
 
 def get_backend():
@@ -52,28 +91,66 @@ def get_backend():
 
 
 def setup_db():
-    engine = get_facade().get_engine()
+    engine = _context_manager.writer.get_engine()
     models.Base.metadata.create_all(engine)
     return True
 
 
 def drop_db():
-    engine = db_session.EngineFacade(CONF.database.connection,
-                                     sqlite_fk=True).get_engine()
+    engine = _context_manager.writer.get_engine()
     models.Base.metadata.drop_all(engine)
     return True
 
 
-def model_query(context, model, session=None):
+def model_query(context, model, session):
     """Query helper.
 
     :param model: base model to query
+    :param session: session of the enclosing transaction
     """
-    session = session or get_session()
-
     return session.query(model)
 
 
+def _load_only(model, query, fields):
+    """Restrict a query to the columns of some fields.
+
+    The other columns are not read from the database, and JSON columns
+    among them are not decoded. The primary key is always loaded.
+    """
+    if fields is None:
+        return query
+    return query.options(
+        orm.load_only(*[getattr(model, field) for field in fields]))
+
+
+def _paginate_query(context, model, query, limit=None, marker=None,
+                    sort_key=None, sort_dir=None):
+    """Return one page of a query, using keyset pagination.
+
+    Rows are ordered by (sort_key, id) and the page starts right after the
+    row identified by the marker uuid, so the cost of a page does not
+    depend on its position in the table.
+    """
+    sort_keys = ['id']
+    if sort_key and sort_key not in sort_keys:
+        sort_keys.insert(0, sort_key)
+
+    marker_ref = None
+    if marker is not None:
+        # the marker must be a row of the listing itself, or the error
+        # would tell whether a row the caller cannot list exists
+        marker_ref = query.filter_by(uuid=marker).first()
+        if not marker_ref:
+            raise exception.InvalidMarker(marker=marker)
+
+    try:
+        query = db_utils.paginate_query(query, model, limit, sort_keys,
+                                        marker=marker_ref, sort_dir=sort_dir)
+    except db_exc.InvalidSortKey:
+        raise exception.InvalidSortKey(sort_key=sort_key)
+    return query.all()
+
+
 # Helpers for building constraints / equality checks
 
 
@@ -89,6 +166,14 @@ def not_equal(*values):
     return InequalityCondition(values)
 
 
+def in_range(lower=None, upper=None):
+    return RangeCondition(lower, upper)
+
+
+def in_shard(ranges):
+    return ShardCondition(ranges)
+
+
 class Constraint(object):
     def __init__(self, conditions):
         self.conditions = conditions
@@ -105,7 +190,7 @@ class EqualityCondition(object):
         self.values = values
 
     def clauses(self, field):
-        return sa.or_([field == value for value in self.values])
+        return [sa.or_(*[field == value for value in self.values])]
 
 
 class InequalityCondition(object):
@@ -116,10 +201,207 @@ class InequalityCondition(object):
         return [field != value for value in self.values]
 
 
+class RangeCondition(object):
+    def __init__(self, lower, upper):
+        self.lower = lower
+        self.upper = upper
+
+    def clauses(self, field):
+        clauses = []
+        if self.lower is not None:
+            clauses.append(field >= self.lower)
+        if self.upper is not None:
+            clauses.append(field <= self.upper)
+        return clauses
+
+
+class ShardCondition(object):
+    """Matches values in any of a list of (lower, upper] ranges.
+
+    A bound of None leaves that end of the range open.
+    """
+
+    def __init__(self, ranges):
+        self.ranges = ranges
+
+    def clauses(self, field):
+        ranges = []
+        for lower, upper in self.ranges:
+            clauses = []
+            if lower is not None:
+                clauses.append(field > lower)
+            if upper is not None:
+                clauses.append(field <= upper)
+            if not clauses:
+                return []
+            ranges.append(sa.and_(*clauses))
+        if not ranges:
+            return [sa.false()]
+        return [sa.or_(*ranges)]
+
+
+def _filter_constraint(filters, equality_keys):
+    """Build a constraint out of a dict of list filters.
+
+    Keys in equality_keys match a column exactly; a list or tuple value
+    matches any of its items. 'start_time' and 'end_time' bound
+    start_date from below and end_date from above, so only rows whose
+    whole time window falls within the given range are returned.
+    """
+    conditions = {}
+    for key in equality_keys:
+        value = filters.get(key)
+        if value is None:
+            continue
+        if not isinstance(value, (list, tuple)):
+            value = [value]
+        conditions[key] = equal_any(*value)
+
+    if filters.get('start_time') is not None:
+        conditions['start_date'] = in_range(lower=filters['start_time'])
+    if filters.get('end_time') is not None:
+        conditions['end_date'] = in_range(upper=filters['end_time'])
+    return constraint(**conditions)
+
+
+def _apply_shard(model, query, shard):
+    """Restrict a query to the offer uuid ranges of a manager's shard.
+
+    Offers are sharded by their uuid and everything else by the uuid of
+    the offer it belongs to. A shard of None leaves the query unchanged.
+    """
+    if shard is None:
+        return query
+    key = 'uuid' if model is models.Offer else 'offer_uuid'
+    return constraint(**{key: in_shard(shard)}).apply(model, query)
+
+
+def _exclude_uuids(model, query, exclude):
+    """Leave the rows with the given uuids out of a query."""
+    if not exclude:
+        return query
+    return constraint(uuid=not_equal(*exclude)).apply(model, query)
+
+
+def _get_next_dates(context, model, status, column, limit, shard=None):
+    with _session_for_replica_read(context) as session:
+        query = (model_query(context, model, session)
+                 .with_entities(column)
+                 .filter_by(status=status)
+                 .filter(column.isnot(None)))
+        query = _apply_shard(model, query, shard)
+        query = query.order_by(column).limit(limit)
+        return [row[0] for row in query.all()]
+
+
+def _stream_rows(context, model, filters, equality_keys, batch_size):
+    """Yield the rows of a model as dicts, batch_size rows at a time.
+
+    Plain column rows are read through a server-side cursor, so neither
+    the database driver nor the session holds on to the rows already
+    yielded.
+    """
+    columns = model.__table__.columns
+    with _session_for_replica_read(context) as session:
+        query = session.query(*columns)
+        query = _filter_constraint(filters, equality_keys).apply(model, query)
+        query = query.order_by(model.id).yield_per(batch_size)
+        for row in query:
+            yield dict(zip(columns.keys(), row))
+
+
+def _get_revision(context, model, uuid):
+    """Return the (project_id, revision) row of a uuid, or None."""
+    with _session_for_read(context) as session:
+        return (model_query(context, model, session)
+                .filter_by(uuid=uuid)
+                .with_entities(model.project_id, model.revision)
+                .first())
+
+
+def _get_all_revision(context, model, filters, equality_keys):
+    """Summarize the rows matching filters in one aggregate query.
+
+    Every create, update and delete of an offer or contract appends to the
+    change log, so the latest change id moves on with each of them, even
+    when the matching rows swap places and their count and revisions add
+    up as before. The count and the sum of the revisions are kept for a
+    change that commits after one with a higher id.
+    """
+    with _session_for_replica_read(context) as session:
+        query = model_query(context, model, session)
+        query = _filter_constraint(filters, equality_keys).apply(model, query)
+        latest_change = (model_query(context, models.Change, session)
+                         .with_entities(sa.func.max(models.Change.id))
+                         .as_scalar())
+        return tuple(query.with_entities(
+            sa.func.count(model.id),
+            sa.func.coalesce(sa.func.sum(model.revision), 0),
+            sa.func.coalesce(latest_change, 0)).one())
+
+
+def _log_changes(session, resource_type, action, refs, status=None):
+    """Append an entry to the change log for each of refs.
+
+    The entries are only inserted when the transaction commits, so their
+    ids are taken right before they become visible however long the
+    transaction stays open, for instance around a call to Ironic (see
+    change_get_all).
+
+    :param refs: rows with uuid, project_id and, unless status is given,
+                 status columns
+    """
+    pending = session.info.get('pending_changes')
+    if pending is None:
+        pending = session.info['pending_changes'] = []
+        sa.event.listen(session, 'before_commit', _insert_changes,
+                        once=True)
+    for ref in refs:
+        change_ref = models.Change()
+        change_ref.update({'resource_type': resource_type,
+                           'resource_uuid': ref.uuid,
+                           'project_id': ref.project_id,
+                           'action': action,
+                           'status': status or ref.status})
+        pending.append(change_ref)
+
+
+def _insert_changes(session):
+    session.add_all(session.info.pop('pending_changes', []))
+
+
+def _update_status(context, model, resource_type, query, status, session):
+    """Set the status of the rows a query matches and log the changes.
+
+    The rows are locked first, so the ones logged are the ones updated.
+
+    :returns: the number of rows updated
+    """
+    refs = query.with_entities(model.id, model.uuid,
+                               model.project_id).with_for_update().all()
+    if not refs:
+        return 0
+    count = query.filter(model.id.in_([ref.id for ref in refs])).update(
+        {'status': status}, synchronize_session=False)
+    _log_changes(session, resource_type, 'update', refs, status=status)
+    return count
+
+
+def _update_if_status(context, model, ref, values, session):
+    """Write values to a row only if its status is still the one read.
+
+    :returns: False if another writer changed the status in the meantime.
+    """
+    query = model_query(context, model, session).filter_by(id=ref.id)
+    query = constraint(status=equal_any(ref.status)).apply(model, query)
+    return query.update(values, synchronize_session=False) == 1
+
+
 # Offer
 def offer_get(context, offer_uuid):
-    query = model_query(context, models.Offer, get_session())
-    result = query.filter_by(uuid=offer_uuid).first()
+    with _session_for_read(context) as session:
+        query = model_query(context, models.Offer, session)
+        result = query.filter_by(uuid=offer_uuid).first()
     if not result:
         raise exception.OfferNotFound(offer_uuid=offer_uuid)
     if not context.is_admin:
@@ -128,11 +410,51 @@ def offer_get(context, offer_uuid):
     return result
 
 
-def offer_get_all(context):
+def _get_offer_filters(context, filters):
+    filters = dict(filters or {})
     if not context.is_admin:
-        return offer_get_all_by_project_id(context, context.project_id)
-    query = model_query(context, models.Offer, get_session())
-    return query.all()
+        project_id = filters.setdefault('project_id', context.project_id)
+        if project_id != context.project_id:
+            raise exception.ProjectNoPermission(project_id=project_id)
+    return filters
+
+
+def offer_get_all(context, filters=None, limit=None, marker=None,
+                  sort_key=None, sort_dir=None, fields=None):
+    filters = _get_offer_filters(context, filters)
+    with _session_for_replica_read(context) as session:
+        query = model_query(context, models.Offer, session)
+        query = _load_only(models.Offer, query, fields)
+        query = _filter_constraint(filters, OFFER_FILTERS).apply(
+            models.Offer, query)
+        return _paginate_query(context, models.Offer, query, limit, marker,
+                               sort_key, sort_dir)
+
+
+def offer_get_revision(context, offer_uuid):
+    result = _get_revision(context, models.Offer, offer_uuid)
+    if not result:
+        raise exception.OfferNotFound(offer_uuid=offer_uuid)
+    if not context.is_admin:
+        if context.project_id != result.project_id:
+            raise exception.OfferNoPermission(offer_uuid=offer_uuid)
+    return result.revision
+
+
+def offer_get_all_revision(context, filters=None):
+    filters = _get_offer_filters(context, filters)
+    return _get_all_revision(context, models.Offer, filters, OFFER_FILTERS)
+
+
+def offer_export(context, filters=None, batch_size=None):
+    """Return a generator over all matching offers, as dicts.
+
+    Permissions are checked before the generator is returned, so no error
+    is raised once a caller has started consuming it.
+    """
+    filters = _get_offer_filters(context, filters)
+    return _stream_rows(context, models.Offer, filters, OFFER_FILTERS,
+                        batch_size or CONF.api.export_batch_size)
 
 
 def offer_get_all_by_project_id(context, project_id):
@@ -140,17 +462,37 @@ def offer_get_all_by_project_id(context, project_id):
         if context.project_id != project_id:
             raise exception.ProjectNoPermission(project_id=project_id)
 
-    query = (model_query(context, models.Offer,
-                         get_session()).filter_by(project_id=project_id))
-    return query.all()
+    with _session_for_replica_read(context) as session:
+        query = (model_query(context, models.Offer,
+                             session).filter_by(project_id=project_id))
+        return query.all()
 
 
 def offer_get_all_by_status(context, status):
-    query = (model_query(context, models.Offer,
-                         get_session()).filter_by(status=status))
-    if not context.is_admin:
-        query.filter_by(project_id=context.project_id)
-    return query.all()
+    with _session_for_replica_read(context) as session:
+        query = (model_query(context, models.Offer,
+                             session).filter_by(status=status))
+        if not context.is_admin:
+            query = query.filter_by(project_id=context.project_id)
+        return query.all()
+
+
+def offer_get_expiring(context, now, limit=None, shard=None, exclude=None):
+    with _session_for_read(context) as session:
+        query = (model_query(context, models.Offer, session)
+                 .filter_by(status=statuses.AVAILABLE)
+                 .filter(models.Offer.end_date <= now))
+        query = _apply_shard(models.Offer, query, shard)
+        query = _exclude_uuids(models.Offer, query, exclude)
+        query = query.order_by(models.Offer.end_date)
+        if limit:
+            query = query.limit(limit)
+        return query.all()
+
+
+def offer_get_next_end_dates(context, limit, shard=None):
+    return _get_next_dates(context, models.Offer, statuses.AVAILABLE,
+                           models.Offer.end_date, limit, shard=shard)
 
 
 def offer_create(context, values):
@@ -166,54 +508,134 @@ def offer_create(context, values):
     values['uuid'] = uuidutils.generate_uuid()
     values['project_id'] = context.project_id
     offer_ref.update(values)
-    offer_ref.save(get_session())
-    return offer_ref
 
+    outbox_ref = models.OfferOutbox()
+    outbox_ref.update({'offer_uuid': values['uuid'],
+                       'next_attempt_at': timeutils.utcnow()})
 
-def offer_update(context, offer_uuid, values):
-    offer_ref = offer_get(context, offer_uuid)
-    if not context.is_admin:
-        if context.project_id != offer_ref.project_id:
-            raise exception.OfferNoPermission(offer_uuid=offer_uuid)
+    with _session_for_write(context) as session:
+        session.add(offer_ref)
+        session.add(outbox_ref)
+        session.flush()
+        _log_changes(session, 'offer', 'create', [offer_ref])
+    return offer_ref
 
-        resource = ro_factory.ResourceObjectFactory.get_resource_object(
-            offer_ref.resource_type, offer_ref.resource_uuid)
-        if not resource.is_resource_admin(context.project_id):
-            raise exception.ResourceNoPermission(
-                resource_type=offer_ref.resource_type,
-                resource_uuid=offer_ref.resource_uuid)
 
-    values.pop('uuid', None)
-    values.pop('project_id', None)
-    offer_ref.update(values)
-    offer_ref.save(get_session())
-    return offer_ref
+def offer_update(context, offer_uuid, values):
+    with _session_for_write(context) as session:
+        offer_ref = offer_get(context, offer_uuid)
+        if not context.is_admin:
+            if context.project_id != offer_ref.project_id:
+                raise exception.OfferNoPermission(offer_uuid=offer_uuid)
+
+            resource = ro_factory.ResourceObjectFactory.get_resource_object(
+                offer_ref.resource_type, offer_ref.resource_uuid)
+            if not resource.is_resource_admin(context.project_id):
+                raise exception.ResourceNoPermission(
+                    resource_type=offer_ref.resource_type,
+                    resource_uuid=offer_ref.resource_uuid)
+
+        values.pop('uuid', None)
+        values.pop('project_id', None)
+        if not _update_if_status(context, models.Offer, offer_ref, values,
+                                 session):
+            raise exception.OfferStatusConflict(offer_uuid=offer_uuid,
+                                                status=offer_ref.status)
+        session.refresh(offer_ref)
+        _log_changes(session, 'offer', 'update', [offer_ref])
+        return offer_ref
 
 
 def offer_destroy(context, offer_uuid):
-    offer_ref = offer_get(context, offer_uuid)
-    if not offer_ref:
-        raise exception.OfferNotFound(offer_uuid=offer_uuid)
-    if not context.is_admin:
-        if context.project_id != offer_ref.project_id:
-            raise exception.OfferNoPermission(offer_uuid=offer_uuid)
-        resource = ro_factory.ResourceObjectFactory.get_resource_object(
-            offer_ref.resource_type, offer_ref.resource_uuid)
-        if not resource.is_resource_admin(context.project_id):
-            raise exception.ResourceNoPermission(
-                resource_type=offer_ref.resource_type,
-                resource_uuid=offer_ref.resource_uuid)
-
-    model_query(
-        context,
-        models.Offer,
-        get_session()).filter_by(uuid=offer_uuid).delete()
+    with _session_for_write(context) as session:
+        offer_ref = offer_get(context, offer_uuid)
+        if not offer_ref:
+            raise exception.OfferNotFound(offer_uuid=offer_uuid)
+        if not context.is_admin:
+            if context.project_id != offer_ref.project_id:
+                raise exception.OfferNoPermission(offer_uuid=offer_uuid)
+            resource = ro_factory.ResourceObjectFactory.get_resource_object(
+                offer_ref.resource_type, offer_ref.resource_uuid)
+            if not resource.is_resource_admin(context.project_id):
+                raise exception.ResourceNoPermission(
+                    resource_type=offer_ref.resource_type,
+                    resource_uuid=offer_ref.resource_uuid)
+
+        model_query(
+            context,
+            models.Offer,
+            session).filter_by(uuid=offer_uuid).delete()
+        _log_changes(session, 'offer', 'delete', [offer_ref])
+
+
+def offer_expire_with_contracts(context, offer_uuids):
+    """Expire offers and all of their contracts in one transaction.
+
+    :returns: the number of offers expired; offers that were already
+              expired are not counted
+    """
+    with _session_for_write(context) as session:
+        query = model_query(context, models.Contract, session).filter(
+            models.Contract.offer_uuid.in_(offer_uuids))
+        query = constraint(status=not_equal(statuses.EXPIRED)).apply(
+            models.Contract, query)
+        _update_status(context, models.Contract, 'contract', query,
+                       statuses.EXPIRED, session)
+
+        query = model_query(context, models.Offer, session).filter(
+            models.Offer.uuid.in_(offer_uuids))
+        query = constraint(status=not_equal(statuses.EXPIRED)).apply(
+            models.Offer, query)
+        return _update_status(context, models.Offer, 'offer', query,
+                              statuses.EXPIRED, session)
+
+
+# Offer outbox
+def offer_outbox_get_due(context, now, limit=None, shard=None):
+    with _session_for_read(context) as session:
+        query = (model_query(context, models.OfferOutbox, session)
+                 .filter(models.OfferOutbox.next_attempt_at <= now))
+        query = _apply_shard(models.OfferOutbox, query, shard)
+        query = query.order_by(models.OfferOutbox.next_attempt_at)
+        if limit:
+            query = query.limit(limit)
+        return query.all()
+
+
+def offer_outbox_get_next_attempt_dates(context, limit, shard=None):
+    with _session_for_replica_read(context) as session:
+        query = (model_query(context, models.OfferOutbox, session)
+                 .with_entities(models.OfferOutbox.next_attempt_at))
+        query = _apply_shard(models.OfferOutbox, query, shard)
+        query = (query.order_by(models.OfferOutbox.next_attempt_at)
+                 .limit(limit))
+        return [row[0] for row in query.all()]
+
+
+def offer_outbox_update(context, outbox_id, values):
+    with _session_for_write(context) as session:
+        model_query(
+            context,
+            models.OfferOutbox,
+            session).filter_by(id=outbox_id).update(values)
+
+
+def offer_outbox_destroy(context, outbox_ids):
+    with _session_for_write(context) as session:
+        model_query(
+            context,
+            models.OfferOutbox,
+            session).filter(
+                models.OfferOutbox.id.in_(outbox_ids)).delete(
+                    synchronize_session=False)
 
 
 # Contracts
 def contract_get(context, contract_uuid):
-    query = model_query(context, models.Contract, get_session())
-    result = query.filter_by(uuid=contract_uuid).first()
+    with _session_for_read(context) as session:
+        query = model_query(context, models.Contract, session).options(
+            orm.joinedload(models.Contract.offer))
+        result = query.filter_by(uuid=contract_uuid).first()
     if not result:
         raise exception.ContractNotFound(contract_uuid=contract_uuid)
     if not context.is_admin:
@@ -222,62 +644,303 @@ def contract_get(context, contract_uuid):
     return result
 
 
-def contract_get_all(context):
-    query = model_query(context, models.Contract, get_session())
-    return query.all()
+def contract_get_all(context, filters=None, limit=None, marker=None,
+                     sort_key=None, sort_dir=None, fields=None):
+    with _session_for_replica_read(context) as session:
+        query = model_query(context, models.Contract, session)
+        query = _load_only(models.Contract, query, fields)
+        query = _filter_constraint(filters or {}, CONTRACT_FILTERS).apply(
+            models.Contract, query)
+        return _paginate_query(context, models.Contract, query, limit,
+                               marker, sort_key, sort_dir)
+
+
+def contract_get_revision(context, contract_uuid):
+    result = _get_revision(context, models.Contract, contract_uuid)
+    if not result:
+        raise exception.ContractNotFound(contract_uuid=contract_uuid)
+    if not context.is_admin:
+        if context.project_id != result.project_id:
+            raise exception.ContractNoPermission(contract_uuid=contract_uuid)
+    return result.revision
+
+
+def contract_get_all_revision(context, filters=None):
+    return _get_all_revision(context, models.Contract, filters or {},
+                             CONTRACT_FILTERS)
+
+
+def contract_export(context, filters=None, batch_size=None):
+    """Return a generator over all matching contracts, as dicts."""
+    return _stream_rows(context, models.Contract, filters or {},
+                        CONTRACT_FILTERS,
+                        batch_size or CONF.api.export_batch_size)
 
 
 def contract_get_all_by_project_id(context, project_id):
-    query = (model_query(
-        context,
-        models.Contract,
-        get_session()).filter(
-            models.Contract.offer.has(project_id=project_id)))
-    return query.all()
+    with _session_for_replica_read(context) as session:
+        query = (model_query(context, models.Contract, session)
+                 .join(models.Contract.offer)
+                 .filter(models.Offer.project_id == project_id)
+                 .options(orm.contains_eager(models.Contract.offer)))
+        return query.all()
 
 
 def contract_get_all_by_offer_uuid(context, offer_uuid):
-    query = (model_query(context, models.Contract,
-                         get_session()).filter_by(offer_uuid=offer_uuid))
-    return query.all()
+    with _session_for_read(context) as session:
+        query = (model_query(context, models.Contract,
+                             session).filter_by(offer_uuid=offer_uuid))
+        return query.all()
 
 
 def contract_get_all_by_status(context, status):
-    query = (model_query(context, models.Contract,
-                         get_session()).filter_by(status=status))
-    if not context.is_admin:
-        query.filter_by(project_id=context.project_id)
-    return query.all()
+    with _session_for_replica_read(context) as session:
+        query = (model_query(context, models.Contract,
+                             session).filter_by(status=status))
+        if not context.is_admin:
+            query = query.filter_by(project_id=context.project_id)
+        return query.all()
+
+
+def contract_get_due_for_fulfillment(context, now, limit=None, shard=None,
+                                     exclude=None):
+    with _session_for_read(context) as session:
+        query = (model_query(context, models.Contract, session)
+                 .options(orm.joinedload(models.Contract.offer))
+                 .filter_by(status=statuses.OPEN)
+                 .filter(models.Contract.start_date <= now))
+        query = _apply_shard(models.Contract, query, shard)
+        query = _exclude_uuids(models.Contract, query, exclude)
+        query = query.order_by(models.Contract.start_date)
+        if limit:
+            query = query.limit(limit)
+        return query.all()
+
+
+def contract_get_expiring(context, now, limit=None, shard=None,
+                          exclude=None):
+    with _session_for_read(context) as session:
+        query = (model_query(context, models.Contract, session)
+                 .options(orm.joinedload(models.Contract.offer))
+                 .filter_by(status=statuses.FULFILLED)
+                 .filter(models.Contract.end_date <= now))
+        query = _apply_shard(models.Contract, query, shard)
+        query = _exclude_uuids(models.Contract, query, exclude)
+        query = query.order_by(models.Contract.end_date)
+        if limit:
+            query = query.limit(limit)
+        return query.all()
+
+
+def contract_get_next_start_dates(context, limit, shard=None):
+    return _get_next_dates(context, models.Contract, statuses.OPEN,
+                           models.Contract.start_date, limit, shard=shard)
+
+
+def contract_get_next_end_dates(context, limit, shard=None):
+    return _get_next_dates(context, models.Contract, statuses.FULFILLED,
+                           models.Contract.end_date, limit, shard=shard)
 
 
 def contract_create(context, values):
     contract_ref = models.Contract()
     values['uuid'] = uuidutils.generate_uuid()
     contract_ref.update(values)
-    contract_ref.save(get_session())
+    with _session_for_write(context) as session:
+        session.add(contract_ref)
+        session.flush()
+        _log_changes(session, 'contract', 'create', [contract_ref])
     return contract_ref
 
 
+def contract_bulk_create(context, values_list):
+    """Create contracts, leaving out the ones already imported.
+
+    Contracts are imported once per marketplace offer contract
+    relationship, but two managers whose views of the hash ring differ
+    may both import the same one.
+
+    :returns: the contracts created
+    """
+    try:
+        return _contract_bulk_create(context, values_list)
+    except db_exc.DBDuplicateEntry:
+        # another manager imported some of them in the meantime
+        return _contract_bulk_create(context, values_list)
+
+
+def _contract_bulk_create(context, values_list):
+    contract_refs = []
+    with _session_for_write(context) as session:
+        key = models.Contract.marketplace_offer_contract_relationship_id
+        ocr_ids = [values[key.name] for values in values_list]
+        seen = set(row[0] for row in
+                   model_query(context, models.Contract, session)
+                   .with_entities(key).filter(key.in_(ocr_ids)))
+        for values in values_list:
+            if values[key.name] in seen:
+                continue
+            seen.add(values[key.name])
+            contract_ref = models.Contract()
+            values['uuid'] = uuidutils.generate_uuid()
+            contract_ref.update(values)
+            session.add(contract_ref)
+            contract_refs.append(contract_ref)
+        session.flush()
+        _log_changes(session, 'contract', 'create', contract_refs)
+    return contract_refs
+
+
 def contract_update(context, contract_uuid, values):
-    contract_ref = contract_get(context, contract_uuid)
-    if not context.is_admin:
-        if context.project_id != contract_ref.project_id:
-            raise exception.ContractNoPermission(contract_uuid=contract_uuid)
-    values.pop('uuid', None)
-    values.pop('project_id', None)
-    contract_ref.update(values)
-    contract_ref.save(get_session())
-    return contract_ref
+    with _session_for_write(context) as session:
+        contract_ref = contract_get(context, contract_uuid)
+        if not context.is_admin:
+            if context.project_id != contract_ref.project_id:
+                raise exception.ContractNoPermission(
+                    contract_uuid=contract_uuid)
+        values.pop('uuid', None)
+        values.pop('project_id', None)
+        if not _update_if_status(context, models.Contract, contract_ref,
+                                 values, session):
+            raise exception.ContractStatusConflict(
+                contract_uuid=contract_uuid, status=contract_ref.status)
+        session.refresh(contract_ref)
+        _log_changes(session, 'contract', 'update', [contract_ref])
+        return contract_ref
+
+
+def contract_bulk_update_status(context, contract_uuids, from_status,
+                                to_status):
+    """Move contracts from one status to another with a single UPDATE.
+
+    :param from_status: status, or list of statuses, a contract must be in
+                        to be updated
+    :returns: the number of contracts updated
+    """
+    if not isinstance(from_status, (list, tuple)):
+        from_status = [from_status]
+    with _session_for_write(context) as session:
+        query = model_query(context, models.Contract, session).filter(
+            models.Contract.uuid.in_(contract_uuids))
+        query = constraint(status=equal_any(*from_status)).apply(
+            models.Contract, query)
+        return _update_status(context, models.Contract, 'contract', query,
+                              to_status, session)
 
 
 def contract_destroy(context, contract_uuid):
-    contract_ref = contract_get(context, contract_uuid)
-    if not contract_ref:
-        raise exception.ContractNotFound(contract_uuid=contract_uuid)
-    if not context.is_admin:
-        if context.project_id != contract_ref.project_id:
-            raise exception.ContractNoPermission(contract_uuid=contract_uuid)
-    model_query(
-        context,
-        models.Contract,
-        get_session()).filter_by(uuid=contract_uuid).delete()
+    with _session_for_write(context) as session:
+        contract_ref = contract_get(context, contract_uuid)
+        if not contract_ref:
+            raise exception.ContractNotFound(contract_uuid=contract_uuid)
+        if not context.is_admin:
+            if context.project_id != contract_ref.project_id:
+                raise exception.ContractNoPermission(
+                    contract_uuid=contract_uuid)
+        model_query(
+            context,
+            models.Contract,
+            session).filter_by(uuid=contract_uuid).delete()
+        _log_changes(session, 'contract', 'delete', [contract_ref])
+
+
+# Changes
+def change_get_latest_id(context):
+    with _session_for_replica_read(context) as session:
+        query = model_query(context, models.Change, session).with_entities(
+            sa.func.max(models.Change.id))
+        return query.scalar() or 0
+
+
+def change_get_all(context, since, limit=None):
+    """Return the changes after the change with id since, in order.
+
+    Ids are taken when a change is inserted, just before its transaction
+    commits, and commits may still happen out of order, so a reader
+    could move past a change that is not visible yet. A change that
+    follows a gap in the ids is therefore left out until it is
+    [api]changes_settle_time seconds old, by when the transaction that
+    took the missing id has either committed or rolled back.
+
+    Changes of every project are returned.
+    """
+    with _session_for_replica_read(context) as session:
+        query = (model_query(context, models.Change, session)
+                 .filter(models.Change.id > since)
+                 .order_by(models.Change.id))
+        if limit:
+            query = query.limit(limit)
+        changes = query.all()
+
+    settled = timeutils.utcnow() - datetime.timedelta(
+        seconds=CONF.api.changes_settle_time)
+    last_id = since
+    for i, change in enumerate(changes):
+        if change.id != last_id + 1 and change.created_at > settled:
+            return changes[:i]
+        last_id = change.id
+    return changes
+
+
+def change_destroy_older_than(context, before, batch_size):
+    """Delete the changes created before a time, oldest first.
+
+    Each batch_size changes are deleted in a transaction of their own, so
+    the purge does not hold locks on the whole change log.
+
+    :returns: the number of changes deleted
+    """
+    count = 0
+    while True:
+        with _session_for_write(context) as session:
+            ids = [row.id for row in
+                   model_query(context, models.Change, session)
+                   .filter(models.Change.created_at < before)
+                   .order_by(models.Change.id)
+                   .with_entities(models.Change.id)
+                   .limit(batch_size)]
+            if ids:
+                model_query(context, models.Change, session).filter(
+                    models.Change.id.in_(ids)).delete(
+                        synchronize_session=False)
+        count += len(ids)
+        if len(ids) < batch_size:
+            return count
+
+
+# Manager hosts
+def manager_heartbeat(context, hostname, now):
+    with _session_for_write(context) as session:
+        updated = model_query(
+            context, models.ManagerHost, session).filter_by(
+                hostname=hostname).update({'heartbeat_at': now})
+    if updated:
+        return
+
+    host_ref = models.ManagerHost()
+    host_ref.update({'hostname': hostname, 'heartbeat_at': now})
+    try:
+        with _session_for_write(context) as session:
+            session.add(host_ref)
+    except db_exc.DBDuplicateEntry:
+        # another process registered the same host name first
+        with _session_for_write(context) as session:
+            model_query(context, models.ManagerHost, session).filter_by(
+                hostname=hostname).update({'heartbeat_at': now})
+
+
+def manager_get_alive(context, since):
+    with _session_for_read(context) as session:
+        query = (model_query(context, models.ManagerHost, session)
+                 .with_entities(models.ManagerHost.hostname)
+                 .filter(models.ManagerHost.heartbeat_at >= since)
+                 .order_by(models.ManagerHost.hostname))
+        return [row[0] for row in query.all()]
+
+
+def manager_destroy(context, hostname):
+    with _session_for_write(context) as session:
+        model_query(
+            context,
+            models.ManagerHost,
+            session).filter_by(hostname=hostname).delete()
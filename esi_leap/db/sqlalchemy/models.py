@@ -13,10 +13,12 @@
 from oslo_db.sqlalchemy import models
 from oslo_db.sqlalchemy import types as db_types
 
+import sqlalchemy as sa
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy import orm
 from sqlalchemy import Column, DateTime, ForeignKey
 from sqlalchemy import Index, Integer, String
+from sqlalchemy import text
 
 from esi_leap.common import statuses
 
@@ -26,16 +28,32 @@ class ESILEAPBase(models.TimestampMixin, models.ModelBase):
     metadata = None
 
     def to_dict(self):
+        # columns left out of the query (see load_only) are not loaded
+        # one row at a time just to fill the dict
+        state = sa.inspect(self)
+        unloaded = state.unloaded if state.has_identity else ()
         d = {}
         for c in self.__table__.columns:
-            d[c.name] = self[c.name]
+            if c.name not in unloaded:
+                d[c.name] = self[c.name]
         return d
 
 
 Base = declarative_base(cls=ESILEAPBase)
 
 
-class Offer(Base):
+class RevisionMixin(object):
+    """Adds a counter that every update of a row increments.
+
+    Unlike updated_at it changes on each update, however close together,
+    so it can tell clients whether a row they hold is still current.
+    """
+
+    revision = Column(Integer, nullable=False, default=0,
+                      onupdate=text('revision + 1'))
+
+
+class Offer(RevisionMixin, Base):
     """Represents a resource that is offered to the FLOCX marketplace."""
 
     __tablename__ = 'offers'
@@ -44,6 +62,8 @@ class Offer(Base):
         Index('offer_project_id_idx', 'project_id'),
         Index('offer_resource_idx', 'resource_type', 'resource_uuid'),
         Index('offer_status_idx', 'status'),
+        Index('offer_status_start_date_idx', 'status', 'start_date'),
+        Index('offer_status_end_date_idx', 'status', 'end_date'),
     )
 
     id = Column(Integer, primary_key=True, nullable=False, autoincrement=True)
@@ -57,7 +77,21 @@ class Offer(Base):
     properties = Column(db_types.JsonEncodedDict, nullable=True)
 
 
-class Contract(Base):
+class OfferOutbox(Base):
+    """Represents an offer waiting to be published to the FLOCX marketplace."""
+
+    __tablename__ = 'offer_outbox'
+    __table_args__ = (
+        Index('offer_outbox_next_attempt_at_idx', 'next_attempt_at'),
+    )
+
+    id = Column(Integer, primary_key=True, nullable=False, autoincrement=True)
+    offer_uuid = Column(String(36), nullable=False)
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False)
+
+
+class Contract(RevisionMixin, Base):
     """Represents an accepted contract from the FLOCX marketplace."""
 
     __tablename__ = 'contracts'
@@ -65,13 +99,17 @@ class Contract(Base):
         Index('contract_uuid_idx', 'uuid'),
         Index('contract_project_id_idx', 'project_id'),
         Index('contract_status_idx', 'status'),
+        Index('contract_offer_uuid_idx', 'offer_uuid'),
+        Index('contract_status_start_date_idx', 'status', 'start_date'),
+        Index('contract_status_end_date_idx', 'status', 'end_date'),
     )
 
     id = Column(Integer, primary_key=True, nullable=False, autoincrement=True)
     uuid = Column(String(36), nullable=False, unique=True)
     project_id = Column(String(255), nullable=False)
     marketplace_offer_contract_relationship_id = Column(String(36),
-                                                        nullable=False)
+                                                        nullable=False,
+                                                        unique=True)
     start_date = Column(DateTime)
     end_date = Column(DateTime)
     status = Column(String(15), nullable=False, default=statuses.OPEN)
@@ -84,3 +122,43 @@ class Contract(Base):
         backref=orm.backref('offers'),
         foreign_keys=offer_uuid,
         primaryjoin=offer_uuid == Offer.uuid)
+
+    @property
+    def loaded_offer(self):
+        """The offer if it was loaded along with the contract, else None.
+
+        Unlike the offer attribute, this never loads the offer lazily.
+        """
+        return self.__dict__.get('offer')
+
+    def to_dict(self):
+        d = super(Contract, self).to_dict()
+        if self.loaded_offer is not None:
+            d['offer'] = self.loaded_offer.to_dict()
+        return d
+
+
+class ManagerHost(Base):
+    """Represents a live esi-leap manager and when it last reported in."""
+
+    __tablename__ = 'manager_hosts'
+
+    id = Column(Integer, primary_key=True, nullable=False, autoincrement=True)
+    hostname = Column(String(255), nullable=False, unique=True)
+    heartbeat_at = Column(DateTime, nullable=False)
+
+
+class Change(Base):
+    """Represents a change to an offer or contract, in the order made.
+
+    Rows are only ever appended; the id is the cursor of the changes feed.
+    """
+
+    __tablename__ = 'changes'
+
+    id = Column(Integer, primary_key=True, nullable=False, autoincrement=True)
+    resource_type = Column(String(15), nullable=False)
+    resource_uuid = Column(String(36), nullable=False)
+    project_id = Column(String(255), nullable=False)
+    action = Column(String(15), nullable=False)
+    status = Column(String(15), nullable=False)
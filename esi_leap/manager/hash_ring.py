@@ -0,0 +1,119 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import bisect
+import datetime
+import hashlib
+import uuid
+
+import esi_leap.conf
+from esi_leap.db import base
+from oslo_log import log as logging
+from oslo_utils import timeutils
+
+CONF = esi_leap.conf.CONF
+LOG = logging.getLogger(__name__)
+
+
+class HashRing(object):
+    """Consistent hash ring that splits offer uuids between managers.
+
+    Each host is placed on the ring at [manager]hash_ring_replicas points,
+    taken from the md5 of its name and written as uuids so that they
+    compare with offer uuids as plain strings. An offer belongs to the
+    host owning the first point at or after its uuid, wrapping around at
+    the end, so the share of a host is a short list of uuid ranges that a
+    database query can filter on directly.
+    """
+
+    def __init__(self, hosts, replicas=None):
+        replicas = replicas or CONF.manager.hash_ring_replicas
+        self.hosts = frozenset(hosts)
+        self._points = sorted(
+            (self._get_point('%s-%d' % (host, i)), host)
+            for host in self.hosts for i in range(replicas))
+        self._keys = [point for point, host in self._points]
+
+    @staticmethod
+    def _get_point(name):
+        return str(uuid.UUID(hashlib.md5(name.encode('utf-8')).hexdigest()))
+
+    def get_host(self, key):
+        if not self._points:
+            return None
+        i = bisect.bisect_left(self._keys, key) % len(self._keys)
+        return self._points[i][1]
+
+    def get_ranges(self, host):
+        """Return the (lower, upper] key ranges owned by a host.
+
+        None stands for an open bound; adjacent ranges are merged.
+        """
+        ranges = []
+        for i, (point, owner) in enumerate(self._points):
+            if owner != host:
+                continue
+            lower = self._keys[i - 1] if i else None
+            if ranges and lower is not None and ranges[-1][1] == lower:
+                ranges[-1] = (ranges[-1][0], point)
+            else:
+                ranges.append((lower, point))
+
+        # keys past the last point wrap around to the first one
+        if self._points and self._points[0][1] == host:
+            if ranges[-1][1] == self._keys[-1]:
+                ranges[-1] = (ranges[-1][0], None)
+            else:
+                ranges.append((self._keys[-1], None))
+        return ranges
+
+
+class HashRingManager(base.Base):
+    """Tracks the live managers and the hash ring built from them.
+
+    Every manager writes a heartbeat to the database; those that have not
+    written one within [manager]heartbeat_timeout are left out of the
+    ring, so their share moves to the remaining managers.
+    """
+
+    def __init__(self, host):
+        super(HashRingManager, self).__init__()
+        self.host = host
+        self.ring = HashRing([host])
+
+    def heartbeat(self, context):
+        """Record that this host is alive and refresh the ring.
+
+        :returns: True if the set of live hosts changed.
+        """
+        now = timeutils.utcnow()
+        self.db.manager_heartbeat(context, self.host, now)
+        since = now - datetime.timedelta(
+            seconds=CONF.manager.heartbeat_timeout)
+        hosts = set(self.db.manager_get_alive(context, since))
+        hosts.add(self.host)
+        if hosts == self.ring.hosts:
+            return False
+
+        LOG.info("Rebalancing hash ring over managers %s",
+                 ', '.join(sorted(hosts)))
+        self.ring = HashRing(hosts)
+        return True
+
+    def leave(self, context):
+        self.db.manager_destroy(context, self.host)
+
+    def get_shard(self):
+        return self.ring.get_ranges(self.host)
+
+    def is_mine(self, offer_uuid):
+        return self.ring.get_host(offer_uuid) == self.host
@@ -0,0 +1,92 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import datetime
+
+import eventlet
+
+import esi_leap.conf
+from esi_leap.db import base
+from esi_leap.objects import flocx_market_client
+from esi_leap.objects import offer
+from oslo_log import log as logging
+from oslo_utils import timeutils
+
+CONF = esi_leap.conf.CONF
+LOG = logging.getLogger(__name__)
+
+
+class OfferPublisher(base.Base):
+    """Publishes offers queued in the outbox to flocx-market.
+
+    offer_create queues each new offer in the same transaction that
+    creates it; entries are deleted once flocx-market accepts the offer
+    and are retried with exponential backoff otherwise.
+    """
+
+    def get_next_attempt_dates(self, context, limit, shard=None):
+        return self.db.offer_outbox_get_next_attempt_dates(context, limit,
+                                                           shard=shard)
+
+    def _get_retry_interval(self, attempts):
+        interval = CONF.flocx_market.publish_retry_interval * 2 ** attempts
+        return min(interval, CONF.flocx_market.publish_max_retry_interval)
+
+    def _publish(self, marketplace_client, o):
+        try:
+            return marketplace_client.send_offer(
+                o.to_marketplace_dict()) == 201
+        except Exception:
+            LOG.exception("Failed to publish offer %s", o.uuid)
+            return False
+
+    def publish(self, context, shard=None):
+        batch_size = CONF.manager.batch_size
+        marketplace_client = flocx_market_client.get_flocx_market_client()
+        pool = eventlet.GreenPool(CONF.flocx_market.max_concurrent_requests)
+        while True:
+            now = timeutils.utcnow()
+            entries = self.db.offer_outbox_get_due(context, now,
+                                                   limit=batch_size,
+                                                   shard=shard)
+            if not entries:
+                break
+
+            offers = offer.Offer.get_all(
+                context, filters={'uuid': [e['offer_uuid'] for e in entries]})
+            offers = dict((o.uuid, o) for o in offers)
+
+            done = [e['id'] for e in entries if e['offer_uuid'] not in offers]
+            pending = [e for e in entries if e['offer_uuid'] in offers]
+            results = pool.imap(
+                lambda e: self._publish(marketplace_client,
+                                        offers[e['offer_uuid']]),
+                pending)
+            for entry, published in zip(pending, results):
+                if published:
+                    LOG.info("Published offer %s", entry['offer_uuid'])
+                    done.append(entry['id'])
+                    continue
+                attempts = entry['attempts'] + 1
+                interval = self._get_retry_interval(entry['attempts'])
+                LOG.warning("Failed to publish offer %s, retrying in %d "
+                            "seconds", entry['offer_uuid'], interval)
+                self.db.offer_outbox_update(
+                    context, entry['id'],
+                    {'attempts': attempts,
+                     'next_attempt_at':
+                     now + datetime.timedelta(seconds=interval)})
+            if done:
+                self.db.offer_outbox_destroy(context, done)
+
+            if len(entries) < batch_size:
+                break
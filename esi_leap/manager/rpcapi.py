@@ -24,6 +24,7 @@ class ManagerRPCAPI(object):
     API version history:
 
     * 1.0 - Initial version.
+    * 1.1 - Added reschedule.
     """
 
     def __init__(self):
@@ -31,3 +32,8 @@ class ManagerRPCAPI(object):
             target=utils.get_target(),
             transport=messaging.get_rpc_transport(CONF),
         )
+
+    def reschedule(self, context):
+        """Wake up the deadline scheduler of every manager."""
+        cctxt = self._client.prepare(fanout=True, version='1.1')
+        cctxt.cast(context, 'reschedule')
@@ -0,0 +1,102 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import heapq
+import threading
+
+import esi_leap.conf
+from oslo_log import log as logging
+from oslo_utils import timeutils
+
+CONF = esi_leap.conf.CONF
+LOG = logging.getLogger(__name__)
+
+
+class DeadlineScheduler(object):
+    """Runs manager jobs when the offers or contracts they act on are due.
+
+    Each job is registered with a function returning its upcoming
+    deadlines. The earliest of those are kept in a min-heap, and the
+    scheduler sleeps until the first one passes or until wake() is called
+    because an offer or contract was created or changed.
+    """
+
+    def __init__(self):
+        self._jobs = {}
+        self._heap = []
+        self._wakeup = threading.Event()
+        self._stopped = False
+
+    def add_job(self, name, job, get_deadlines):
+        """Register a job.
+
+        :param name: name of the job, used for logging
+        :param job: callable processing everything currently due
+        :param get_deadlines: callable taking a limit and returning the
+                              earliest datetimes at which job has work
+        """
+        self._jobs[name] = (job, get_deadlines)
+
+    def wake(self):
+        self._wakeup.set()
+
+    def stop(self):
+        self._stopped = True
+        self._wakeup.set()
+
+    def _load(self):
+        heap = []
+        for name, (job, get_deadlines) in self._jobs.items():
+            for deadline in get_deadlines(CONF.manager.batch_size):
+                heap.append((deadline, name))
+        heapq.heapify(heap)
+        self._heap = heap
+
+    def _run_due(self, now):
+        due = set()
+        while self._heap and self._heap[0][0] <= now:
+            due.add(heapq.heappop(self._heap)[1])
+        for name in due:
+            LOG.debug("Running scheduled job %s", name)
+            try:
+                self._jobs[name][0]()
+            except Exception:
+                LOG.exception("Scheduled job %s failed", name)
+        return due
+
+    def _get_timeout(self, now):
+        timeout = CONF.manager.max_sleep_interval
+        if self._heap:
+            next_deadline = self._heap[0][0]
+            if next_deadline <= now:
+                # the last run did not clear this deadline; don't spin on it
+                return CONF.manager.retry_interval
+            timeout = min(timeout, (next_deadline - now).total_seconds())
+        return timeout
+
+    def run_once(self):
+        """Run every due job and return the number of seconds to sleep."""
+        self._wakeup.clear()
+        self._load()
+        now = timeutils.utcnow()
+        if self._run_due(now):
+            self._load()
+        return self._get_timeout(now)
+
+    def run(self):
+        while not self._stopped:
+            try:
+                timeout = self.run_once()
+            except Exception:
+                LOG.exception("Failed to load deadlines")
+                timeout = CONF.manager.retry_interval
+            self._wakeup.wait(timeout)
@@ -10,13 +10,21 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import eventlet
+from eventlet import semaphore
 
+from esi_leap.common import exception
 from esi_leap.common import flocx_market
-from esi_leap.common import statuses
 import esi_leap.conf
+from esi_leap.db import api as dbapi
+from esi_leap.manager import hash_ring
+from esi_leap.manager import publisher
+from esi_leap.manager import scheduler
 from esi_leap.manager import utils
 from esi_leap.objects import contract
+from esi_leap.objects import flocx_market_client
 from esi_leap.objects import offer
+from esi_leap.resource_objects import resource_object_factory as ro_factory
 from oslo_context import context as ctx
 from oslo_log import log as logging
 import oslo_messaging as messaging
@@ -31,11 +39,16 @@ LOG = logging.getLogger(__name__)
 class ManagerService(service.Service):
     def __init__(self):
         super(ManagerService, self).__init__()
+        self._scheduler = scheduler.DeadlineScheduler()
+        self._publisher = publisher.OfferPublisher()
+        self._hash_ring = hash_ring.HashRingManager(CONF.host)
+        self._pool = eventlet.GreenPool(CONF.manager.workers)
+        self._semaphores = {}
         LOG.info("Creating esi-leap manager RPC server")
         self._server = messaging.get_rpc_server(
             target=utils.get_target(),
             transport=messaging.get_rpc_transport(CONF),
-            endpoints=[ManagerEndpoint()],
+            endpoints=[ManagerEndpoint(self._scheduler)],
             executor='eventlet',
         )
         self._context = ctx.RequestContext(
@@ -48,66 +61,246 @@ class ManagerService(service.Service):
         super(ManagerService, self).start()
         LOG.info("Starting esi-leap manager RPC server")
         self.tg.add_thread(self._server.start)
-        LOG.info("Starting _fulfill_contracts periodic job")
-        self.tg.add_timer(EVENT_INTERVAL, self._fulfill_contracts)
-        LOG.info("Starting _expire_contracts periodic job")
-        self.tg.add_timer(EVENT_INTERVAL, self._expire_contracts)
-        LOG.info("Starting _expire_offers periodic job")
-        self.tg.add_timer(EVENT_INTERVAL, self._expire_offers)
+        LOG.info("Joining manager hash ring")
+        self._heartbeat()
+        self.tg.add_timer(CONF.manager.heartbeat_interval, self._heartbeat,
+                          initial_delay=CONF.manager.heartbeat_interval)
+        LOG.info("Starting deadline scheduler")
+        self._scheduler.add_job(
+            '_fulfill_contracts', self._fulfill_contracts,
+            lambda limit: contract.Contract.get_next_start_dates(
+                self._context, limit, shard=self._hash_ring.get_shard()))
+        self._scheduler.add_job(
+            '_expire_contracts', self._expire_contracts,
+            lambda limit: contract.Contract.get_next_end_dates(
+                self._context, limit, shard=self._hash_ring.get_shard()))
+        self._scheduler.add_job(
+            '_expire_offers', self._expire_offers,
+            lambda limit: offer.Offer.get_next_end_dates(
+                self._context, limit, shard=self._hash_ring.get_shard()))
+        self._scheduler.add_job(
+            '_publish_offers', self._publish_offers,
+            lambda limit: self._publisher.get_next_attempt_dates(
+                self._context, limit, shard=self._hash_ring.get_shard()))
+        self.tg.add_thread(self._scheduler.run)
         LOG.info("Starting _retrieve_contracts periodic job")
         self.tg.add_timer(EVENT_INTERVAL, self._retrieve_contracts)
 
     def stop(self):
+        self._scheduler.stop()
+        LOG.info("Leaving manager hash ring")
+        try:
+            self._hash_ring.leave(self._context)
+        except Exception:
+            LOG.exception("Failed to leave manager hash ring")
         super(ManagerService, self).stop()
         LOG.info("Shutting down esi-leap manager RPC server")
         self._server.stop()
 
+    def reset(self):
+        super(ManagerService, self).reset()
+        flocx_market_client.reset_flocx_market_client()
+
+    def _heartbeat(self):
+        try:
+            if self._hash_ring.heartbeat(self._context):
+                # our share of offers and contracts changed
+                self._scheduler.wake()
+        except Exception:
+            LOG.exception("Failed to write manager heartbeat")
+
+    def _publish_offers(self):
+        LOG.info("Publishing new offers to marketplace")
+        self._publisher.publish(self._context,
+                                shard=self._hash_ring.get_shard())
+
+    def _get_semaphore(self, resource_type):
+        if resource_type not in self._semaphores:
+            self._semaphores[resource_type] = semaphore.Semaphore(
+                CONF.manager.workers_per_resource_type)
+        return self._semaphores[resource_type]
+
+    def _run_batch(self, action, items):
+        """Run action on each (item, resource_type) pair in the worker pool.
+
+        Concurrency is capped by [manager]workers overall and by
+        [manager]workers_per_resource_type per resource type. An item that
+        fails is logged and does not stop the rest of the batch. An item
+        that another manager changed first is skipped and is not counted
+        as a failure. The database work for each item is done in a single
+        transaction, which is rolled back if the item fails.
+
+        :returns: the items that failed.
+        """
+        def _run(item, resource_type):
+            with self._get_semaphore(resource_type):
+                try:
+                    with dbapi.transaction(self._context):
+                        action(item)
+                except (exception.ContractStatusConflict,
+                        exception.OfferStatusConflict) as e:
+                    LOG.info("Skipping %s %s: %s",
+                             item.obj_name(), item.uuid, e)
+                except Exception:
+                    LOG.exception("Failed to process %s %s",
+                                  item.obj_name(), item.uuid)
+                    return item
+            return None
+
+        return [item for item in self._pool.starmap(_run, items) if item]
+
+    def _run_due(self, get_due, prepare, action, failure_msg):
+        """Process due items one batch at a time until none are left.
+
+        Items that fail are still due. They are left out of the following
+        batches of this run and tried again by a later run. The run stops
+        early if a whole batch fails, which usually means that a backend
+        is down.
+
+        :param get_due: called with a limit and a list of uuids to leave
+                        out; returns the next batch of due items
+        :param prepare: turns a batch into (item, resource_type) pairs; it
+                        may leave items out, which count as failed
+        :param failure_msg: logged with the numbers of failed and of all
+                            items in a batch
+        """
+        batch_size = CONF.manager.batch_size
+        failed_uuids = []
+        while True:
+            items = get_due(batch_size, failed_uuids)
+            batch = prepare(items)
+            done = set(item.uuid for item, _ in batch)
+            done -= set(item.uuid for item in self._run_batch(action, batch))
+            failed = [item.uuid for item in items if item.uuid not in done]
+            if failed:
+                LOG.warning(failure_msg, len(failed), len(items))
+            if len(items) < batch_size or len(failed) == len(items):
+                break
+            failed_uuids = failed_uuids + failed
+
+    def _prefetch_resources(self, offers):
+        """Load the resources behind a batch, one request per type.
+
+        Resource backends cache what they load, so the per-item work that
+        follows does not need to fetch each resource again.
+        """
+        resource_uuids = {}
+        for o in offers:
+            resource_uuids.setdefault(o.resource_type, set()).add(
+                o.resource_uuid)
+        for resource_type, uuids in resource_uuids.items():
+            try:
+                ro_factory.ResourceObjectFactory.get_resource_objects(
+                    resource_type, list(uuids))
+            except Exception:
+                LOG.exception("Failed to load %s resources", resource_type)
+
+    def _prepare_offer_batch(self, offers):
+        self._prefetch_resources(offers)
+        return [(o, o.resource_type) for o in offers]
+
+    def _prepare_contract_batch(self, contracts):
+        """Pair contracts with the resource type of their offer.
+
+        Contracts whose offer cannot be found are logged and left out.
+        """
+        # the contract queries load each contract's offer along with it
+        offers = {}
+        batch = []
+        for c in contracts:
+            if c.offer_uuid not in offers:
+                try:
+                    offers[c.offer_uuid] = c.get_offer(self._context)
+                except exception.OfferNotFound:
+                    offers[c.offer_uuid] = None
+            o = offers[c.offer_uuid]
+            if o is None:
+                LOG.error("Skipping contract %s: offer %s not found",
+                          c.uuid, c.offer_uuid)
+                continue
+            # contracts of the same offer share it rather than each
+            # loading their own when they are processed
+            c._offer = o
+            batch.append((c, o.resource_type))
+        self._prefetch_resources([o for o in offers.values() if o])
+        return batch
+
+    def _fulfill_contract(self, c):
+        LOG.info("Fulfilling contract %s", c.uuid)
+        c.fulfill(self._context)
+
     def _fulfill_contracts(self):
         LOG.info("Checking for contracts to fulfill")
-        contracts = contract.Contract.get_all_by_status(
-            self._context, statuses.OPEN)
-        for c in contracts:
-            if c.start_date and \
-               c.start_date <= timeutils.utcnow():
-                LOG.info("Fulfilling contract %s", c.uuid)
-                c.fulfill(self._context)
+        self._run_due(
+            lambda limit, exclude: contract.Contract.get_due_for_fulfillment(
+                self._context, timeutils.utcnow(), limit=limit,
+                shard=self._hash_ring.get_shard(), exclude=exclude),
+            self._prepare_contract_batch, self._fulfill_contract,
+            "Failed to fulfill %d of %d contracts")
 
     def _retrieve_contracts(self):
         LOG.info("Checking for new contracts in marketplace")
-        contracts = flocx_market.retrieve_from_flocx_market(self._context)
-        for c in contracts:
-            co = contract.Contract(self._context, **c)
-            co.create(self._context)
+        marketplace_client = flocx_market.get_flocx_market_client()
+        contracts = flocx_market.get_contracts(self._context,
+                                               marketplace_client)
+        # other managers pick up the contracts outside our shard
+        contracts = [c for c in contracts
+                     if self._hash_ring.is_mine(c['offer_uuid'])]
+        if not contracts:
+            return
+
+        # contracts another manager imported first are left out
+        contracts = contract.Contract.bulk_create(
+            self._context,
+            [contract.Contract(self._context, **c) for c in contracts])
+        for co in contracts:
             LOG.info("Creating contract %s", co.uuid)
-            o_c_r_id = c["marketplace_offer_contract_relationship_id"]
-            res_status_code = flocx_market.update_flocx_market_contract(
-                o_c_r_id)
+        self._scheduler.wake()
+
+        res_status_codes = flocx_market.update_contracts(
+            [co.marketplace_offer_contract_relationship_id
+             for co in contracts],
+            marketplace_client)
+        for o_c_r_id, res_status_code in res_status_codes.items():
             if res_status_code == 200:
                 LOG.info(
                     "Updating offer contract pair in marketplace for offer %s",
                     o_c_r_id)
 
+    def _expire_contract(self, c):
+        LOG.info("Expiring contract %s", c.uuid)
+        c.expire(self._context)
+
     def _expire_contracts(self):
         LOG.info("Checking for expiring contracts")
-        contracts = contract.Contract.get_all_by_status(
-            self._context, statuses.FULFILLED)
-        for c in contracts:
-            if c.end_date and \
-               c.end_date <= timeutils.utcnow():
-                LOG.info("Expiring contract %s", c.uuid)
-                c.expire(self._context)
+        self._run_due(
+            lambda limit, exclude: contract.Contract.get_expiring(
+                self._context, timeutils.utcnow(), limit=limit,
+                shard=self._hash_ring.get_shard(), exclude=exclude),
+            self._prepare_contract_batch, self._expire_contract,
+            "Failed to expire %d of %d contracts")
+
+    def _expire_offer(self, o):
+        LOG.info("Expiring offer %s for %s %s",
+                 o.uuid, o.resource_type, o.resource_uuid)
+        o.expire(self._context)
 
     def _expire_offers(self):
         LOG.info("Checking for expiring offers")
-        offers = offer.Offer.get_all_by_status(
-            self._context, statuses.AVAILABLE)
-        for o in offers:
-            if o.end_date and \
-               o.end_date <= timeutils.utcnow():
-                LOG.info("Expiring offer %s for %s %s",
-                         o.uuid, o.resource_type, o.resource_uuid)
-                o.expire(self._context)
+        self._run_due(
+            lambda limit, exclude: offer.Offer.get_expiring(
+                self._context, timeutils.utcnow(), limit=limit,
+                shard=self._hash_ring.get_shard(), exclude=exclude),
+            self._prepare_offer_batch, self._expire_offer,
+            "Failed to expire %d of %d offers")
 
 
 class ManagerEndpoint(object):
     target = utils.get_target()
+
+    def __init__(self, scheduler):
+        self._scheduler = scheduler
+
+    def reschedule(self, context):
+        """Reload deadlines after an offer or contract changed."""
+        self._scheduler.wake()
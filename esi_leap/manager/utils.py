@@ -17,7 +17,7 @@ import esi_leap.conf
 
 CONF = esi_leap.conf.CONF
 NAMESPACE = 'manager.api'
-RPC_API_VERSION = '1.0'
+RPC_API_VERSION = '1.1'
 TOPIC = 'esi_leap.manager'
 
 
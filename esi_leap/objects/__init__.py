@@ -1,3 +1,4 @@
 def register_all():
+    __import__('esi_leap.objects.change')
     __import__('esi_leap.objects.contract')
     __import__('esi_leap.objects.offer')
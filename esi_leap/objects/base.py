@@ -17,6 +17,11 @@ from esi_leap.objects import fields as object_fields
 
 LOG = log.getLogger(__name__)
 
+# where VersionedObject keeps a field's value; newer releases of
+# oslo.versionedobjects only have the underscored name
+get_attrname = getattr(object_base, 'get_attrname', None) or \
+    object_base._get_attrname
+
 
 class ESILEAPObject(object_base.VersionedObject):
     OBJ_SERIAL_NAMESPACE = 'esi_leap_object'
@@ -27,17 +32,43 @@ class ESILEAPObject(object_base.VersionedObject):
         'updated_at': object_fields.DateTimeField(nullable=True),
     }
 
+    @classmethod
+    def _get_field_attrs(cls):
+        """Return (name, attribute name, native type) for each field.
+
+        Built once per class, as it is needed for every row loaded. The
+        attribute name is where VersionedObject keeps the field's value.
+        """
+        if '_field_attrs' not in cls.__dict__:
+            cls._field_attrs = [
+                (key, get_attrname(key),
+                 getattr(field, 'native_type', None))
+                for key, field in cls.fields.items()]
+        return cls._field_attrs
+
     @staticmethod
-    def _from_db_object(context, obj, db_obj):
-        for key in obj.fields:
-            setattr(obj, key, db_obj[key])
-            obj.obj_reset_changes()
+    def _from_db_object(context, obj, db_obj, fields=None):
+        """Set the fields of obj from a database row.
+
+        :param fields: the fields loaded in the row, if not all of them.
+                       The other fields are left unset.
+        """
+        for key, attrname, native_type in type(obj)._get_field_attrs():
+            if fields is not None and key not in fields:
+                continue
+            value = db_obj[key]
+            if type(value) is native_type:
+                # coercing would only return the same value
+                setattr(obj, attrname, value)
+            else:
+                setattr(obj, key, value)
+        obj.obj_reset_changes()
         obj._context = context
         return obj
 
     @classmethod
-    def _from_db_object_list(cls, context, db_objs):
-        return [cls._from_db_object(context, cls(), db_obj)
+    def _from_db_object_list(cls, context, db_objs, fields=None):
+        return [cls._from_db_object(context, cls(), db_obj, fields)
                 for db_obj in db_objs]
 
     def to_dict(self):
@@ -47,6 +78,7 @@ class ESILEAPObject(object_base.VersionedObject):
                 attr = attr.as_dict()
             return attr
 
-        return dict((k, getattr(self, k))
-                    for k in self.fields
-                    if self.obj_attr_is_set(k))
+        values = self.__dict__
+        return dict((k, values[attrname])
+                    for k, attrname, native_type in self._get_field_attrs()
+                    if attrname in values)
@@ -0,0 +1,48 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from esi_leap.db import api as dbapi
+from esi_leap.objects import base
+from esi_leap.objects import fields
+from oslo_versionedobjects import base as versioned_objects_base
+
+
+@versioned_objects_base.VersionedObjectRegistry.register
+class Change(base.ESILEAPObject):
+    dbapi = dbapi.get_instance()
+
+    fields = {
+        'id': fields.IntegerField(),
+        'resource_type': fields.StringField(),
+        'resource_uuid': fields.UUIDField(),
+        'project_id': fields.StringField(),
+        'action': fields.StringField(),
+        'status': fields.StringField(),
+    }
+
+    @classmethod
+    def get_latest_id(cls, context):
+        return cls.dbapi.change_get_latest_id(context)
+
+    @classmethod
+    def get_all(cls, context, since, limit=None):
+        db_changes = cls.dbapi.change_get_all(context, since, limit=limit)
+        return cls._from_db_object_list(context, db_changes)
+
+    @classmethod
+    def destroy_older_than(cls, context, before, batch_size):
+        """Delete the changes created before a time.
+
+        :returns: the number of changes deleted
+        """
+        return cls.dbapi.change_destroy_older_than(context, before,
+                                                   batch_size)
@@ -10,12 +10,14 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+from esi_leap.common import exception
 from esi_leap.common import statuses
 from esi_leap.db import api as dbapi
 from esi_leap.objects import base
 from esi_leap.objects import fields
 import esi_leap.objects.offer
 from oslo_config import cfg
+from oslo_utils import excutils
 from oslo_versionedobjects import base as versioned_objects_base
 
 CONF = cfg.CONF
@@ -24,6 +26,7 @@ CONF = cfg.CONF
 @versioned_objects_base.VersionedObjectRegistry.register
 class Contract(base.ESILEAPObject):
     dbapi = dbapi.get_instance()
+    _offer = None
 
     fields = {
         'id': fields.IntegerField(),
@@ -37,15 +40,48 @@ class Contract(base.ESILEAPObject):
         'marketplace_offer_contract_relationship_id': fields.UUIDField()
     }
 
+    @staticmethod
+    def _from_db_object(context, obj, db_obj, fields=None):
+        base.ESILEAPObject._from_db_object(context, obj, db_obj, fields)
+        # keep the offer if the query loaded it along with the contract;
+        # the DB API's dicts carry it under 'offer'
+        if isinstance(db_obj, dict):
+            db_offer = db_obj.get('offer')
+        else:
+            db_offer = getattr(db_obj, 'loaded_offer', None)
+        if db_offer is not None:
+            obj._offer = esi_leap.objects.offer.Offer._from_db_object(
+                context, esi_leap.objects.offer.Offer(), db_offer)
+        return obj
+
     @classmethod
     def get(cls, context, contract_uuid):
         db_contract = cls.dbapi.contract_get(context, contract_uuid)
         return cls._from_db_object(context, cls(), db_contract)
 
     @classmethod
-    def get_all(cls, context):
-        db_contracts = cls.dbapi.contract_get_all(context)
-        return cls._from_db_object_list(context, db_contracts)
+    def get_all(cls, context, filters=None, limit=None, marker=None,
+                sort_key=None, sort_dir=None, fields=None):
+        db_contracts = cls.dbapi.contract_get_all(
+            context, filters=filters, limit=limit, marker=marker,
+            sort_key=sort_key, sort_dir=sort_dir, fields=fields)
+        return cls._from_db_object_list(context, db_contracts, fields)
+
+    @classmethod
+    def get_revision(cls, context, contract_uuid):
+        """Return a counter that changes whenever the contract does."""
+        return cls.dbapi.contract_get_revision(context, contract_uuid)
+
+    @classmethod
+    def get_all_revision(cls, context, filters=None):
+        """Return a value that changes whenever the matching contracts do."""
+        return cls.dbapi.contract_get_all_revision(context, filters=filters)
+
+    @classmethod
+    def export(cls, context, filters=None, batch_size=None):
+        """Return a generator over all matching contracts, as plain dicts."""
+        return cls.dbapi.contract_export(context, filters=filters,
+                                         batch_size=batch_size)
 
     @classmethod
     def get_all_by_project_id(cls, context, project_id):
@@ -65,11 +101,57 @@ class Contract(base.ESILEAPObject):
             context, status)
         return cls._from_db_object_list(context, db_contracts)
 
+    @classmethod
+    def get_due_for_fulfillment(cls, context, now, limit=None, shard=None,
+                                exclude=None):
+        db_contracts = cls.dbapi.contract_get_due_for_fulfillment(
+            context, now, limit=limit, shard=shard, exclude=exclude)
+        return cls._from_db_object_list(context, db_contracts)
+
+    @classmethod
+    def get_expiring(cls, context, now, limit=None, shard=None,
+                     exclude=None):
+        db_contracts = cls.dbapi.contract_get_expiring(
+            context, now, limit=limit, shard=shard, exclude=exclude)
+        return cls._from_db_object_list(context, db_contracts)
+
+    @classmethod
+    def get_next_start_dates(cls, context, limit, shard=None):
+        return cls.dbapi.contract_get_next_start_dates(context, limit,
+                                                       shard=shard)
+
+    @classmethod
+    def get_next_end_dates(cls, context, limit, shard=None):
+        return cls.dbapi.contract_get_next_end_dates(context, limit,
+                                                     shard=shard)
+
     def create(self, context=None):
         updates = self.obj_get_changes()
         db_contract = self.dbapi.contract_create(context, updates)
         self._from_db_object(context, self, db_contract)
 
+    @classmethod
+    def bulk_create(cls, context, contracts):
+        """Create several contracts in a single transaction.
+
+        Contracts whose marketplace offer contract relationship was
+        already imported are not created again.
+
+        :returns: the contracts created
+        """
+        db_contracts = cls.dbapi.contract_bulk_create(
+            context, [c.obj_get_changes() for c in contracts])
+        db_contracts = dict(
+            (db_c['marketplace_offer_contract_relationship_id'], db_c)
+            for db_c in db_contracts)
+        created = []
+        for c in contracts:
+            db_contract = db_contracts.pop(
+                c.marketplace_offer_contract_relationship_id, None)
+            if db_contract is not None:
+                created.append(cls._from_db_object(context, c, db_contract))
+        return created
+
     def destroy(self, context=None):
         self.dbapi.contract_destroy(context, self.uuid)
         self.obj_reset_changes()
@@ -80,25 +162,51 @@ class Contract(base.ESILEAPObject):
             context, self.uuid, updates)
         self._from_db_object(context, self, db_contract)
 
+    def _set_status(self, context, from_status, to_status):
+        """Move the contract to to_status if it is still in from_status.
+
+        :raises: ContractStatusConflict if another manager changed the
+                 status first.
+        """
+        if not self.dbapi.contract_bulk_update_status(
+                context, [self.uuid], from_status, to_status):
+            raise exception.ContractStatusConflict(contract_uuid=self.uuid,
+                                                   status=from_status)
+        self.status = to_status
+        self.obj_reset_changes(['status'])
+
+    def get_offer(self, context=None):
+        """Return the offer of this contract, loading it at most once."""
+        if self._offer is None:
+            self._offer = esi_leap.objects.offer.Offer.get(
+                context, self.offer_uuid)
+        return self._offer
+
+    def resource_object(self, context=None):
+        return self.get_offer(context).resource_object()
+
     def fulfill(self, context=None):
-        # fulfill resource
-        o = esi_leap.objects.offer.Offer.get(
-            context, self.offer_uuid)
-        resource = o.resource_object()
-        resource.set_contract(self)
+        # claim contract before touching the resource
+        self._set_status(context, statuses.OPEN, statuses.FULFILLED)
 
-        # expire contract
-        self.status = statuses.FULFILLED
-        self.save(context)
+        # fulfill resource
+        try:
+            resource = self.resource_object(context)
+            resource.set_contract(self)
+        except Exception:
+            with excutils.save_and_reraise_exception():
+                self._set_status(context, statuses.FULFILLED, statuses.OPEN)
 
     def expire(self, context=None):
+        # claim contract before touching the resource
+        status = self.status
+        self._set_status(context, status, statuses.EXPIRED)
+
         # unassign resource
-        o = esi_leap.objects.offer.Offer.get(
-            context, self.offer_uuid)
-        resource = o.resource_object()
-        if resource.get_contract_uuid() == self.uuid:
-            resource.set_contract(None)
-
-        # expire contract
-        self.status = statuses.EXPIRED
-        self.save(context)
+        try:
+            resource = self.resource_object(context)
+            if resource.get_contract_uuid() == self.uuid:
+                resource.set_contract(None)
+        except Exception:
+            with excutils.save_and_reraise_exception():
+                self._set_status(context, statuses.EXPIRED, status)
@@ -11,12 +11,22 @@
 #    under the License.
 
 import ast
+import datetime
+import json
 import six
 
 from oslo_versionedobjects import fields as object_fields
 
 
+# Fields that set native_type take values of exactly that type, as read
+# from the database, without coercing them again; see
+# ESILEAPObject._from_db_object.
+
+
 class DateTimeField(object_fields.DateTimeField):
+    # naive, like the DateTime columns return them
+    native_type = datetime.datetime
+
     def __init__(self, **kwargs):
         super(DateTimeField, self).__init__(False, **kwargs)
 
@@ -26,12 +36,17 @@ class FlexibleDict(object_fields.FieldType):
     @staticmethod
     def coerce(obj, attr, value):
         if isinstance(value, six.string_types):
-            value = ast.literal_eval(value)
+            try:
+                value = json.loads(value)
+            except ValueError:
+                # legacy values stored as a python repr
+                value = ast.literal_eval(value)
         return dict(value)
 
 
 class FlexibleDictField(object_fields.AutoTypedField):
     AUTO_TYPE = FlexibleDict()
+    native_type = dict
 
     def _null(self, obj, attr):
         if self.nullable:
@@ -40,7 +55,7 @@ class FlexibleDictField(object_fields.AutoTypedField):
 
 
 class IntegerField(object_fields.IntegerField):
-    pass
+    native_type = int
 
 
 class ListOfObjectsField(object_fields.ListOfObjectsField):
@@ -52,7 +67,7 @@ class ObjectField(object_fields.ObjectField):
 
 
 class StringField(object_fields.StringField):
-    pass
+    native_type = six.text_type
 
 
 class UUIDField(object_fields.UUIDField):
@@ -11,10 +11,52 @@
 #    under the License.
 # borrowed from Nova
 import esi_leap.conf
+from keystoneauth1 import adapter
+from keystoneauth1 import loading as ks_loading
+from keystoneauth1 import session as ks_session
 from oslo_log import log as logging
+from oslo_middleware import request_id
+import requests
 
 LOG = logging.getLogger(__name__)
 CONF = esi_leap.conf.CONF
+_cached_flocx_market_client = None
+
+
+def get_flocx_market_client():
+    """Return the process-wide flocx-market client.
+
+    The client's keystone session keeps its token until it expires and
+    keeps HTTP connections to flocx-market alive between requests.
+    """
+    global _cached_flocx_market_client
+    if _cached_flocx_market_client is not None:
+        return _cached_flocx_market_client
+
+    http_adapter = ks_session.TCPKeepAliveAdapter(
+        pool_maxsize=CONF.flocx_market.max_concurrent_requests)
+    http_session = requests.Session()
+    http_session.mount('http://', http_adapter)
+    http_session.mount('https://', http_adapter)
+
+    auth_plugin = ks_loading.load_auth_from_conf_options(
+        CONF, 'flocx_market')
+    sess = ks_loading.load_session_from_conf_options(CONF, 'flocx_market',
+                                                     auth=auth_plugin,
+                                                     session=http_session)
+    adpt = adapter.Adapter(
+        session=sess,
+        service_type='marketplace',
+        interface='public')
+    _cached_flocx_market_client = FlocxMarketClient(adpt)
+
+    return _cached_flocx_market_client
+
+
+def reset_flocx_market_client():
+    """Drop the cached client, so the next one uses fresh configuration."""
+    global _cached_flocx_market_client
+    _cached_flocx_market_client = None
 
 
 class FlocxMarketClient(object):
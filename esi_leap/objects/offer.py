@@ -11,6 +11,7 @@
 #    under the License.
 
 import datetime
+from esi_leap.common import exception
 from esi_leap.common import statuses
 from esi_leap.db import api as dbapi
 from esi_leap.objects import base
@@ -18,8 +19,6 @@ import esi_leap.objects.contract
 from esi_leap.objects import fields
 from esi_leap.objects import flocx_market_client
 from esi_leap.resource_objects import resource_object_factory as ro_factory
-from keystoneauth1 import adapter
-from keystoneauth1 import loading as ks_loading
 from oslo_config import cfg
 from oslo_versionedobjects import base as versioned_objects_base
 
@@ -29,6 +28,7 @@ CONF = cfg.CONF
 @versioned_objects_base.VersionedObjectRegistry.register
 class Offer(base.ESILEAPObject):
     dbapi = dbapi.get_instance()
+    _resource = None
 
     fields = {
         'id': fields.IntegerField(),
@@ -48,9 +48,28 @@ class Offer(base.ESILEAPObject):
         return cls._from_db_object(context, cls(), db_offer)
 
     @classmethod
-    def get_all(cls, context):
-        db_offers = cls.dbapi.offer_get_all(context)
-        return cls._from_db_object_list(context, db_offers)
+    def get_all(cls, context, filters=None, limit=None, marker=None,
+                sort_key=None, sort_dir=None, fields=None):
+        db_offers = cls.dbapi.offer_get_all(
+            context, filters=filters, limit=limit, marker=marker,
+            sort_key=sort_key, sort_dir=sort_dir, fields=fields)
+        return cls._from_db_object_list(context, db_offers, fields)
+
+    @classmethod
+    def get_revision(cls, context, offer_uuid):
+        """Return a counter that changes whenever the offer does."""
+        return cls.dbapi.offer_get_revision(context, offer_uuid)
+
+    @classmethod
+    def get_all_revision(cls, context, filters=None):
+        """Return a value that changes whenever the matching offers do."""
+        return cls.dbapi.offer_get_all_revision(context, filters=filters)
+
+    @classmethod
+    def export(cls, context, filters=None, batch_size=None):
+        """Return a generator over all matching offers, as plain dicts."""
+        return cls.dbapi.offer_export(context, filters=filters,
+                                      batch_size=batch_size)
 
     @classmethod
     def get_all_by_project_id(cls, context, project_id):
@@ -64,18 +83,21 @@ class Offer(base.ESILEAPObject):
             context, status)
         return cls._from_db_object_list(context, db_offers)
 
+    @classmethod
+    def get_expiring(cls, context, now, limit=None, shard=None,
+                     exclude=None):
+        db_offers = cls.dbapi.offer_get_expiring(context, now, limit=limit,
+                                                 shard=shard, exclude=exclude)
+        return cls._from_db_object_list(context, db_offers)
+
+    @classmethod
+    def get_next_end_dates(cls, context, limit, shard=None):
+        return cls.dbapi.offer_get_next_end_dates(context, limit,
+                                                  shard=shard)
+
     def send_to_flocx_market(self):
-        auth_plugin = ks_loading.load_auth_from_conf_options(
-            CONF, 'flocx_market')
-        sess = ks_loading.load_session_from_conf_options(CONF, 'flocx_market',
-                                                         auth=auth_plugin)
         marketplace_offer_dict = self.to_marketplace_dict()
-
-        adpt = adapter.Adapter(
-            session=sess,
-            service_type='marketplace',
-            interface='public')
-        marketplace_client = flocx_market_client.FlocxMarketClient(adpt)
+        marketplace_client = flocx_market_client.get_flocx_market_client()
         res_status_code = marketplace_client.send_offer(marketplace_offer_dict)
 
         return res_status_code
@@ -83,8 +105,7 @@ class Offer(base.ESILEAPObject):
     def create(self, context=None):
         updates = self.obj_get_changes()
         db_offer = self.dbapi.offer_create(context, updates)
-        o = self._from_db_object(context, self, db_offer)
-        return o.send_to_flocx_market()
+        self._from_db_object(context, self, db_offer)
 
     def destroy(self, context=None):
         self.dbapi.offer_destroy(context, self.uuid)
@@ -97,20 +118,29 @@ class Offer(base.ESILEAPObject):
         self._from_db_object(context, self, db_offer)
 
     def resource_object(self):
-        return ro_factory.ResourceObjectFactory.get_resource_object(
-            self.resource_type, self.resource_uuid)
+        if self._resource is None:
+            self._resource = (
+                ro_factory.ResourceObjectFactory.get_resource_object(
+                    self.resource_type, self.resource_uuid))
+        return self._resource
 
     def expire(self, context=None):
-        # make sure all related contracts are expired
+        # unassign resource if a contract of this offer still holds it
         contracts = esi_leap.objects.contract.Contract.get_all_by_offer_uuid(
             context, self.uuid)
-        for c in contracts:
-            if c.status != statuses.EXPIRED:
-                c.expire(context)
-
-        # expire offer
+        active = set(c.uuid for c in contracts
+                     if c.status != statuses.EXPIRED)
+        if active:
+            resource = self.resource_object()
+            if resource.get_contract_uuid() in active:
+                resource.set_contract(None)
+
+        # expire offer and all related contracts
+        if not self.dbapi.offer_expire_with_contracts(context, [self.uuid]):
+            raise exception.OfferStatusConflict(offer_uuid=self.uuid,
+                                                status=self.status)
         self.status = statuses.EXPIRED
-        self.save(context)
+        self.obj_reset_changes(['status'])
 
     def to_marketplace_dict(self):
         # change fields name
@@ -11,12 +11,58 @@
 #    under the License.
 
 import json
+import os
+import stat
+import tempfile
 
 import esi_leap.conf
 
 
 CONF = esi_leap.conf.CONF
 DUMMY_NODE_DIR = CONF.dummy_node.dummy_node_dir
+_node_cache = {}
+
+
+def _get_file_key(st):
+    return (st.st_ino, st.st_mtime, st.st_size)
+
+
+def read_node(path):
+    """Return the parsed content of a node file.
+
+    Parsed files are cached per process and reused as long as the file's
+    inode, mtime and size are unchanged. The returned dict is shared and
+    must not be modified.
+    """
+    key = _get_file_key(os.stat(path))
+    cached = _node_cache.get(path)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    with open(path) as node_file:
+        node_dict = json.load(node_file)
+    _node_cache[path] = (key, node_dict)
+    return node_dict
+
+
+def write_node(path, node_dict):
+    """Atomically replace a node file.
+
+    The new content is written to a temporary file in the same directory
+    and renamed over the old file, so readers never see a partial file.
+    """
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(path),
+        prefix='.%s.' % os.path.basename(path))
+    try:
+        with os.fdopen(fd, 'w') as node_file:
+            json.dump(node_dict, node_file)
+        os.chmod(tmp_path, stat.S_IMODE(os.stat(path).st_mode))
+        os.rename(tmp_path, path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+    _node_cache[path] = (_get_file_key(os.stat(path)), node_dict)
 
 
 class DummyNode(object):
@@ -26,34 +72,28 @@ class DummyNode(object):
         self._path = DUMMY_NODE_DIR + "/" + uuid
 
     def get_contract_uuid(self):
-        with open(self._path) as node_file:
-            node_dict = json.load(node_file)
+        node_dict = read_node(self._path)
         return node_dict.get("contract_uuid", None)
 
     def get_project_id(self):
-        with open(self._path) as node_file:
-            node_dict = json.load(node_file)
+        node_dict = read_node(self._path)
         return node_dict.get("project_id", None)
 
     def get_node_config(self):
-        with open(self._path) as node_file:
-            node_dict = json.load(node_file)
+        node_dict = read_node(self._path)
         return node_dict.get("server_config", None)
 
     def set_contract(self, contract):
-        with open(self._path) as node_file:
-            node_dict = json.load(node_file)
+        node_dict = dict(read_node(self._path))
         if contract is None:
             node_dict.pop("contract_uuid", None)
             node_dict.pop("project_id", None)
         else:
             node_dict["contract_uuid"] = contract.uuid
             node_dict["project_id"] = contract.project_id
-        with open(self._path, 'w') as node_file:
-            json.dump(node_dict, node_file)
+        write_node(self._path, node_dict)
 
     def is_resource_admin(self, project_id):
-        with open(self._path) as node_file:
-            node_dict = json.load(node_file)
+        node_dict = read_node(self._path)
         project_owner_id = node_dict.get("project_owner_id", None)
         return (project_owner_id == project_id)
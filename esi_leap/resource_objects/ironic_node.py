@@ -10,15 +10,22 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
+import time
+
+import eventlet
 from keystoneauth1 import loading as ks_loading
 
 from ironicclient import client as ironic_client
+from ironicclient import exc as ironic_exc
 
 import esi_leap.conf
 
 
 CONF = esi_leap.conf.CONF
 _cached_ironic_client = None
+# uuid -> (expiry time, node), in the order the entries expire
+_node_cache = collections.OrderedDict()
 
 
 def get_ironic_client():
@@ -38,22 +45,133 @@ def get_ironic_client():
     return cli
 
 
+def get_node(node_uuid, refresh=False):
+    """Return an Ironic node, reusing it for [ironic]node_cache_ttl seconds.
+
+    :param refresh: fetch the node from Ironic even if it is cached
+    """
+    ttl = CONF.ironic.node_cache_ttl
+    now = time.time()
+    cached = None if refresh else _node_cache.get(node_uuid)
+    if cached is not None and cached[0] > now:
+        return cached[1]
+
+    node = get_ironic_client().node.get(node_uuid)
+    _node_cache.pop(node_uuid, None)
+    if ttl > 0:
+        _cache_node(node_uuid, node, now, ttl)
+    return node
+
+
+def _cache_node(node_uuid, node, now, ttl):
+    """Add a node to the cache, making room for it first.
+
+    Entries that have expired are dropped, and so are the oldest ones
+    beyond [ironic]node_cache_size.
+    """
+    while _node_cache:
+        expires, _ = next(iter(_node_cache.values()))
+        if (expires > now and
+                len(_node_cache) < CONF.ironic.node_cache_size):
+            break
+        _node_cache.popitem(last=False)
+    _node_cache[node_uuid] = (now + ttl, node)
+
+
+def _get_node_if_exists(node_uuid):
+    try:
+        return get_node(node_uuid)
+    except ironic_exc.NotFound:
+        return None
+
+
+def get_nodes(node_uuids):
+    """Return several Ironic nodes, keyed by uuid.
+
+    The Ironic API cannot filter a node listing by uuid. When more than
+    [ironic]node_list_threshold nodes are not cached, they are taken from
+    a single listing of all nodes; fewer are fetched one by one, up to
+    [ironic]node_fetch_concurrency at a time. Unknown uuids are left out.
+    """
+    now = time.time()
+    nodes = {}
+    missing = []
+    for node_uuid in set(node_uuids):
+        cached = _node_cache.get(node_uuid)
+        if cached is not None and cached[0] > now:
+            nodes[node_uuid] = cached[1]
+        else:
+            missing.append(node_uuid)
+
+    if len(missing) > CONF.ironic.node_list_threshold:
+        ttl = CONF.ironic.node_cache_ttl
+        missing = set(missing)
+        for node in get_ironic_client().node.list(
+                fields=['uuid', 'properties'], limit=0):
+            if node.uuid not in missing:
+                continue
+            nodes[node.uuid] = node
+            _node_cache.pop(node.uuid, None)
+            if ttl > 0:
+                _cache_node(node.uuid, node, now, ttl)
+        return nodes
+
+    pool = eventlet.GreenPool(CONF.ironic.node_fetch_concurrency)
+    for node_uuid, node in zip(missing,
+                               pool.imap(_get_node_if_exists, missing)):
+        if node is not None:
+            nodes[node_uuid] = node
+    return nodes
+
+
+def invalidate_node(node_uuid):
+    _node_cache.pop(node_uuid, None)
+
+
 class IronicNode(object):
 
-    def __init__(self, uuid):
+    def __init__(self, uuid, node=None):
         self._uuid = uuid
+        self._node = node
+        self._node_is_current = False
+
+    @classmethod
+    def get_resource_objects(cls, uuids):
+        if CONF.ironic.node_cache_ttl <= 0:
+            # nothing fetched now would be kept; fetch each node when used
+            return dict((uuid, cls(uuid)) for uuid in uuids)
+        nodes = get_nodes(uuids)
+        return dict((uuid, cls(uuid, node=nodes[uuid]))
+                    for uuid in uuids if uuid in nodes)
+
+    def _get_node(self):
+        if self._node is None:
+            self._node = get_node(self._uuid)
+        return self._node
+
+    def _get_current_node(self):
+        """Return the node as Ironic has it, fetched once per instance.
+
+        The node's contract may have been changed by another manager or
+        an operator since it was cached, so it is read from Ironic before
+        deciding whether to change it.
+        """
+        if not self._node_is_current:
+            self._node = get_node(self._uuid, refresh=True)
+            self._node_is_current = True
+        return self._node
 
     def get_contract_uuid(self):
-        node = get_ironic_client().node.get(self._uuid)
+        node = self._get_current_node()
         return node.properties.get('contract_uuid', None)
 
     def get_project_id(self):
-        node = get_ironic_client().node.get(self._uuid)
+        node = self._get_current_node()
         return node.properties.get('project_id', None)
 
     def get_node_config(self):
-        node = get_ironic_client().node.get(self._uuid)
-        config = node.properties
+        node = self._get_node()
+        config = dict(node.properties)
         config.pop('contract_uuid', None)
         config.pop('project_id', None)
         config.pop('project_owner_id', None)
@@ -84,9 +202,14 @@ class IronicNode(object):
                 "value": contract.project_id,
             })
         if len(patches) > 0:
-            get_ironic_client().node.update(self._uuid, patches)
+            try:
+                get_ironic_client().node.update(self._uuid, patches)
+            finally:
+                self._node = None
+                self._node_is_current = False
+                invalidate_node(self._uuid)
 
     def is_resource_admin(self, project_id):
-        node = get_ironic_client().node.get(self._uuid)
+        node = self._get_node()
         project_owner_id = node.properties.get('project_owner_id', None)
         return (project_owner_id == project_id)
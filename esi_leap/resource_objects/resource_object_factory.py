@@ -10,22 +10,45 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+from stevedore import driver
+from stevedore import exception as stevedore_exception
+
 from esi_leap.common import exception
-from esi_leap.resource_objects import dummy_node
-from esi_leap.resource_objects import ironic_node
-from esi_leap.resource_objects import test_node
 
-RESOURCE_TYPES = ['ironic_node', 'dummy_node', 'test_node']
+# Resource types are registered as entry points in this namespace; the
+# module implementing a type is only imported the first time it is used.
+RESOURCE_TYPES_NAMESPACE = 'esi_leap.resource_object_types'
+_resource_classes = {}
+
+
+def get_resource_class(resource_type):
+    """Return the class implementing a resource type, loading it once."""
+    resource_class = _resource_classes.get(resource_type)
+    if resource_class is None:
+        try:
+            resource_class = driver.DriverManager(
+                RESOURCE_TYPES_NAMESPACE, resource_type).driver
+        except stevedore_exception.NoMatches:
+            raise exception.ResourceTypeUnknown(resource_type=resource_type)
+        _resource_classes[resource_type] = resource_class
+    return resource_class
 
 
 class ResourceObjectFactory(object):
 
     @staticmethod
     def get_resource_object(resource_type, resource_uuid):
-        if resource_type == 'ironic_node':
-            return ironic_node.IronicNode(resource_uuid)
-        elif resource_type == 'dummy_node':
-            return dummy_node.DummyNode(resource_uuid)
-        elif resource_type == 'test_node':
-            return test_node.TestNode(resource_uuid)
-        raise exception.ResourceTypeUnknown(resource_type=resource_type)
+        return get_resource_class(resource_type)(resource_uuid)
+
+    @staticmethod
+    def get_resource_objects(resource_type, resource_uuids):
+        """Return resource objects of one type, keyed by uuid.
+
+        Resource classes providing a get_resource_objects class method
+        load all the resources in bulk.
+        """
+        resource_class = get_resource_class(resource_type)
+        if hasattr(resource_class, 'get_resource_objects'):
+            return resource_class.get_resource_objects(resource_uuids)
+        return dict((resource_uuid, resource_class(resource_uuid))
+                    for resource_uuid in resource_uuids)
@@ -0,0 +1,162 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import json
+import os
+import sqlite3
+
+from esi_leap.common import exception
+import esi_leap.conf
+
+
+CONF = esi_leap.conf.CONF
+# stay below SQLite's default limit of 999 bound parameters per statement
+CHUNK_SIZE = 500
+_cached_connection = None
+
+_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS nodes (
+        uuid TEXT PRIMARY KEY,
+        project_owner_id TEXT,
+        project_id TEXT,
+        contract_uuid TEXT,
+        server_config TEXT
+    )""",
+    """CREATE INDEX IF NOT EXISTS nodes_project_owner_id_idx
+        ON nodes (project_owner_id)""",
+    """CREATE INDEX IF NOT EXISTS nodes_contract_uuid_idx
+        ON nodes (contract_uuid)""",
+]
+
+
+def get_connection():
+    """Return this process' connection to the simulated node database.
+
+    The database uses write-ahead logging, so API workers and the manager
+    can read it while another process writes.
+    """
+    global _cached_connection
+    # connections must not be shared with processes forked after creation
+    if (_cached_connection is not None and
+            _cached_connection[0] == os.getpid()):
+        return _cached_connection[1]
+
+    conn = sqlite3.connect(CONF.sqlite_node.database_path, timeout=30,
+                           check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    with conn:
+        for statement in _SCHEMA:
+            conn.execute(statement)
+    _cached_connection = (os.getpid(), conn)
+    return conn
+
+
+def reset_connection():
+    global _cached_connection
+    if _cached_connection is not None:
+        _cached_connection[1].close()
+    _cached_connection = None
+
+
+def _chunks(items):
+    for i in range(0, len(items), CHUNK_SIZE):
+        yield items[i:i + CHUNK_SIZE]
+
+
+def get_nodes(node_uuids):
+    """Return the rows of several nodes, keyed by uuid."""
+    conn = get_connection()
+    rows = {}
+    for chunk in _chunks(list(set(node_uuids))):
+        query = 'SELECT * FROM nodes WHERE uuid IN (%s)' % ', '.join(
+            '?' * len(chunk))
+        for row in conn.execute(query, chunk):
+            rows[row['uuid']] = dict(row)
+    return rows
+
+
+class SqliteNode(object):
+
+    def __init__(self, uuid, row=None):
+        self._uuid = uuid
+        self._row = row
+
+    @classmethod
+    def get_resource_objects(cls, uuids):
+        rows = get_nodes(uuids)
+        return dict((uuid, cls(uuid, row=rows[uuid]))
+                    for uuid in uuids if uuid in rows)
+
+    @staticmethod
+    def create_nodes(nodes):
+        """Create or replace nodes in bulk.
+
+        :param nodes: dicts with a 'uuid' and, like dummy node files, a
+                      'project_owner_id' and a 'server_config' dict
+        """
+        conn = get_connection()
+        with conn:
+            conn.executemany(
+                'INSERT OR REPLACE INTO nodes '
+                '(uuid, project_owner_id, server_config) VALUES (?, ?, ?)',
+                [(n['uuid'], n.get('project_owner_id'),
+                  json.dumps(n.get('server_config'))) for n in nodes])
+
+    @staticmethod
+    def set_contracts(contracts):
+        """Assign contracts to several nodes in one transaction.
+
+        :param contracts: dict mapping node uuids to a contract, or to None
+                          to unassign the node
+        """
+        values = []
+        for node_uuid, contract in contracts.items():
+            if contract is None:
+                values.append((None, None, node_uuid))
+            else:
+                values.append((contract.uuid, contract.project_id,
+                               node_uuid))
+        conn = get_connection()
+        with conn:
+            conn.executemany(
+                'UPDATE nodes SET contract_uuid = ?, project_id = ? '
+                'WHERE uuid = ?', values)
+
+    def _get_row(self):
+        if self._row is None:
+            rows = get_nodes([self._uuid])
+            if self._uuid not in rows:
+                raise exception.ResourceNotFound(resource_type='sqlite_node',
+                                                 resource_uuid=self._uuid)
+            self._row = rows[self._uuid]
+        return self._row
+
+    def get_contract_uuid(self):
+        return self._get_row()['contract_uuid']
+
+    def get_project_id(self):
+        return self._get_row()['project_id']
+
+    def get_node_config(self):
+        server_config = self._get_row()['server_config']
+        if server_config is None:
+            return None
+        return json.loads(server_config)
+
+    def set_contract(self, contract):
+        self.set_contracts({self._uuid: contract})
+        self._row = None
+
+    def is_resource_admin(self, project_id):
+        return self._get_row()['project_owner_id'] == project_id
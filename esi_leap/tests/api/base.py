@@ -41,6 +41,11 @@ class APITestCase(base.DBTestCase):
         self.mock_context = self.patch_context.start()
         self.mock_context.return_value = self.context
 
+        self.patch_rpcapi = mock.patch(
+            'esi_leap.manager.rpcapi.ManagerRPCAPI', autospec=True)
+        self.mock_rpcapi = self.patch_rpcapi.start()
+        self.addCleanup(self.patch_rpcapi.stop)
+
     # borrowed from Ironic
     def get_json(self, path, expect_errors=False, headers=None,
                  extra_environ=None, q=None, path_prefix=PATH_PREFIX,
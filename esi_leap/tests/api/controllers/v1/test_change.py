@@ -0,0 +1,66 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+
+from esi_leap.api import change_watcher
+from esi_leap.api.controllers.v1 import change
+from esi_leap.common import statuses
+from esi_leap.tests.api.controllers.v1 import test_offer
+from esi_leap.tests.api import base as test_api_base
+
+
+class TestListChanges(test_api_base.APITestCase):
+
+    def setUp(self):
+        super(TestListChanges, self).setUp()
+        self.watcher = change_watcher.ChangeWatcher()
+        for patch in (mock.patch.object(change, '_WATCHER', self.watcher),
+                      mock.patch.object(change_watcher.eventlet, 'spawn')):
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_cursor(self):
+        data = self.get_json('/changes')
+        self.assertEqual([], data['changes'])
+
+        o = test_offer.create_test_offer(self.context)
+        o.status = statuses.EXPIRED
+        o.save(self.context)
+        self.watcher._poll()
+
+        data = self.get_json('/changes?since=%d' % data['cursor'])
+        self.assertEqual(
+            [('offer', o.uuid, 'create', statuses.AVAILABLE),
+             ('offer', o.uuid, 'update', statuses.EXPIRED)],
+            [(c['resource_type'], c['resource_uuid'], c['action'],
+              c['status']) for c in data['changes']])
+        self.assertEqual(data['changes'][-1]['id'], data['cursor'])
+
+    def test_timeout(self):
+        cursor = self.get_json('/changes')['cursor']
+
+        data = self.get_json('/changes?since=%d&timeout=0' % cursor)
+        self.assertEqual({'changes': [], 'cursor': cursor}, data)
+
+    def test_since_before_start(self):
+        o = test_offer.create_test_offer(self.context)
+
+        data = self.get_json('/changes?since=0&limit=1')
+        self.assertEqual([o.uuid],
+                         [c['resource_uuid'] for c in data['changes']])
+        self.assertEqual(data['changes'][0]['id'], data['cursor'])
+
+    def test_invalid_timeout(self):
+        response = self.get_json('/changes?since=0&timeout=-1',
+                                 expect_errors=True)
+        self.assertEqual(400, response.status_int)
@@ -9,7 +9,14 @@
 #    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
 #    License for the specific language governing permissions and limitations
 #    under the License.
+import csv
 import datetime
+import io
+import json
+
+from six.moves.urllib import parse as urlparse
+
+from esi_leap.common import statuses
 from esi_leap.objects import offer
 from esi_leap.tests.api import base as test_api_base
 import mock
@@ -43,3 +50,233 @@ class TestListOffers(test_api_base.APITestCase):
             o = create_test_offer(self.context)
             data = self.get_json('/offers')
             self.assertEqual(o.uuid, data['offers'][0]["uuid"])
+
+    def test_many_with_limit(self):
+        with mock.patch.object(
+                offer.Offer, 'send_to_flocx_market', autospec=True
+        ) as mock_send:
+            mock_send.return_value = 201
+            offers = [create_test_offer(self.context) for i in range(3)]
+            data = self.get_json('/offers?limit=2')
+            self.assertEqual([o.uuid for o in offers[:2]],
+                             [o['uuid'] for o in data['offers']])
+            self.assertIn('limit=2', data['next'])
+            self.assertIn('marker=%s' % offers[1].uuid, data['next'])
+
+    def test_marker(self):
+        with mock.patch.object(
+                offer.Offer, 'send_to_flocx_market', autospec=True
+        ) as mock_send:
+            mock_send.return_value = 201
+            offers = [create_test_offer(self.context) for i in range(3)]
+            data = self.get_json('/offers?limit=2&marker=%s' %
+                                 offers[1].uuid)
+            self.assertEqual([offers[2].uuid],
+                             [o['uuid'] for o in data['offers']])
+            self.assertNotIn('next', data)
+
+    def test_sort_dir(self):
+        with mock.patch.object(
+                offer.Offer, 'send_to_flocx_market', autospec=True
+        ) as mock_send:
+            mock_send.return_value = 201
+            offers = [create_test_offer(self.context) for i in range(3)]
+            data = self.get_json('/offers?sort_dir=desc')
+            self.assertEqual([o.uuid for o in reversed(offers)],
+                             [o['uuid'] for o in data['offers']])
+
+    def test_invalid_sort_dir(self):
+        response = self.get_json('/offers?sort_dir=sideways',
+                                 expect_errors=True)
+        self.assertEqual(400, response.status_int)
+
+    def test_invalid_limit(self):
+        response = self.get_json('/offers?limit=-1', expect_errors=True)
+        self.assertEqual(400, response.status_int)
+
+    def test_invalid_marker(self):
+        response = self.get_json('/offers?marker=bogus',
+                                 expect_errors=True)
+        self.assertEqual(400, response.status_int)
+
+    def test_filter_status(self):
+        with mock.patch.object(
+                offer.Offer, 'send_to_flocx_market', autospec=True
+        ) as mock_send:
+            mock_send.return_value = 201
+            o1 = create_test_offer(self.context)
+            o2 = create_test_offer(self.context)
+            o2.status = statuses.EXPIRED
+            o2.save(self.context)
+            data = self.get_json('/offers?status=%s' % statuses.AVAILABLE)
+            self.assertEqual([o1.uuid], [o['uuid'] for o in data['offers']])
+
+    def test_filter_time_range(self):
+        with mock.patch.object(
+                offer.Offer, 'send_to_flocx_market', autospec=True
+        ) as mock_send:
+            mock_send.return_value = 201
+            o = create_test_offer(self.context)
+            data = self.get_json(
+                '/offers?start_time=2016-07-01T00:00:00'
+                '&end_time=2016-09-01T00:00:00')
+            self.assertEqual([o.uuid], [x['uuid'] for x in data['offers']])
+            data = self.get_json('/offers?start_time=2016-08-01T00:00:00')
+            self.assertEqual([], data['offers'])
+
+    def test_fields(self):
+        with mock.patch.object(
+                offer.Offer, 'send_to_flocx_market', autospec=True
+        ) as mock_send:
+            mock_send.return_value = 201
+            offers = [create_test_offer(self.context) for i in range(2)]
+            data = self.get_json('/offers?fields=status,end_date&limit=1')
+            self.assertEqual(
+                [{'uuid': offers[0].uuid, 'status': statuses.AVAILABLE,
+                  'end_date': '2016-08-16T19:20:30'}],
+                data['offers'])
+            self.assertIn('fields=status%2Cend_date', data['next'])
+
+    def test_next_escaped(self):
+        with mock.patch.object(
+                offer.Offer, 'send_to_flocx_market', autospec=True
+        ) as mock_send:
+            mock_send.return_value = 201
+            offers = []
+            for i in range(2):
+                o = offer.Offer(resource_type='test_node',
+                                resource_uuid='a+b&c')
+                o.create(self.context)
+                offers.append(o)
+            data = self.get_json('/offers?resource_type=test_node'
+                                 '&resource_uuid=a%2Bb%26c&limit=1')
+
+            next_url = urlparse.urlsplit(data['next'])
+            self.assertEqual(
+                ['a+b&c'],
+                urlparse.parse_qs(next_url.query)['resource_uuid'])
+            data = self.get_json(
+                next_url.path[len(test_api_base.PATH_PREFIX):] + '?' +
+                next_url.query)
+            self.assertEqual([offers[1].uuid],
+                             [o['uuid'] for o in data['offers']])
+
+    def test_invalid_fields(self):
+        response = self.get_json('/offers?fields=uuid,bogus',
+                                 expect_errors=True)
+        self.assertEqual(400, response.status_int)
+
+    def test_filter_resource_uuid_requires_type(self):
+        response = self.get_json('/offers?resource_uuid=1234567890',
+                                 expect_errors=True)
+        self.assertEqual(400, response.status_int)
+
+
+class TestCreateOffer(test_api_base.APITestCase):
+
+    def test_reschedule_fails(self):
+        self.mock_rpcapi.return_value.reschedule.side_effect = Exception()
+
+        response = self.app.post_json(
+            test_api_base.PATH_PREFIX + '/offers',
+            {'resource_type': 'test_node', 'resource_uuid': '1234567890'})
+
+        self.assertEqual(200, response.status_int)
+        self.mock_rpcapi.return_value.reschedule.assert_called_once_with(
+            mock.ANY)
+        data = self.get_json('/offers')
+        self.assertEqual([response.json['uuid']],
+                         [o['uuid'] for o in data['offers']])
+
+
+class TestExportOffers(test_api_base.APITestCase):
+
+    def test_ndjson(self):
+        offers = [create_test_offer(self.context) for i in range(2)]
+
+        response = self.app.get(test_api_base.PATH_PREFIX + '/offers/export')
+
+        self.assertEqual('application/x-ndjson', response.content_type)
+        rows = [json.loads(line) for line in response.text.splitlines()]
+        self.assertEqual([o.uuid for o in offers], [r['uuid'] for r in rows])
+        self.assertEqual('2016-07-16T19:20:30', rows[0]['start_date'])
+
+    def test_csv(self):
+        o = create_test_offer(self.context)
+
+        response = self.app.get(test_api_base.PATH_PREFIX +
+                                '/offers/export?format=csv')
+
+        self.assertEqual('text/csv', response.content_type)
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        self.assertEqual([o.uuid], [r['uuid'] for r in rows])
+
+    def test_invalid_format(self):
+        response = self.app.get(test_api_base.PATH_PREFIX +
+                                '/offers/export?format=xml',
+                                expect_errors=True)
+        self.assertEqual(400, response.status_int)
+
+
+class TestOfferETags(test_api_base.APITestCase):
+
+    def test_get_one_not_modified(self):
+        o = create_test_offer(self.context)
+        path = test_api_base.PATH_PREFIX + '/offers/' + o.uuid
+
+        response = self.app.get(path)
+        etag = response.headers['ETag']
+
+        response = self.app.get(path, headers={'If-None-Match': etag})
+        self.assertEqual(304, response.status_int)
+        self.assertEqual(b'', response.body)
+        self.assertEqual(etag, response.headers['ETag'])
+
+    def test_get_one_modified(self):
+        o = create_test_offer(self.context)
+        path = test_api_base.PATH_PREFIX + '/offers/' + o.uuid
+        etag = self.app.get(path).headers['ETag']
+
+        o.status = statuses.EXPIRED
+        o.save(self.context)
+
+        response = self.app.get(path, headers={'If-None-Match': etag})
+        self.assertEqual(200, response.status_int)
+        self.assertEqual(statuses.EXPIRED, response.json['status'])
+        self.assertNotEqual(etag, response.headers['ETag'])
+
+    def test_get_all_not_modified(self):
+        create_test_offer(self.context)
+        path = test_api_base.PATH_PREFIX + '/offers'
+        etag = self.app.get(path).headers['ETag']
+
+        response = self.app.get(path, headers={'If-None-Match': etag})
+        self.assertEqual(304, response.status_int)
+
+        create_test_offer(self.context)
+        response = self.app.get(path, headers={'If-None-Match': etag})
+        self.assertEqual(200, response.status_int)
+        self.assertEqual(2, len(response.json['offers']))
+
+    def test_get_all_rows_swapped(self):
+        # a leaves the filtered list and b takes its place with the same
+        # revision, so the count, highest id and revisions are unchanged
+        a = create_test_offer(self.context)
+        b = offer.Offer(resource_type='test_node', resource_uuid='b',
+                        status=statuses.EXPIRED)
+        b.create(self.context)
+        create_test_offer(self.context)
+        a.properties = {'floor_price': 3}
+        a.save(self.context)
+        path = '%s/offers?status=%s' % (test_api_base.PATH_PREFIX,
+                                        statuses.AVAILABLE)
+        etag = self.app.get(path).headers['ETag']
+
+        a.status = statuses.EXPIRED
+        a.save(self.context)
+        b.status = statuses.AVAILABLE
+        b.save(self.context)
+
+        response = self.app.get(path, headers={'If-None-Match': etag})
+        self.assertEqual(200, response.status_int)
+        self.assertIn(b.uuid, [o['uuid'] for o in response.json['offers']])
@@ -0,0 +1,41 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import wsme
+
+from esi_leap.api.controllers.v1 import utils
+import esi_leap.conf
+from esi_leap.tests import base
+
+
+CONF = esi_leap.conf.CONF
+
+
+class TestApiUtils(base.TestCase):
+
+    def test_validate_limit(self):
+        self.assertEqual(10, utils.validate_limit(10))
+        self.assertEqual(CONF.api.max_limit, utils.validate_limit(None))
+        self.assertEqual(CONF.api.max_limit,
+                         utils.validate_limit(CONF.api.max_limit + 1))
+
+    def test_validate_limit_invalid(self):
+        self.assertRaises(wsme.exc.ClientSideError,
+                          utils.validate_limit, 0)
+        self.assertRaises(wsme.exc.ClientSideError,
+                          utils.validate_limit, -1)
+
+    def test_validate_sort_dir(self):
+        self.assertEqual('asc', utils.validate_sort_dir('asc'))
+        self.assertEqual('desc', utils.validate_sort_dir('desc'))
+        self.assertRaises(wsme.exc.ClientSideError,
+                          utils.validate_sort_dir, 'fake')
@@ -0,0 +1,109 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+
+from esi_leap.api import change_watcher
+from esi_leap.common import exception
+from esi_leap.objects import change
+from esi_leap.tests import base
+
+
+def _change(change_id, project_id='p1'):
+    return mock.Mock(id=change_id, project_id=project_id)
+
+
+@mock.patch.object(change_watcher.eventlet, 'spawn')
+@mock.patch.object(change.Change, 'get_all')
+@mock.patch.object(change.Change, 'get_latest_id', return_value=10)
+class TestChangeWatcher(base.TestCase):
+
+    def setUp(self):
+        super(TestChangeWatcher, self).setUp()
+        self.watcher = change_watcher.ChangeWatcher()
+
+    def test_get_latest_id(self, mock_latest, mock_get_all, mock_spawn):
+        self.assertEqual(10, self.watcher.get_latest_id())
+        self.assertEqual(10, self.watcher.get_latest_id())
+
+        mock_latest.assert_called_once_with(mock.ANY)
+        mock_spawn.assert_called_once_with(self.watcher._run)
+
+    def test_get_changes(self, mock_latest, mock_get_all, mock_spawn):
+        changes = [_change(11), _change(12, 'p2'), _change(13)]
+        mock_get_all.side_effect = [changes, []]
+        self.watcher.get_latest_id()
+        self.watcher._poll()
+
+        self.assertEqual((changes, 13), self.watcher.get_changes(10))
+        self.assertEqual((changes[1:], 13), self.watcher.get_changes(11))
+        self.assertEqual(([changes[0], changes[2]], 13),
+                         self.watcher.get_changes(10, project_id='p1'))
+        self.assertEqual((changes[:2], 12),
+                         self.watcher.get_changes(10, limit=2))
+
+    def test_get_changes_timeout(self, mock_latest, mock_get_all,
+                                 mock_spawn):
+        mock_get_all.side_effect = [[_change(11, 'p2')], []]
+        self.watcher.get_latest_id()
+        self.watcher._poll()
+
+        self.assertEqual(([], 11),
+                         self.watcher.get_changes(10, project_id='p1'))
+        self.assertEqual(([], 12), self.watcher.get_changes(12))
+
+    def test_get_changes_wait(self, mock_latest, mock_get_all, mock_spawn):
+        changes = [_change(11)]
+        mock_get_all.side_effect = [changes, []]
+        self.watcher.get_latest_id()
+
+        waiter = change_watcher.eventlet.spawn_after(
+            0, self.watcher.get_changes, 10, timeout=5)
+        change_watcher.eventlet.sleep(0)
+        self.watcher._poll()
+
+        self.assertEqual((changes, 11), waiter.wait())
+
+    def test_get_changes_max_waiters(self, mock_latest, mock_get_all,
+                                     mock_spawn):
+        change_watcher.CONF.set_override('changes_max_waiters', 1,
+                                         group='api')
+        self.addCleanup(change_watcher.CONF.clear_override,
+                        'changes_max_waiters', group='api')
+        changes = [_change(11)]
+        mock_get_all.side_effect = [changes, []]
+        self.watcher.get_latest_id()
+
+        waiter = change_watcher.eventlet.spawn_after(
+            0, self.watcher.get_changes, 10, timeout=5)
+        change_watcher.eventlet.sleep(0)
+
+        self.assertRaises(exception.ChangeWaitersExceeded,
+                          self.watcher.get_changes, 10, timeout=5)
+        # requests that do not wait are still answered
+        self.assertEqual(([], 10), self.watcher.get_changes(10))
+        self.watcher._poll()
+        self.assertEqual((changes, 11), waiter.wait())
+
+    def test_get_changes_too_old(self, mock_latest, mock_get_all,
+                                 mock_spawn):
+        change_watcher.CONF.set_override('changes_buffer_size', 2,
+                                         group='api')
+        self.addCleanup(change_watcher.CONF.clear_override,
+                        'changes_buffer_size', group='api')
+        changes = [_change(11), _change(12), _change(13)]
+        mock_get_all.side_effect = [changes, []]
+        self.watcher.get_latest_id()
+        self.watcher._poll()
+
+        self.assertIsNone(self.watcher.get_changes(10))
+        self.assertEqual((changes[1:], 13), self.watcher.get_changes(11))
@@ -14,6 +14,7 @@ import fixtures
 
 from oslo_context import context as ctx
 from oslotest import base
+import sqlalchemy as sa
 
 import esi_leap.conf
 from esi_leap.db import api as db_api
@@ -57,3 +58,23 @@ class DBTestCase(TestCase):
         if not _DB_CACHE:
             _DB_CACHE = Database()
         self.useFixture(_DB_CACHE)
+
+
+class StatementsTestCase(DBTestCase):
+    """Records the statements sent to the database that contain a string."""
+
+    match = None
+
+    def setUp(self):
+        super(StatementsTestCase, self).setUp()
+        self.statements = []
+        engine = sql_api._context_manager.writer.get_engine()
+        sa.event.listen(engine, 'before_cursor_execute',
+                        self._record_statement)
+        self.addCleanup(sa.event.remove, engine, 'before_cursor_execute',
+                        self._record_statement)
+
+    def _record_statement(self, conn, cursor, statement, *args):
+        # leave out the pool's ping and the transaction statements
+        if self.match in statement:
+            self.statements.append(statement)
@@ -0,0 +1,77 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import datetime
+import json
+
+from esi_leap.common import export
+from esi_leap.tests import base
+
+
+class TestExport(base.TestCase):
+
+    def setUp(self):
+        super(TestExport, self).setUp()
+        self.fields = ['id', 'start_date', 'properties']
+        self.rows = [
+            {'id': i,
+             'start_date': datetime.datetime(2016, 7, 16, 19, 20, 30),
+             'properties': {'floor_price': i},
+             'ignored': 'x'}
+            for i in range(5)]
+
+    def test_ndjson(self):
+        chunks = list(export.serialize(self.rows, self.fields, 'ndjson'))
+
+        rows = [json.loads(line) for line in ''.join(chunks).splitlines()]
+        self.assertEqual(5, len(rows))
+        self.assertEqual({'id': 0,
+                          'start_date': '2016-07-16T19:20:30',
+                          'properties': {'floor_price': 0}}, rows[0])
+
+    def test_csv(self):
+        chunks = list(export.serialize(self.rows, self.fields, 'csv'))
+
+        lines = ''.join(chunks).splitlines()
+        self.assertEqual('id,start_date,properties', lines[0])
+        self.assertEqual('0,2016-07-16T19:20:30,"{""floor_price"": 0}"',
+                         lines[1])
+        self.assertEqual(6, len(lines))
+
+    def test_csv_text(self):
+        rows = [{'id': 1, 'start_date': None, 'properties': u'caf\xe9'}]
+
+        chunks = list(export.serialize(rows, self.fields, 'csv'))
+
+        self.assertEqual([u'id,start_date,properties\r\n1,,caf\xe9\r\n'],
+                         chunks)
+
+    def test_csv_empty(self):
+        chunks = list(export.serialize([], self.fields, 'csv'))
+
+        self.assertEqual(['id,start_date,properties\r\n'], chunks)
+
+    def test_chunks(self):
+        chunks = list(export.serialize(self.rows, self.fields, 'ndjson',
+                                       chunk_size=2))
+
+        # the first row is sent on its own
+        self.assertEqual([1, 2, 2], [c.count('\n') for c in chunks])
+
+    def test_lazy(self):
+        def rows():
+            yield self.rows[0]
+            raise AssertionError('read past the first row')
+
+        chunks = export.serialize(rows(), self.fields, 'ndjson')
+
+        self.assertEqual(1, next(chunks).count('\n'))
@@ -0,0 +1,76 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+
+from esi_leap.common import flocx_market
+from esi_leap.common import statuses
+from esi_leap.objects import offer
+from esi_leap.tests import base
+
+
+class TestGetContracts(base.TestCase):
+
+    def setUp(self):
+        super(TestGetContracts, self).setUp()
+        self.ocrs = [
+            {'offer_contract_relationship_id': 'ocr1',
+             'contract_id': 'contract1',
+             'marketplace_offer_id': 'mp_offer1'},
+            {'offer_contract_relationship_id': 'ocr2',
+             'contract_id': 'contract1',
+             'marketplace_offer_id': 'mp_offer2'},
+        ]
+        self.provider_offer = mock.Mock(uuid='offer1',
+                                        properties={'floor_price': 3})
+
+    @mock.patch.object(offer.Offer, 'get_all', autospec=True)
+    @mock.patch.object(flocx_market, 'get_offer_by_id', autospec=True)
+    @mock.patch.object(flocx_market, 'get_bid_by_id', autospec=True)
+    @mock.patch.object(flocx_market, 'get_contract_by_id', autospec=True)
+    @mock.patch.object(flocx_market, 'get_ocr_by_status', autospec=True)
+    def test_get_contracts(self, mock_get_ocr, mock_get_contract,
+                           mock_get_bid, mock_get_offer, mock_offer_get_all):
+        client = mock.Mock()
+        mock_get_ocr.return_value = self.ocrs
+        mock_get_contract.return_value = {'start_time': 'start',
+                                          'end_time': 'end',
+                                          'bid_id': 'bid1'}
+        mock_get_bid.return_value = {'project_id': 'project1'}
+        mock_get_offer.side_effect = lambda offer_id, c: {
+            'mp_offer1': {'provider_offer_id': 'offer1'},
+            'mp_offer2': {'provider_offer_id': 'missing'},
+        }[offer_id]
+        mock_offer_get_all.return_value = [self.provider_offer]
+
+        contracts = flocx_market.get_contracts(self.context, client)
+
+        mock_get_contract.assert_called_once_with('contract1', client)
+        mock_get_bid.assert_called_once_with('bid1', client)
+        self.assertEqual(2, mock_get_offer.call_count)
+        mock_offer_get_all.assert_called_once_with(
+            self.context, filters={'uuid': mock.ANY})
+        self.assertEqual([{
+            'marketplace_offer_contract_relationship_id': 'ocr1',
+            'start_date': 'start',
+            'end_date': 'end',
+            'status': statuses.OPEN,
+            'project_id': 'project1',
+            'offer_uuid': 'offer1',
+            'properties': {'floor_price': 3},
+        }], contracts)
+
+    @mock.patch.object(flocx_market, 'get_ocr_by_status', autospec=True)
+    def test_get_contracts_none(self, mock_get_ocr):
+        mock_get_ocr.return_value = []
+        self.assertEqual([],
+                         flocx_market.get_contracts(self.context, None))
@@ -0,0 +1,206 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import datetime
+
+import mock
+from oslo_context import context as ctx
+from oslo_db import exception as db_exc
+
+from esi_leap.common import exception
+from esi_leap.common import statuses
+from esi_leap.db import api as db_api
+from esi_leap.db.sqlalchemy import api as sql_api
+from esi_leap.tests import base
+
+
+class TestOfferGetAll(base.StatementsTestCase):
+
+    match = 'FROM offers'
+
+    def setUp(self):
+        super(TestOfferGetAll, self).setUp()
+        for i in range(5):
+            db_api.offer_create(self.context, {
+                'resource_type': 'test_node',
+                'resource_uuid': 'node-%d' % i})
+        del self.statements[:]
+
+    def test_fields_single_query(self):
+        offers = db_api.offer_get_all(self.context,
+                                      fields=['uuid', 'status'])
+
+        self.assertEqual(1, len(self.statements))
+        self.assertEqual(5, len(offers))
+        self.assertEqual({'id', 'uuid', 'status'}, set(offers[0]))
+
+    def test_all_fields(self):
+        offers = db_api.offer_get_all(self.context)
+
+        self.assertEqual(1, len(self.statements))
+        self.assertIn('properties', offers[0])
+        self.assertIn('created_at', offers[0])
+
+
+class TestPaginateMarker(base.DBTestCase):
+
+    def setUp(self):
+        super(TestPaginateMarker, self).setUp()
+        self.own, self.other = [
+            db_api.offer_create(
+                ctx.RequestContext(project_id=project_id), {
+                    'resource_type': 'test_node',
+                    'resource_uuid': 'node-%d' % i})
+            for i, project_id in enumerate(['12345', '54321'])]
+        self.user_context = ctx.RequestContext(project_id='12345',
+                                               is_admin=False)
+
+    def test_own_marker(self):
+        self.assertEqual([], db_api.offer_get_all(
+            self.user_context, marker=self.own['uuid']))
+
+    def test_marker_outside_listing(self):
+        # another project's offer is as unknown as a uuid that was never
+        # used
+        for marker in (self.other['uuid'], 'unknown'):
+            self.assertRaises(exception.InvalidMarker,
+                              db_api.offer_get_all, self.user_context,
+                              marker=marker)
+
+        offers = db_api.offer_get_all(self.context,
+                                      marker=self.own['uuid'])
+        self.assertEqual([self.other['uuid']], [o['uuid'] for o in offers])
+
+
+class TestOfferGetExpiring(base.DBTestCase):
+
+    def test_exclude(self):
+        offers = [db_api.offer_create(self.context, {
+            'resource_type': 'test_node',
+            'resource_uuid': 'node-%d' % i,
+            'end_date': datetime.datetime(2016, 8, 16, 19, 20, 30)})
+            for i in range(3)]
+        now = datetime.datetime(2016, 9, 1)
+
+        expiring = db_api.offer_get_expiring(
+            self.context, now, exclude=[offers[0]['uuid'],
+                                        offers[2]['uuid']])
+
+        self.assertEqual([offers[1]['uuid']], [o['uuid'] for o in expiring])
+        self.assertEqual(3, len(db_api.offer_get_expiring(self.context, now,
+                                                          exclude=[])))
+
+
+class TestDueFromPrimary(base.DBTestCase):
+
+    @mock.patch.object(sql_api, '_session_for_replica_read', autospec=True)
+    def test_due_queries(self, mock_replica_read):
+        # what the manager acts on must not come from a lagging replica
+        now = datetime.datetime(2016, 9, 1)
+        db_api.offer_get_expiring(self.context, now)
+        db_api.offer_outbox_get_due(self.context, now)
+        db_api.contract_get_due_for_fulfillment(self.context, now)
+        db_api.contract_get_expiring(self.context, now)
+        db_api.contract_get_all_by_offer_uuid(self.context, 'offer')
+
+        mock_replica_read.assert_not_called()
+
+
+class TestContractBulkCreate(base.DBTestCase):
+
+    def setUp(self):
+        super(TestContractBulkCreate, self).setUp()
+        self.offer_uuid = db_api.offer_create(self.context, {
+            'resource_type': 'test_node', 'resource_uuid': 'node'})['uuid']
+
+    def _values(self, ocr_id):
+        return {'offer_uuid': self.offer_uuid, 'project_id': 'p',
+                'marketplace_offer_contract_relationship_id': ocr_id}
+
+    def test_skips_imported(self):
+        db_api.contract_create(self.context, self._values('ocr-1'))
+
+        created = db_api.contract_bulk_create(
+            self.context, [self._values('ocr-1'), self._values('ocr-2'),
+                           self._values('ocr-2')])
+
+        self.assertEqual(
+            ['ocr-2'],
+            [c['marketplace_offer_contract_relationship_id']
+             for c in created])
+        self.assertEqual(2, len(db_api.contract_get_all(self.context)))
+
+    def test_duplicate_entry(self):
+        db_api.contract_create(self.context, self._values('ocr-1'))
+
+        self.assertRaises(db_exc.DBDuplicateEntry, db_api.contract_create,
+                          self.context, self._values('ocr-1'))
+
+    @mock.patch.object(sql_api, '_contract_bulk_create', autospec=True)
+    def test_retry_on_duplicate_entry(self, mock_bulk_create):
+        # another manager committed the same contract between our check
+        # and our insert
+        mock_bulk_create.side_effect = [db_exc.DBDuplicateEntry(), []]
+        values_list = [self._values('ocr-1')]
+
+        self.assertEqual([], db_api.contract_bulk_create(self.context,
+                                                         values_list))
+        self.assertEqual(2, mock_bulk_create.call_count)
+
+
+class TestChangeLog(base.StatementsTestCase):
+
+    match = 'INSERT INTO changes'
+
+    def test_logged_at_commit(self):
+        with db_api.transaction(self.context):
+            o = db_api.offer_create(self.context, {
+                'resource_type': 'test_node',
+                'resource_uuid': 'node'})
+            db_api.offer_update(self.context, o['uuid'],
+                                {'status': statuses.EXPIRED})
+            self.assertEqual([], self.statements)
+
+        self.assertEqual(2, len(self.statements))
+        changes = db_api.change_get_all(self.context, 0)
+        self.assertEqual(['create', 'update'],
+                         [c['action'] for c in changes])
+        self.assertEqual(statuses.EXPIRED, changes[1]['status'])
+
+    def test_not_logged_on_rollback(self):
+        try:
+            with db_api.transaction(self.context):
+                db_api.offer_create(self.context, {
+                    'resource_type': 'test_node',
+                    'resource_uuid': 'node'})
+                raise ValueError()
+        except ValueError:
+            pass
+
+        self.assertEqual([], self.statements)
+        self.assertEqual([], db_api.change_get_all(self.context, 0))
+
+    def test_destroy_older_than(self):
+        for i in range(3):
+            db_api.offer_create(self.context, {
+                'resource_type': 'test_node',
+                'resource_uuid': 'node-%d' % i})
+        changes = db_api.change_get_all(self.context, 0)
+
+        count = db_api.change_destroy_older_than(
+            self.context, changes[2]['created_at'] +
+            datetime.timedelta(seconds=1), 2)
+
+        self.assertEqual(3, count)
+        self.assertEqual([], db_api.change_get_all(self.context, 0))
+        self.assertEqual(0, db_api.change_destroy_older_than(
+            self.context, changes[0]['created_at'], 2))
@@ -0,0 +1,100 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import datetime
+import mock
+
+from oslo_utils import uuidutils
+
+from esi_leap.manager import hash_ring
+from esi_leap.tests import base
+
+
+def _in_ranges(key, ranges):
+    for lower, upper in ranges:
+        if (lower is None or key > lower) and (upper is None or key <= upper):
+            return True
+    return False
+
+
+class TestHashRing(base.TestCase):
+
+    def setUp(self):
+        super(TestHashRing, self).setUp()
+        self.hosts = ['host1', 'host2', 'host3']
+        self.keys = [uuidutils.generate_uuid() for i in range(200)]
+
+    def test_single_host(self):
+        ring = hash_ring.HashRing(['host1'])
+
+        self.assertEqual([(None, None)], ring.get_ranges('host1'))
+        self.assertEqual('host1', ring.get_host(self.keys[0]))
+
+    def test_empty(self):
+        ring = hash_ring.HashRing([])
+
+        self.assertIsNone(ring.get_host(self.keys[0]))
+        self.assertEqual([], ring.get_ranges('host1'))
+
+    def test_ranges_match_hosts(self):
+        ring = hash_ring.HashRing(self.hosts)
+        ranges = dict((host, ring.get_ranges(host)) for host in self.hosts)
+
+        for key in self.keys:
+            owners = [host for host in self.hosts
+                      if _in_ranges(key, ranges[host])]
+            self.assertEqual([ring.get_host(key)], owners)
+
+    def test_remove_host(self):
+        ring = hash_ring.HashRing(self.hosts)
+        smaller_ring = hash_ring.HashRing(self.hosts[:2])
+
+        for key in self.keys:
+            host = ring.get_host(key)
+            if host != 'host3':
+                self.assertEqual(host, smaller_ring.get_host(key))
+
+
+class TestHashRingManager(base.TestCase):
+
+    def setUp(self):
+        super(TestHashRingManager, self).setUp()
+        self.manager = hash_ring.HashRingManager('host1')
+        self.now = datetime.datetime(2016, 7, 16, 19, 20, 30)
+
+    @mock.patch('oslo_utils.timeutils.utcnow', autospec=True)
+    def test_heartbeat(self, mock_utcnow):
+        mock_utcnow.return_value = self.now
+        with mock.patch.object(
+                self.manager.db, 'manager_heartbeat',
+                autospec=True) as mock_heartbeat, \
+            mock.patch.object(
+                self.manager.db, 'manager_get_alive',
+                autospec=True) as mock_get_alive:
+            mock_get_alive.return_value = ['host1', 'host2']
+
+            self.assertTrue(self.manager.heartbeat(self.context))
+            self.assertFalse(self.manager.heartbeat(self.context))
+
+            mock_heartbeat.assert_called_with(self.context, 'host1',
+                                              self.now)
+            mock_get_alive.assert_called_with(
+                self.context, self.now - datetime.timedelta(seconds=60))
+            self.assertEqual(frozenset(['host1', 'host2']),
+                             self.manager.ring.hosts)
+
+    def test_is_mine(self):
+        self.manager.ring = hash_ring.HashRing(['host1', 'host2'])
+        key = uuidutils.generate_uuid()
+
+        self.assertEqual(self.manager.ring.get_host(key) == 'host1',
+                         self.manager.is_mine(key))
@@ -0,0 +1,71 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import datetime
+import mock
+
+from esi_leap.manager import publisher
+from esi_leap.objects import flocx_market_client
+from esi_leap.objects import offer
+from esi_leap.tests import base
+
+
+class TestOfferPublisher(base.TestCase):
+
+    def setUp(self):
+        super(TestOfferPublisher, self).setUp()
+        self.now = datetime.datetime(2016, 7, 16, 19, 20, 30)
+        self.publisher = publisher.OfferPublisher()
+        self.entries = [
+            {'id': 1, 'offer_uuid': 'offer1', 'attempts': 0},
+            {'id': 2, 'offer_uuid': 'offer2', 'attempts': 2},
+            {'id': 3, 'offer_uuid': 'deleted', 'attempts': 0},
+        ]
+        self.offers = [mock.Mock(uuid='offer1'), mock.Mock(uuid='offer2')]
+        self.client = mock.Mock()
+        self.client.send_offer.side_effect = [201, 500]
+
+    @mock.patch('oslo_utils.timeutils.utcnow', autospec=True)
+    @mock.patch.object(flocx_market_client, 'get_flocx_market_client',
+                       autospec=True)
+    @mock.patch.object(offer.Offer, 'get_all', autospec=True)
+    def test_publish(self, mock_offer_get_all, mock_get_client,
+                     mock_utcnow):
+        mock_utcnow.return_value = self.now
+        mock_get_client.return_value = self.client
+        mock_offer_get_all.return_value = self.offers
+        with mock.patch.object(
+                self.publisher.db, 'offer_outbox_get_due',
+                autospec=True) as mock_get_due, \
+            mock.patch.object(
+                self.publisher.db, 'offer_outbox_update',
+                autospec=True) as mock_update, \
+            mock.patch.object(
+                self.publisher.db, 'offer_outbox_destroy',
+                autospec=True) as mock_destroy:
+            mock_get_due.return_value = self.entries
+
+            self.publisher.publish(self.context)
+
+            mock_get_due.assert_called_once_with(
+                self.context, self.now, limit=100, shard=None)
+            mock_update.assert_called_once_with(
+                self.context, 2,
+                {'attempts': 3,
+                 'next_attempt_at':
+                 self.now + datetime.timedelta(seconds=40)})
+            mock_destroy.assert_called_once_with(self.context, [3, 1])
+
+    def test_get_retry_interval(self):
+        self.assertEqual(10, self.publisher._get_retry_interval(0))
+        self.assertEqual(80, self.publisher._get_retry_interval(3))
+        self.assertEqual(3600, self.publisher._get_retry_interval(20))
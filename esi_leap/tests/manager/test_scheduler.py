@@ -0,0 +1,68 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import datetime
+import mock
+
+from esi_leap.manager import scheduler
+from esi_leap.tests import base
+
+
+class TestDeadlineScheduler(base.TestCase):
+
+    def setUp(self):
+        super(TestDeadlineScheduler, self).setUp()
+        self.now = datetime.datetime(2016, 7, 16, 19, 20, 30)
+        self.scheduler = scheduler.DeadlineScheduler()
+        self.job = mock.Mock()
+        self.deadlines = []
+        self.scheduler.add_job('job', self.job,
+                               lambda limit: self.deadlines)
+
+    @mock.patch('oslo_utils.timeutils.utcnow', autospec=True)
+    def test_run_once_nothing_scheduled(self, mock_utcnow):
+        mock_utcnow.return_value = self.now
+        self.assertEqual(60, self.scheduler.run_once())
+        self.job.assert_not_called()
+
+    @mock.patch('oslo_utils.timeutils.utcnow', autospec=True)
+    def test_run_once_sleeps_until_deadline(self, mock_utcnow):
+        mock_utcnow.return_value = self.now
+        self.deadlines = [self.now + datetime.timedelta(seconds=5)]
+        self.assertEqual(5, self.scheduler.run_once())
+        self.job.assert_not_called()
+
+    @mock.patch('oslo_utils.timeutils.utcnow', autospec=True)
+    def test_run_once_runs_due_job(self, mock_utcnow):
+        mock_utcnow.return_value = self.now
+        self.deadlines = [self.now - datetime.timedelta(seconds=1),
+                          self.now]
+
+        def job():
+            self.deadlines = []
+        self.job.side_effect = job
+
+        self.assertEqual(60, self.scheduler.run_once())
+        self.job.assert_called_once_with()
+
+    @mock.patch('oslo_utils.timeutils.utcnow', autospec=True)
+    def test_run_once_retries_stuck_deadline_later(self, mock_utcnow):
+        mock_utcnow.return_value = self.now
+        self.deadlines = [self.now - datetime.timedelta(seconds=1)]
+        self.job.side_effect = Exception('boom')
+
+        self.assertEqual(10, self.scheduler.run_once())
+        self.job.assert_called_once_with()
+
+    def test_wake(self):
+        self.scheduler.wake()
+        self.assertTrue(self.scheduler._wakeup.is_set())
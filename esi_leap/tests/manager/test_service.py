@@ -0,0 +1,167 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+
+from esi_leap.common import exception
+from esi_leap.manager import service
+from esi_leap.objects import contract
+from esi_leap.objects import offer
+from esi_leap.tests import base
+
+
+class TestManagerService(base.TestCase):
+
+    @mock.patch('oslo_messaging.get_rpc_transport', autospec=True)
+    @mock.patch('oslo_messaging.get_rpc_server', autospec=True)
+    def setUp(self, mock_rpc_server, mock_rpc_transport):
+        super(TestManagerService, self).setUp()
+        self.manager = service.ManagerService()
+
+        self.patch_transaction = mock.patch(
+            'esi_leap.db.api.transaction', autospec=True)
+        self.mock_transaction = self.patch_transaction.start()
+        self.mock_transaction.return_value.__exit__.return_value = False
+        self.addCleanup(self.patch_transaction.stop)
+
+    def test_run_batch(self):
+        items = [(mock.Mock(uuid=str(i)), 'test_node') for i in range(5)]
+        processed = []
+
+        def action(item):
+            if item.uuid == '2':
+                raise Exception('boom')
+            processed.append(item.uuid)
+
+        failed = self.manager._run_batch(action, items)
+
+        self.assertEqual([items[2][0]], failed)
+        self.assertEqual(['0', '1', '3', '4'], sorted(processed))
+        self.assertEqual(5, self.mock_transaction.call_count)
+        self.mock_transaction.assert_called_with(self.manager._context)
+
+    def test_run_batch_conflict(self):
+        items = [(mock.Mock(uuid=str(i)), 'test_node') for i in range(2)]
+
+        def action(item):
+            if item.uuid == '1':
+                raise exception.ContractStatusConflict(
+                    contract_uuid=item.uuid, status='open')
+
+        failed = self.manager._run_batch(action, items)
+
+        self.assertEqual([], failed)
+
+    @mock.patch.object(contract.Contract, 'get_due_for_fulfillment',
+                       autospec=True)
+    @mock.patch.object(offer.Offer, 'get_all', autospec=True)
+    def test_fulfill_contracts(self, mock_offer_get_all, mock_get_due):
+        o1 = mock.Mock(uuid='o1', resource_type='test_node')
+        c1 = mock.Mock(uuid='c1', offer_uuid='o1')
+        c2 = mock.Mock(uuid='c2', offer_uuid='o1')
+        c1.get_offer.return_value = o1
+        c2.get_offer.return_value = o1
+        c2.fulfill.side_effect = Exception('boom')
+        mock_get_due.return_value = [c1, c2]
+
+        self.manager._fulfill_contracts()
+
+        mock_get_due.assert_called_once_with(
+            self.manager._context, mock.ANY, limit=100,
+            shard=self.manager._hash_ring.get_shard(), exclude=[])
+        mock_offer_get_all.assert_not_called()
+        # c2 shares the offer loaded for c1
+        c2.get_offer.assert_not_called()
+        self.assertIs(o1, c2._offer)
+        c1.fulfill.assert_called_once_with(self.manager._context)
+        c2.fulfill.assert_called_once_with(self.manager._context)
+
+    @mock.patch.object(contract.Contract, 'get_expiring', autospec=True)
+    def test_expire_contracts_offer_not_found(self, mock_get_expiring):
+        o1 = mock.Mock(uuid='o1', resource_type='test_node')
+        c1 = mock.Mock(uuid='c1', offer_uuid='o1')
+        c2 = mock.Mock(uuid='c2', offer_uuid='o2')
+        c1.get_offer.return_value = o1
+        c2.get_offer.side_effect = exception.OfferNotFound(offer_uuid='o2')
+        mock_get_expiring.return_value = [c1, c2]
+
+        self.manager._expire_contracts()
+
+        c1.expire.assert_called_once_with(self.manager._context)
+        c2.expire.assert_not_called()
+
+    @mock.patch.object(offer.Offer, 'get_expiring', autospec=True)
+    def test_expire_offers_skips_failed(self, mock_get_expiring):
+        service.CONF.set_override('batch_size', 2, group='manager')
+        self.addCleanup(service.CONF.clear_override, 'batch_size',
+                        group='manager')
+        o1 = mock.Mock(uuid='o1', resource_type='test_node')
+        o2 = mock.Mock(uuid='o2', resource_type='test_node')
+        o3 = mock.Mock(uuid='o3', resource_type='test_node')
+        o1.expire.side_effect = Exception('boom')
+        mock_get_expiring.side_effect = [[o1, o2], [o3]]
+
+        self.manager._expire_offers()
+
+        self.assertEqual(
+            [[], ['o1']],
+            [c[1]['exclude'] for c in mock_get_expiring.call_args_list])
+        o3.expire.assert_called_once_with(self.manager._context)
+
+    @mock.patch.object(offer.Offer, 'get_expiring', autospec=True)
+    def test_expire_offers_all_failed(self, mock_get_expiring):
+        service.CONF.set_override('batch_size', 2, group='manager')
+        self.addCleanup(service.CONF.clear_override, 'batch_size',
+                        group='manager')
+        offers = [mock.Mock(uuid='o%d' % i, resource_type='test_node')
+                  for i in range(2)]
+        for o in offers:
+            o.expire.side_effect = Exception('boom')
+        mock_get_expiring.return_value = offers
+
+        self.manager._expire_offers()
+
+        # the backend looks down; the rest is left to a later run
+        mock_get_expiring.assert_called_once()
+
+    def test_heartbeat_rebalance(self):
+        with mock.patch.object(self.manager._hash_ring, 'heartbeat',
+                               autospec=True) as mock_heartbeat, \
+            mock.patch.object(self.manager._scheduler, 'wake',
+                              autospec=True) as mock_wake:
+            mock_heartbeat.return_value = True
+
+            self.manager._heartbeat()
+
+            mock_heartbeat.assert_called_once_with(self.manager._context)
+            mock_wake.assert_called_once_with()
+
+    @mock.patch.object(contract.Contract, 'bulk_create', autospec=True)
+    @mock.patch('esi_leap.common.flocx_market.update_contracts',
+                autospec=True)
+    @mock.patch('esi_leap.common.flocx_market.get_contracts', autospec=True)
+    @mock.patch('esi_leap.common.flocx_market.get_flocx_market_client',
+                autospec=True)
+    def test_retrieve_contracts_other_shard(self, mock_get_client,
+                                            mock_get_contracts,
+                                            mock_update_contracts,
+                                            mock_bulk_create):
+        mock_get_contracts.return_value = [{'offer_uuid': 'o1'}]
+        with mock.patch.object(self.manager._hash_ring, 'is_mine',
+                               autospec=True) as mock_is_mine:
+            mock_is_mine.return_value = False
+
+            self.manager._retrieve_contracts()
+
+            mock_is_mine.assert_called_once_with('o1')
+            mock_bulk_create.assert_not_called()
+            mock_update_contracts.assert_not_called()
@@ -13,7 +13,9 @@
 import datetime
 import mock
 
+from esi_leap.common import exception
 from esi_leap.common import statuses
+from esi_leap.db import api as db_api
 from esi_leap.objects import contract
 from esi_leap.tests import base
 
@@ -65,7 +67,8 @@ class TestContractObject(base.DBTestCase):
                 self.context)
 
             mock_contract_get_all.assert_called_once_with(
-                self.context)
+                self.context, filters=None, limit=None, marker=None,
+                sort_key=None, sort_dir=None, fields=None)
             self.assertEqual(len(contracts), 1)
             self.assertIsInstance(
                 contracts[0], contract.Contract)
@@ -122,6 +125,39 @@ class TestContractObject(base.DBTestCase):
             self.assertIsInstance(contracts[0], contract.Contract)
             self.assertEqual(self.context, contracts[0]._context)
 
+    def test_get_due_for_fulfillment(self):
+        now = datetime.datetime(2016, 7, 16, 19, 20, 30)
+        with mock.patch.object(
+                self.db_api,
+                'contract_get_due_for_fulfillment',
+                autospec=True) as mock_contract_get_due_for_fulfillment:
+            mock_contract_get_due_for_fulfillment.return_value = [
+                self.fake_contract]
+            contracts = contract.Contract.get_due_for_fulfillment(
+                self.context, now, limit=10, shard=None)
+
+            mock_contract_get_due_for_fulfillment.assert_called_once_with(
+                self.context, now, limit=10, shard=None, exclude=None)
+            self.assertEqual(len(contracts), 1)
+            self.assertIsInstance(contracts[0], contract.Contract)
+            self.assertEqual(self.context, contracts[0]._context)
+
+    def test_get_expiring(self):
+        now = datetime.datetime(2016, 7, 16, 19, 20, 30)
+        with mock.patch.object(
+                self.db_api,
+                'contract_get_expiring',
+                autospec=True) as mock_contract_get_expiring:
+            mock_contract_get_expiring.return_value = [self.fake_contract]
+            contracts = contract.Contract.get_expiring(
+                self.context, now, limit=10, shard=None)
+
+            mock_contract_get_expiring.assert_called_once_with(
+                self.context, now, limit=10, shard=None, exclude=None)
+            self.assertEqual(len(contracts), 1)
+            self.assertIsInstance(contracts[0], contract.Contract)
+            self.assertEqual(self.context, contracts[0]._context)
+
     def test_create(self):
         c = contract.Contract(
             self.context, **self.fake_contract)
@@ -134,6 +170,35 @@ class TestContractObject(base.DBTestCase):
             mock_contract_create.assert_called_once_with(
                 self.context, get_test_contract())
 
+    def test_bulk_create(self):
+        c = contract.Contract(
+            self.context, **self.fake_contract)
+        with mock.patch.object(self.db_api, 'contract_bulk_create',
+                               autospec=True) as mock_contract_bulk_create:
+            mock_contract_bulk_create.return_value = [get_test_contract()]
+
+            contracts = contract.Contract.bulk_create(self.context, [c])
+
+            mock_contract_bulk_create.assert_called_once_with(
+                self.context, [get_test_contract()])
+            self.assertEqual([c], contracts)
+            self.assertEqual(self.context, c._context)
+
+    def test_bulk_create_imported(self):
+        other = dict(self.fake_contract)
+        other['marketplace_offer_contract_relationship_id'] = 'other'
+        c1 = contract.Contract(self.context, **self.fake_contract)
+        c2 = contract.Contract(self.context, **other)
+        with mock.patch.object(self.db_api, 'contract_bulk_create',
+                               autospec=True) as mock_contract_bulk_create:
+            # c1 had been imported already
+            mock_contract_bulk_create.return_value = [other]
+
+            contracts = contract.Contract.bulk_create(self.context,
+                                                      [c1, c2])
+
+            self.assertEqual([c2], contracts)
+
     def test_destroy(self):
         c = contract.Contract(self.context, **self.fake_contract)
         with mock.patch.object(self.db_api, 'contract_destroy',
@@ -164,3 +229,108 @@ class TestContractObject(base.DBTestCase):
                 self.context, c.uuid, updated_values)
             self.assertEqual(self.context, c._context)
             self.assertEqual(updated_at, c.updated_at)
+
+    @mock.patch('esi_leap.objects.offer.Offer.get')
+    def test_fulfill(self, mock_offer_get):
+        c = contract.Contract(self.context, **self.fake_contract)
+        resource = mock_offer_get.return_value.resource_object.return_value
+        with mock.patch.object(
+                self.db_api, 'contract_bulk_update_status',
+                autospec=True) as mock_contract_bulk_update_status:
+            mock_contract_bulk_update_status.return_value = 1
+
+            c.fulfill(self.context)
+
+            resource.set_contract.assert_called_once_with(c)
+            mock_contract_bulk_update_status.assert_called_once_with(
+                self.context, [c.uuid], statuses.OPEN, statuses.FULFILLED)
+            self.assertEqual(statuses.FULFILLED, c.status)
+
+    @mock.patch('esi_leap.objects.offer.Offer.get')
+    def test_fulfill_conflict(self, mock_offer_get):
+        c = contract.Contract(self.context, **self.fake_contract)
+        with mock.patch.object(
+                self.db_api, 'contract_bulk_update_status',
+                autospec=True) as mock_contract_bulk_update_status:
+            mock_contract_bulk_update_status.return_value = 0
+
+            self.assertRaises(exception.ContractStatusConflict,
+                              c.fulfill, self.context)
+
+            mock_offer_get.assert_not_called()
+            self.assertEqual(statuses.OPEN, c.status)
+
+    @mock.patch('esi_leap.objects.offer.Offer.get')
+    def test_fulfill_resource_error(self, mock_offer_get):
+        c = contract.Contract(self.context, **self.fake_contract)
+        resource = mock_offer_get.return_value.resource_object.return_value
+        resource.set_contract.side_effect = Exception('boom')
+        with mock.patch.object(
+                self.db_api, 'contract_bulk_update_status',
+                autospec=True) as mock_contract_bulk_update_status:
+            mock_contract_bulk_update_status.return_value = 1
+
+            self.assertRaises(Exception, c.fulfill, self.context)
+
+            mock_contract_bulk_update_status.assert_has_calls([
+                mock.call(self.context, [c.uuid],
+                          statuses.OPEN, statuses.FULFILLED),
+                mock.call(self.context, [c.uuid],
+                          statuses.FULFILLED, statuses.OPEN)])
+            self.assertEqual(statuses.OPEN, c.status)
+
+    @mock.patch('esi_leap.objects.offer.Offer.get')
+    def test_expire(self, mock_offer_get):
+        c = contract.Contract(self.context, **self.fake_contract)
+        c.status = statuses.FULFILLED
+        resource = mock_offer_get.return_value.resource_object.return_value
+        resource.get_contract_uuid.return_value = c.uuid
+        with mock.patch.object(
+                self.db_api, 'contract_bulk_update_status',
+                autospec=True) as mock_contract_bulk_update_status:
+            mock_contract_bulk_update_status.return_value = 1
+
+            c.expire(self.context)
+
+            resource.set_contract.assert_called_once_with(None)
+            mock_contract_bulk_update_status.assert_called_once_with(
+                self.context, [c.uuid], statuses.FULFILLED, statuses.EXPIRED)
+            self.assertEqual(statuses.EXPIRED, c.status)
+
+
+class TestContractOfferLoaded(base.StatementsTestCase):
+
+    match = 'offers'
+
+    def setUp(self):
+        super(TestContractOfferLoaded, self).setUp()
+        db_offer = self.db_api.offer_create(self.context, {
+            'resource_type': 'test_node', 'resource_uuid': 'node'})
+        for i in range(3):
+            self.db_api.contract_create(self.context, {
+                'offer_uuid': db_offer.uuid,
+                'project_id': 'p',
+                'marketplace_offer_contract_relationship_id': 'ocr-%d' % i,
+                'start_date': datetime.datetime(2016, 7, 16, 19, 20, 30)})
+        self.offer_uuid = db_offer.uuid
+        del self.statements[:]
+
+    def test_get_offer_loaded(self):
+        contracts = contract.Contract.get_due_for_fulfillment(
+            self.context, datetime.datetime(2016, 8, 1))
+
+        self.assertEqual(
+            [self.offer_uuid] * 3,
+            [c.get_offer(self.context).uuid for c in contracts])
+        # the offers came with the contracts in a single query
+        self.assertEqual(1, len(self.statements))
+
+    def test_get_offer_loaded_from_dict(self):
+        db_contracts = db_api.contract_get_due_for_fulfillment(
+            self.context, datetime.datetime(2016, 8, 1))
+
+        c = contract.Contract._from_db_object(
+            self.context, contract.Contract(), db_contracts[0])
+
+        self.assertEqual(self.offer_uuid, c.get_offer(self.context).uuid)
+        self.assertEqual(1, len(self.statements))
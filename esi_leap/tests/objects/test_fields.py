@@ -27,9 +27,22 @@ class TestFlexibleDictField(base.TestCase):
         self.assertEqual({'foo': 'bar'},
                          self.field.coerce('obj', 'attr', '{"foo": "bar"}'))
 
+    def test_coerce_json(self):
+        self.assertEqual(
+            {'foo': True, 'bar': None, 'baz': [1.5]},
+            self.field.coerce('obj', 'attr',
+                              '{"foo": true, "bar": null, "baz": [1.5]}'))
+
+    def test_coerce_repr(self):
+        self.assertEqual(
+            {'foo': True, 'bar': None},
+            self.field.coerce('obj', 'attr', "{'foo': True, 'bar': None}"))
+
     def test_coerce_bad_values(self):
         self.assertRaises(TypeError, self.field.coerce, 'obj', 'attr', 123)
         self.assertRaises(TypeError, self.field.coerce, 'obj', 'attr', True)
+        self.assertRaises(TypeError, self.field.coerce, 'obj', 'attr', '1')
+        self.assertRaises(SyntaxError, self.field.coerce, 'obj', 'attr', '{')
 
     def test_coerce_nullable_translation(self):
         # non-nullable
@@ -0,0 +1,47 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+
+from esi_leap.objects import flocx_market_client
+from esi_leap.tests import base
+
+
+class TestGetFlocxMarketClient(base.TestCase):
+
+    def setUp(self):
+        super(TestGetFlocxMarketClient, self).setUp()
+        flocx_market_client.reset_flocx_market_client()
+        self.addCleanup(flocx_market_client.reset_flocx_market_client)
+
+    @mock.patch('keystoneauth1.loading.load_session_from_conf_options',
+                autospec=True)
+    @mock.patch('keystoneauth1.loading.load_auth_from_conf_options',
+                autospec=True)
+    def test_cached(self, mock_load_auth, mock_load_session):
+        client = flocx_market_client.get_flocx_market_client()
+        self.assertIs(client, flocx_market_client.get_flocx_market_client())
+        mock_load_auth.assert_called_once_with(mock.ANY, 'flocx_market')
+        mock_load_session.assert_called_once_with(
+            mock.ANY, 'flocx_market', auth=mock_load_auth.return_value,
+            session=mock.ANY)
+
+    @mock.patch('keystoneauth1.loading.load_session_from_conf_options',
+                autospec=True)
+    @mock.patch('keystoneauth1.loading.load_auth_from_conf_options',
+                autospec=True)
+    def test_reset(self, mock_load_auth, mock_load_session):
+        client = flocx_market_client.get_flocx_market_client()
+        flocx_market_client.reset_flocx_market_client()
+        self.assertIsNot(client,
+                         flocx_market_client.get_flocx_market_client())
+        self.assertEqual(2, mock_load_session.call_count)
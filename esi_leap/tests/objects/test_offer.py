@@ -13,6 +13,7 @@
 import datetime
 import mock
 
+from esi_leap.common import exception
 from esi_leap.common import statuses
 from esi_leap.objects import flocx_market_client
 from esi_leap.objects import offer
@@ -66,12 +67,27 @@ class TestOfferObject(base.DBTestCase):
                 self.context)
 
             mock_offer_get_all.assert_called_once_with(
-                self.context)
+                self.context, filters=None, limit=None, marker=None,
+                sort_key=None, sort_dir=None, fields=None)
             self.assertEqual(len(offers), 1)
             self.assertIsInstance(
                 offers[0], offer.Offer)
             self.assertEqual(self.context, offers[0]._context)
 
+    def test_from_db_object(self):
+        self.fake_offer['id'] = '27'
+        self.fake_offer['properties'] = None
+
+        o = offer.Offer._from_db_object(
+            self.context, offer.Offer(), self.fake_offer)
+
+        self.assertEqual({}, o.obj_get_changes())
+        self.assertEqual(27, o.id)
+        self.assertEqual({}, o.properties)
+        self.assertIs(self.fake_offer['start_date'], o.start_date)
+        self.assertEqual(
+            dict(self.fake_offer, id=27, properties={}), o.to_dict())
+
     def test_get_all_by_project_id(self):
         project_id = self.fake_offer['project_id']
         with mock.patch.object(
@@ -106,6 +122,21 @@ class TestOfferObject(base.DBTestCase):
             self.assertIsInstance(offers[0], offer.Offer)
             self.assertEqual(self.context, offers[0]._context)
 
+    def test_get_expiring(self):
+        now = datetime.datetime(2016, 8, 16, 19, 20, 30)
+        with mock.patch.object(
+                self.db_api,
+                'offer_get_expiring',
+                autospec=True) as mock_offer_get_expiring:
+            mock_offer_get_expiring.return_value = [self.fake_offer]
+            offers = offer.Offer.get_expiring(self.context, now, limit=10)
+
+            mock_offer_get_expiring.assert_called_once_with(
+                self.context, now, limit=10, shard=None, exclude=None)
+            self.assertEqual(len(offers), 1)
+            self.assertIsInstance(offers[0], offer.Offer)
+            self.assertEqual(self.context, offers[0]._context)
+
     def test_create(self):
         o = offer.Offer(
             self.context, **self.fake_offer)
@@ -151,6 +182,60 @@ class TestOfferObject(base.DBTestCase):
             self.assertEqual(self.context, o._context)
             self.assertEqual(updated_at, o.updated_at)
 
+    @mock.patch('esi_leap.objects.offer.Offer.resource_object')
+    @mock.patch('esi_leap.objects.contract.Contract.get_all_by_offer_uuid')
+    def test_expire(self, mock_get_all_by_offer_uuid, mock_resource_object):
+        o = offer.Offer(self.context, **self.fake_offer)
+        c1 = mock.Mock(uuid='c1', status=statuses.FULFILLED)
+        c2 = mock.Mock(uuid='c2', status=statuses.EXPIRED)
+        mock_get_all_by_offer_uuid.return_value = [c1, c2]
+        mock_resource_object.return_value.get_contract_uuid.return_value = \
+            'c1'
+        with mock.patch.object(
+                self.db_api, 'offer_expire_with_contracts',
+                autospec=True) as mock_offer_expire_with_contracts:
+            mock_offer_expire_with_contracts.return_value = 1
+
+            o.expire(self.context)
+
+            mock_offer_expire_with_contracts.assert_called_once_with(
+                self.context, [o.uuid])
+            mock_resource_object.return_value.set_contract.\
+                assert_called_once_with(None)
+            self.assertEqual(statuses.EXPIRED, o.status)
+            # the status is saved; other unsaved changes are left alone
+            self.assertNotIn('status', o.obj_what_changed())
+
+    @mock.patch('esi_leap.objects.offer.Offer.resource_object')
+    @mock.patch('esi_leap.objects.contract.Contract.get_all_by_offer_uuid')
+    def test_expire_no_active_contracts(self, mock_get_all_by_offer_uuid,
+                                        mock_resource_object):
+        o = offer.Offer(self.context, **self.fake_offer)
+        mock_get_all_by_offer_uuid.return_value = []
+        with mock.patch.object(
+                self.db_api, 'offer_expire_with_contracts',
+                autospec=True) as mock_offer_expire_with_contracts:
+            mock_offer_expire_with_contracts.return_value = 1
+
+            o.expire(self.context)
+
+            mock_offer_expire_with_contracts.assert_called_once_with(
+                self.context, [o.uuid])
+            mock_resource_object.assert_not_called()
+
+    @mock.patch('esi_leap.objects.contract.Contract.get_all_by_offer_uuid')
+    def test_expire_conflict(self, mock_get_all_by_offer_uuid):
+        o = offer.Offer(self.context, **self.fake_offer)
+        mock_get_all_by_offer_uuid.return_value = []
+        with mock.patch.object(
+                self.db_api, 'offer_expire_with_contracts',
+                autospec=True) as mock_offer_expire_with_contracts:
+            mock_offer_expire_with_contracts.return_value = 0
+
+            self.assertRaises(exception.OfferStatusConflict,
+                              o.expire, self.context)
+            self.assertEqual(statuses.AVAILABLE, o.status)
+
     def test_send_to_flocx_market(self):
         o = offer.Offer(self.context, **self.fake_offer)
         with mock.patch.object(flocx_market_client.FlocxMarketClient,
@@ -0,0 +1,67 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import json
+import mock
+import os
+
+import fixtures
+
+from esi_leap.resource_objects import dummy_node
+from esi_leap.tests import base
+
+
+class TestDummyNode(base.TestCase):
+
+    def setUp(self):
+        super(TestDummyNode, self).setUp()
+        self.node_dir = self.useFixture(fixtures.TempDir()).path
+        self.useFixture(fixtures.MockPatchObject(
+            dummy_node, 'DUMMY_NODE_DIR', self.node_dir))
+        dummy_node._node_cache.clear()
+        self.addCleanup(dummy_node._node_cache.clear)
+        self.path = os.path.join(self.node_dir, '1718')
+        with open(self.path, 'w') as node_file:
+            json.dump({'project_owner_id': 'owner1',
+                       'server_config': {'cores': 16}}, node_file)
+
+    def test_read_is_cached(self):
+        node = dummy_node.DummyNode('1718')
+        with mock.patch.object(dummy_node.json, 'load',
+                               wraps=json.load) as mock_load:
+            self.assertTrue(node.is_resource_admin('owner1'))
+            self.assertEqual({'cores': 16}, node.get_node_config())
+            self.assertIsNone(node.get_contract_uuid())
+            self.assertEqual(1, mock_load.call_count)
+
+    def test_set_contract(self):
+        node = dummy_node.DummyNode('1718')
+        contract = mock.Mock(uuid='contract1', project_id='project1')
+
+        node.set_contract(contract)
+        self.assertEqual('contract1', node.get_contract_uuid())
+        self.assertEqual('project1', node.get_project_id())
+        with open(self.path) as node_file:
+            self.assertEqual('contract1',
+                             json.load(node_file)['contract_uuid'])
+
+        node.set_contract(None)
+        self.assertIsNone(node.get_contract_uuid())
+        self.assertIsNone(node.get_project_id())
+        self.assertEqual(['1718'], os.listdir(self.node_dir))
+
+    def test_external_change_is_seen(self):
+        node = dummy_node.DummyNode('1718')
+        self.assertIsNone(node.get_contract_uuid())
+        with open(self.path, 'w') as node_file:
+            json.dump({'contract_uuid': 'contract3'}, node_file)
+        self.assertEqual('contract3', node.get_contract_uuid())
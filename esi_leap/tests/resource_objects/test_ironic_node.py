@@ -0,0 +1,163 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from ironicclient import exc as ironic_exc
+import mock
+
+import esi_leap.conf
+from esi_leap.resource_objects import ironic_node
+from esi_leap.tests import base
+
+
+CONF = esi_leap.conf.CONF
+
+
+class TestIronicNode(base.TestCase):
+
+    def setUp(self):
+        super(TestIronicNode, self).setUp()
+        ironic_node._node_cache.clear()
+        self.addCleanup(ironic_node._node_cache.clear)
+        self.node = mock.Mock(properties={'contract_uuid': 'contract1',
+                                          'project_id': 'project1',
+                                          'project_owner_id': 'owner1',
+                                          'cores': 16})
+        patcher = mock.patch.object(ironic_node, 'get_ironic_client',
+                                    autospec=True)
+        self.mock_client = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+        self.mock_client.node.get.return_value = self.node
+
+    def test_accessors_fetch_once(self):
+        node = ironic_node.IronicNode('node1')
+        self.assertEqual('contract1', node.get_contract_uuid())
+        self.assertEqual('project1', node.get_project_id())
+        self.assertTrue(node.is_resource_admin('owner1'))
+        self.assertEqual({'cores': 16}, node.get_node_config())
+        self.assertEqual('contract1', node.get_contract_uuid())
+        self.mock_client.node.get.assert_called_once_with('node1')
+
+    def test_cache_shared_between_instances(self):
+        ironic_node.IronicNode('node1').is_resource_admin('owner1')
+        ironic_node.IronicNode('node1').get_node_config()
+        self.mock_client.node.get.assert_called_once_with('node1')
+
+    def test_contract_read_skips_cache(self):
+        ironic_node.IronicNode('node1').get_node_config()
+        self.mock_client.node.get.return_value = mock.Mock(
+            properties={'contract_uuid': 'contract2'})
+
+        node = ironic_node.IronicNode('node1')
+        self.assertEqual('contract2', node.get_contract_uuid())
+        self.assertIsNone(node.get_project_id())
+        self.assertEqual(2, self.mock_client.node.get.call_count)
+        # the fresh node replaces the cached one
+        self.assertEqual(
+            {}, ironic_node.IronicNode('node1').get_node_config())
+        self.assertEqual(2, self.mock_client.node.get.call_count)
+
+    def test_cache_disabled(self):
+        CONF.set_override('node_cache_ttl', 0, group='ironic')
+        self.addCleanup(CONF.clear_override, 'node_cache_ttl',
+                        group='ironic')
+        ironic_node.IronicNode('node1').get_contract_uuid()
+        ironic_node.IronicNode('node1').get_project_id()
+        self.assertEqual(2, self.mock_client.node.get.call_count)
+
+    @mock.patch.object(ironic_node.time, 'time', autospec=True)
+    def test_cache_drops_expired(self, mock_time):
+        mock_time.return_value = 100
+        ironic_node.get_node('node1')
+        mock_time.return_value = 105
+        ironic_node.get_node('node2')
+        mock_time.return_value = 111
+        ironic_node.get_node('node3')
+
+        self.assertEqual(['node2', 'node3'], list(ironic_node._node_cache))
+
+    def test_cache_size(self):
+        CONF.set_override('node_cache_size', 2, group='ironic')
+        self.addCleanup(CONF.clear_override, 'node_cache_size',
+                        group='ironic')
+        for node_uuid in ('node1', 'node2', 'node3'):
+            ironic_node.get_node(node_uuid)
+
+        self.assertEqual(['node2', 'node3'], list(ironic_node._node_cache))
+
+    def test_set_contract_none_invalidates(self):
+        node = ironic_node.IronicNode('node1')
+        node.set_contract(None)
+        self.mock_client.node.get.assert_called_once_with('node1')
+        self.mock_client.node.update.assert_called_once_with('node1', [
+            {'op': 'remove', 'path': '/properties/contract_uuid'},
+            {'op': 'remove', 'path': '/properties/project_id'},
+        ])
+
+        node.get_contract_uuid()
+        self.assertEqual(2, self.mock_client.node.get.call_count)
+
+    def test_get_resource_objects(self):
+        other = mock.Mock(uuid='node2', properties={'cores': 8})
+        nodes = {'node1': self.node, 'node2': other}
+
+        def get(node_uuid):
+            if node_uuid not in nodes:
+                raise ironic_exc.NotFound()
+            return nodes[node_uuid]
+        self.mock_client.node.get.side_effect = get
+
+        objects = ironic_node.IronicNode.get_resource_objects(
+            ['node1', 'node2', 'missing'])
+
+        self.assertEqual(['node1', 'node2'], sorted(objects))
+        self.assertEqual({'cores': 8}, objects['node2'].get_node_config())
+        # only the requested nodes are fetched, never the whole inventory
+        self.assertEqual(['missing', 'node1', 'node2'], sorted(
+            c[0][0] for c in self.mock_client.node.get.call_args_list))
+        self.mock_client.node.list.assert_not_called()
+
+        # fetched nodes are cached for later single lookups
+        ironic_node.IronicNode('node1').is_resource_admin('owner1')
+        self.assertEqual(3, self.mock_client.node.get.call_count)
+
+    def test_get_resource_objects_listing(self):
+        CONF.set_override('node_list_threshold', 1, group='ironic')
+        self.addCleanup(CONF.clear_override, 'node_list_threshold',
+                        group='ironic')
+        self.node.uuid = 'node1'
+        other = mock.Mock(uuid='node2', properties={'cores': 8})
+        unrelated = mock.Mock(uuid='node3', properties={})
+        self.mock_client.node.list.return_value = [self.node, other,
+                                                   unrelated]
+
+        objects = ironic_node.IronicNode.get_resource_objects(
+            ['node1', 'node2', 'missing'])
+
+        self.assertEqual(['node1', 'node2'], sorted(objects))
+        self.mock_client.node.list.assert_called_once_with(
+            fields=['uuid', 'properties'], limit=0)
+        self.mock_client.node.get.assert_not_called()
+        # only the requested nodes are kept in the cache
+        self.assertEqual(['node1', 'node2'],
+                         sorted(ironic_node._node_cache))
+
+    def test_get_resource_objects_cache_disabled(self):
+        CONF.set_override('node_cache_ttl', 0, group='ironic')
+        self.addCleanup(CONF.clear_override, 'node_cache_ttl',
+                        group='ironic')
+
+        objects = ironic_node.IronicNode.get_resource_objects(['node1'])
+
+        self.assertEqual(['node1'], list(objects))
+        self.mock_client.node.get.assert_not_called()
+        self.assertEqual('contract1', objects['node1'].get_contract_uuid())
+        self.mock_client.node.get.assert_called_once_with('node1')
@@ -0,0 +1,53 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+
+from esi_leap.common import exception
+from esi_leap.resource_objects import resource_object_factory as ro_factory
+from esi_leap.resource_objects import test_node
+from esi_leap.tests import base
+
+
+class TestResourceObjectFactory(base.TestCase):
+
+    def setUp(self):
+        super(TestResourceObjectFactory, self).setUp()
+        ro_factory._resource_classes.clear()
+        self.addCleanup(ro_factory._resource_classes.clear)
+
+    def test_get_resource_object(self):
+        resource = ro_factory.ResourceObjectFactory.get_resource_object(
+            'test_node', '1234')
+        self.assertIsInstance(resource, test_node.TestNode)
+
+    def test_get_resource_object_unknown(self):
+        self.assertRaises(
+            exception.ResourceTypeUnknown,
+            ro_factory.ResourceObjectFactory.get_resource_object,
+            'bogus_node', '1234')
+
+    @mock.patch('stevedore.driver.DriverManager', autospec=True)
+    def test_resource_class_loaded_once(self, mock_driver_manager):
+        mock_driver_manager.return_value.driver = test_node.TestNode
+        ro_factory.ResourceObjectFactory.get_resource_object(
+            'test_node', '1234')
+        ro_factory.ResourceObjectFactory.get_resource_object(
+            'test_node', '5678')
+        mock_driver_manager.assert_called_once_with(
+            ro_factory.RESOURCE_TYPES_NAMESPACE, 'test_node')
+
+    def test_get_resource_objects(self):
+        resources = ro_factory.ResourceObjectFactory.get_resource_objects(
+            'test_node', ['1234', '5678'])
+        self.assertEqual(['1234', '5678'], sorted(resources))
+        self.assertIsInstance(resources['1234'], test_node.TestNode)
@@ -0,0 +1,82 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import mock
+import os
+
+import fixtures
+
+from esi_leap.common import exception
+import esi_leap.conf
+from esi_leap.resource_objects import sqlite_node
+from esi_leap.tests import base
+
+
+CONF = esi_leap.conf.CONF
+
+
+class TestSqliteNode(base.TestCase):
+
+    def setUp(self):
+        super(TestSqliteNode, self).setUp()
+        node_dir = self.useFixture(fixtures.TempDir()).path
+        CONF.set_override('database_path',
+                          os.path.join(node_dir, 'nodes.db'),
+                          group='sqlite_node')
+        self.addCleanup(CONF.clear_override, 'database_path',
+                        group='sqlite_node')
+        sqlite_node.reset_connection()
+        self.addCleanup(sqlite_node.reset_connection)
+        sqlite_node.SqliteNode.create_nodes([
+            {'uuid': 'node%d' % i,
+             'project_owner_id': 'owner1',
+             'server_config': {'cores': i}} for i in range(3)])
+
+    def test_accessors(self):
+        node = sqlite_node.SqliteNode('node1')
+        self.assertTrue(node.is_resource_admin('owner1'))
+        self.assertFalse(node.is_resource_admin('owner2'))
+        self.assertEqual({'cores': 1}, node.get_node_config())
+        self.assertIsNone(node.get_contract_uuid())
+        self.assertIsNone(node.get_project_id())
+
+    def test_not_found(self):
+        node = sqlite_node.SqliteNode('missing')
+        self.assertRaises(exception.ResourceNotFound,
+                          node.get_contract_uuid)
+
+    def test_set_contract(self):
+        node = sqlite_node.SqliteNode('node1')
+        node.set_contract(mock.Mock(uuid='contract1', project_id='project1'))
+        self.assertEqual('contract1', node.get_contract_uuid())
+        self.assertEqual('project1', node.get_project_id())
+
+        node.set_contract(None)
+        self.assertIsNone(node.get_contract_uuid())
+        self.assertIsNone(node.get_project_id())
+
+    def test_get_resource_objects(self):
+        nodes = sqlite_node.SqliteNode.get_resource_objects(
+            ['node0', 'node2', 'missing'])
+        self.assertEqual(['node0', 'node2'], sorted(nodes))
+        self.assertEqual({'cores': 2}, nodes['node2'].get_node_config())
+
+    def test_set_contracts(self):
+        sqlite_node.SqliteNode.set_contracts({
+            'node0': mock.Mock(uuid='contract0', project_id='project1'),
+            'node1': mock.Mock(uuid='contract1', project_id='project1'),
+        })
+        nodes = sqlite_node.SqliteNode.get_resource_objects(
+            ['node0', 'node1', 'node2'])
+        self.assertEqual('contract0', nodes['node0'].get_contract_uuid())
+        self.assertEqual('contract1', nodes['node1'].get_contract_uuid())
+        self.assertIsNone(nodes['node2'].get_contract_uuid())
@@ -0,0 +1,71 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Measure the cost of coercing offer and contract properties.
+
+Prints the time per value of FlexibleDict.coerce for some typical
+properties payloads, stored either as JSON or as a legacy python repr,
+next to the cost of ast.literal_eval alone.
+
+    tox -e venv -- python tools/benchmark_flexible_dict.py
+"""
+
+import argparse
+import ast
+import json
+import timeit
+
+from esi_leap.objects import fields
+
+PAYLOADS = {
+    'empty': {},
+    'small': {'floor_price': 3},
+    'node': {
+        'floor_price': 12.5,
+        'cpu_arch': 'x86_64',
+        'cpus': 40,
+        'memory_mb': 196608,
+        'local_gb': 1800,
+        'capabilities': {'boot_mode': 'uefi', 'secure_boot': True},
+        'traits': ['CUSTOM_GPU', 'CUSTOM_NVME', 'HW_CPU_X86_AVX2'],
+        'lessee': None,
+    },
+}
+
+
+def _time(func, value, number):
+    seconds = timeit.timeit(lambda: func(None, None, value), number=number)
+    return seconds / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-n', '--number', type=int, default=10000,
+                        help='Number of coercions to time per payload.')
+    args = parser.parse_args()
+
+    coerce = fields.FlexibleDict.coerce
+    print('%-8s %12s %12s %12s' % ('payload', 'json (us)', 'repr (us)',
+                                   'literal_eval'))
+    for name, payload in sorted(PAYLOADS.items()):
+        as_json = json.dumps(payload)
+        as_repr = repr(payload)
+        print('%-8s %12.2f %12.2f %12.2f' % (
+            name,
+            _time(coerce, as_json, args.number),
+            _time(coerce, as_repr, args.number),
+            _time(lambda obj, attr, value: dict(ast.literal_eval(value)),
+                  as_repr, args.number)))
+
+
+if __name__ == '__main__':
+    main()